@@ -100,13 +100,13 @@ git push heroku main
 
 # Run database migrations
 echo "Running database migrations"
-heroku run python -c "from src.main import app, db; app.app_context().push(); db.create_all()" --app "$APP_NAME"
+heroku run --app "$APP_NAME" "FLASK_APP=src.main flask db upgrade"
 
 # Seed curriculum data if requested
 read -p "Do you want to seed the curriculum data? (y/n): " SEED_DATA
 if [ "$SEED_DATA" = "y" ] || [ "$SEED_DATA" = "Y" ]; then
     echo "Seeding curriculum data"
-    heroku run python src/data/curriculum_seed.py --app "$APP_NAME"
+    heroku run --app "$APP_NAME" "flask --app src.main curriculum seed"
 fi
 
 echo "Deployment completed successfully!"
@@ -0,0 +1,151 @@
+import time
+import click
+from flask import current_app
+from flask.cli import AppGroup
+from src.models import db
+from src.services.progress_service import ProgressService
+from src.services.attempt_log_service import AttemptLogService
+from src.services.rollup_rebuild_service import RollupRebuildService
+from src.services.query_plan_service import QueryPlanService
+from src.services.leaderboard_service import LeaderboardService
+from src.services.review_service import ReviewService
+from src.services.curriculum_io_service import CurriculumIOService
+from src.services.curriculum_bundle_service import CurriculumBundleService
+from src.data.curriculum_seed import seed_lines
+
+# Maintenance commands, run with e.g. `flask --app src.main progress rebuild-rollups`
+progress_cli = AppGroup('progress', help='Progress maintenance commands.')
+
+@progress_cli.command('rebuild-rollups')
+@click.option('--child-id', type=int, default=None, help='Only rebuild this child.')
+@click.option('--workers', type=int, default=4, show_default=True,
+              help='Parallel workers; keep below the database connection pool size.')
+@click.option('--chunk-size', type=int, default=500, show_default=True,
+              help='Child ids per committed chunk.')
+def rebuild_rollups(child_id, workers, chunk_size):
+    """Recompute lesson/topic rollups and cached curriculum totals from raw records."""
+    def report(done, total, children, elapsed):
+        rate = children / elapsed if elapsed else 0.0
+        remaining = (total - done) * elapsed / done
+        click.echo(f"[{done}/{total}] {children} children, {rate:.0f} children/s, ~{remaining:.0f}s left")
+
+    children, elapsed = RollupRebuildService.rebuild_all(
+        current_app._get_current_object(),
+        workers=workers,
+        chunk_size=chunk_size,
+        child_id=child_id,
+        report=report
+    )
+    click.echo(f"Rebuilt progress rollups for {children} children in {elapsed:.2f}s.")
+
+@progress_cli.command('backfill-daily-scores')
+@click.option('--batch-size', type=int, default=1000, show_default=True)
+def backfill_daily_scores(batch_size):
+    """Seed running score totals on daily activity rows created before they existed."""
+    started = time.time()
+    updated = ProgressService.backfill_daily_scores(batch_size=batch_size)
+    click.echo(f"Backfilled daily score totals on {updated} rows in {time.time() - started:.2f}s.")
+
+@progress_cli.command('replay-attempts')
+@click.option('--since', type=int, default=None, help='First month bucket to replay (YYYYMM). Defaults to all.')
+@click.option('--chunk-size', type=int, default=1000, show_default=True)
+def replay_attempts(since, chunk_size):
+    """Re-derive progress records from the attempt log, for the pairs with attempts in each month bucket."""
+    started = time.time()
+    written = AttemptLogService.replay(since=since, chunk_size=chunk_size)
+    for month, count in written.items():
+        click.echo(f"{month}: {count} records")
+    click.echo(f"Replayed {len(written)} months in {time.time() - started:.2f}s. "
+               "Run rebuild-rollups to refresh lesson/topic progress.")
+
+@progress_cli.command('rebuild-reviews')
+@click.option('--chunk-size', type=int, default=500, show_default=True, help='Child ids per committed chunk.')
+def rebuild_reviews(chunk_size):
+    """Rebuild spaced-repetition review schedules by replaying the attempt log."""
+    started = time.time()
+    schedules = 0
+    for first, last in RollupRebuildService.child_id_ranges(chunk_size):
+        schedules += ReviewService.rebuild_range(first, last)
+        db.session.commit()
+    click.echo(f"Rebuilt {schedules} review schedules in {time.time() - started:.2f}s.")
+
+@progress_cli.command('reset-leaderboards')
+def reset_leaderboards():
+    """Drop last week's leaderboards from the shared backend (schedule for Monday 00:00)."""
+    dropped = LeaderboardService.reset()
+    click.echo(f"Dropped {dropped} leaderboards from previous weeks.")
+
+curriculum_cli = AppGroup('curriculum', help='Curriculum import and export.')
+
+def import_report(records, elapsed):
+    """Progress line printed after each committed import batch."""
+    rate = records / elapsed if elapsed else 0.0
+    click.echo(f"{records} records, {rate:.0f} rows/s", err=True)
+
+def import_summary(totals, elapsed):
+    """Per record type counts and the overall rate of a finished import."""
+    records = 0
+    for record_type, (inserted, updated, unchanged) in totals.items():
+        records += inserted + updated + unchanged
+        click.echo(f"{record_type}: {inserted} inserted, {updated} updated, {unchanged} unchanged")
+    rate = records / elapsed if elapsed else 0.0
+    click.echo(f"Imported {records} records in {elapsed:.2f}s ({rate:.0f} rows/s).")
+
+@curriculum_cli.command('export')
+@click.argument('output', type=click.File('w'), default='-')
+@click.option('--chunk-size', type=int, default=500, show_default=True, help='Rows fetched per round trip.')
+def export_curriculum(output, chunk_size):
+    """Stream the curriculum as NDJSON to OUTPUT (default stdout)."""
+    started = time.time()
+    rows = 0
+    for line in CurriculumIOService.export_lines(chunk_size=chunk_size):
+        output.write(line)
+        rows += 1
+    elapsed = time.time() - started
+    rate = rows / elapsed if elapsed else 0.0
+    click.echo(f"Exported {rows} records in {elapsed:.2f}s ({rate:.0f} rows/s).", err=True)
+
+@curriculum_cli.command('import')
+@click.argument('source', type=click.File('r'), default='-')
+@click.option('--batch-size', type=int, default=1000, show_default=True, help='Records per committed batch.')
+def import_curriculum(source, batch_size):
+    """Upsert curriculum NDJSON from SOURCE (default stdin) by natural key."""
+    try:
+        totals, elapsed = CurriculumIOService.import_lines(source, batch_size=batch_size, report=import_report)
+    except (ValueError, KeyError) as e:
+        raise click.ClickException(f"Import stopped, the failing batch was rolled back: {e}")
+    import_summary(totals, elapsed)
+
+@curriculum_cli.command('seed')
+def seed_curriculum():
+    """Upsert the bundled sample curriculum (src/data/curriculum_seed.py)."""
+    totals, elapsed = CurriculumIOService.import_lines(seed_lines(), report=import_report)
+    import_summary(totals, elapsed)
+
+@curriculum_cli.command('build-bundles')
+@click.option('--prune', is_flag=True, help='Delete bundle files the new manifest no longer lists.')
+def build_bundles(prune):
+    """Compile content-hashed curriculum bundles and their manifest into the static folder."""
+    started = time.time()
+    manifest, written, pruned = CurriculumBundleService.build(current_app.static_folder, prune=prune)
+    bundles = len(manifest['year_groups']) + len(manifest['topics'])
+    click.echo(f"Built {bundles} bundles for curriculum version {manifest['curriculum_version']} "
+               f"({written} new, {pruned} pruned) in {time.time() - started:.2f}s.")
+
+schema_cli = AppGroup('schema', help='Schema and query plan checks.')
+
+@schema_cli.command('check-queries')
+def check_queries():
+    """EXPLAIN the progress and achievement route queries and flag full table scans."""
+    results = QueryPlanService.check_route_queries()
+    flagged = 0
+    for name, full_scans in results:
+        if full_scans:
+            flagged += 1
+            click.echo(f"FULL SCAN  {name}: {'; '.join(full_scans)}")
+        else:
+            click.echo(f"ok         {name}")
+
+    click.echo(f"{len(results)} queries checked, {flagged} with full scans.")
+    if flagged:
+        raise SystemExit(1)
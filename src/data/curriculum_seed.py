@@ -8,8 +8,7 @@ import os
 import sys
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
 
-from flask import Flask
-from src.models import db, Topic, Lesson, Exercise
+from src.services.curriculum_io_service import CurriculumIOService
 
 # Sample curriculum data
 curriculum_data = {
@@ -455,73 +454,54 @@ curriculum_data = {
     }
 }
 
-def seed_curriculum():
-    """Seed the database with curriculum data."""
-    app = Flask(__name__)
-    app.config['SQLALCHEMY_DATABASE_URI'] = f"mysql+pymysql://{os.getenv('DB_USERNAME', 'root')}:{os.getenv('DB_PASSWORD', 'password')}@{os.getenv('DB_HOST', 'localhost')}:{os.getenv('DB_PORT', '3306')}/{os.getenv('DB_NAME', 'mathmaster_db')}"
-    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
-    db.init_app(app)
-    
-    with app.app_context():
-        # Clear existing data
-        Exercise.query.delete()
-        Lesson.query.delete()
-        Topic.query.delete()
+def seed_lines():
+    """Yield the seed curriculum as NDJSON import lines (see CurriculumIOService)."""
+    for year_group, year_data in curriculum_data.items():
+        year_number = int(year_group.split('_')[1])
         
-        # Seed topics, lessons, and exercises
-        for year_group, year_data in curriculum_data.items():
-            year_number = int(year_group.split('_')[1])
+        for topic_data in year_data['topics']:
+            topic_key = [year_number, topic_data['name']]
+            yield json.dumps({'type': 'topic', 'data': {
+                'year_group': year_number,
+                'name': topic_data['name'],
+                'description': topic_data['description'],
+                'icon': topic_data['icon'],
+                'order': topic_data['order']
+            }})
             
-            for topic_data in year_data['topics']:
-                # Create topic
-                topic = Topic(
-                    name=topic_data['name'],
-                    description=topic_data['description'],
-                    icon=topic_data['icon'],
-                    year_group=year_number,
-                    order=topic_data['order']
-                )
-                db.session.add(topic)
-                db.session.flush()  # Flush to get the topic ID
+            for lesson_data in topic_data['lessons']:
+                lesson_key = topic_key + [lesson_data['title']]
+                yield json.dumps({'type': 'lesson', 'data': {
+                    'topic': topic_key,
+                    'title': lesson_data['title'],
+                    'description': lesson_data['description'],
+                    'content': lesson_data['content'],
+                    'order': lesson_data['order'],
+                    'difficulty': lesson_data['difficulty'],
+                    'estimated_time': lesson_data.get('estimated_time')
+                }})
                 
-                for lesson_data in topic_data['lessons']:
-                    # Create lesson
-                    lesson = Lesson(
-                        topic_id=topic.id,
-                        title=lesson_data['title'],
-                        description=lesson_data['description'],
-                        content=lesson_data['content'],
-                        order=lesson_data['order'],
-                        difficulty=lesson_data['difficulty'],
-                        estimated_time=lesson_data.get('estimated_time')
-                    )
-                    db.session.add(lesson)
-                    db.session.flush()  # Flush to get the lesson ID
-                    
-                    for exercise_data in lesson_data['exercises']:
-                        # Create exercise
-                        exercise = Exercise(
-                            lesson_id=lesson.id,
-                            title=exercise_data['title'],
-                            description=exercise_data['description'],
-                            question_type=exercise_data['question_type'],
-                            question_data=exercise_data['question_data'],
-                            answer_data=exercise_data['answer_data'],
-                            difficulty=exercise_data['difficulty'],
-                            order=exercise_data['order']
-                        )
-                        db.session.add(exercise)
-        
-        # Commit all changes
-        db.session.commit()
-        
-        # Print summary
-        topic_count = Topic.query.count()
-        lesson_count = Lesson.query.count()
-        exercise_count = Exercise.query.count()
-        
-        print(f"Seeded {topic_count} topics, {lesson_count} lessons, and {exercise_count} exercises.")
+                for exercise_data in lesson_data['exercises']:
+                    yield json.dumps({'type': 'exercise', 'data': dict(
+                        {field: exercise_data[field] for field in (
+                            'title', 'description', 'question_type', 'question_data', 'answer_data', 'difficulty', 'order'
+                        )},
+                        lesson=lesson_key
+                    )})
 
-if __name__ == '__main__':
-    seed_curriculum()
+def seed_curriculum():
+    """
+    Seed the database with curriculum data (run inside an app context).
+    
+    Rows are upserted by natural key, so seeding again updates the seed
+    content in place without touching the ids that progress refers to.
+    """
+    totals, elapsed = CurriculumIOService.import_lines(seed_lines())
+    for record_type, (inserted, updated, unchanged) in totals.items():
+        print(f"{record_type}: {inserted} inserted, {updated} updated, {unchanged} unchanged")
+    print(f"Seeded the curriculum in {elapsed:.2f}s.")
 
+if __name__ == '__main__':
+    from src.main import app
+    with app.app_context():
+        seed_curriculum()
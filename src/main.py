@@ -6,6 +6,7 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
 from flask import Flask, send_from_directory, jsonify
 from flask_cors import CORS
 from flask_jwt_extended import JWTManager
+from flask_migrate import Migrate
 from datetime import timedelta
 from src.models import db
 from src.routes.user import user_bp
@@ -14,7 +15,11 @@ from src.routes.curriculum import curriculum_bp
 from src.routes.progress import progress_bp
 from src.routes.achievement import achievement_bp
 from src.routes.subscription import subscription_bp
+from src.routes.analytics import analytics_bp
 from src.services.auth_service import bcrypt
+from src.services.leaderboard_service import RedisLeaderboardBackend
+from src.services.curriculum_bundle_service import BUNDLE_DIR, BUNDLE_MAX_AGE, BUNDLE_NAME
+from src.commands import progress_cli, curriculum_cli, schema_cli
 
 app = Flask(__name__, static_folder=os.path.join(os.path.dirname(__file__), 'static'))
 # Enable CORS for frontend integration
@@ -39,15 +44,27 @@ app.register_blueprint(curriculum_bp, url_prefix='/api/curriculum')
 app.register_blueprint(progress_bp, url_prefix='/api/progress')
 app.register_blueprint(achievement_bp, url_prefix='/api/achievements')
 app.register_blueprint(subscription_bp, url_prefix='/api/subscription')
+app.register_blueprint(analytics_bp, url_prefix='/api/analytics')
+
+# Leaderboards are shared by all workers through Redis when configured, otherwise kept in each worker
+if os.getenv('LEADERBOARD_REDIS_URL'):
+    app.config['LEADERBOARD_BACKEND'] = RedisLeaderboardBackend.from_url(os.getenv('LEADERBOARD_REDIS_URL'))
+
+# How long browsers, mobile HTTP caches and the CDN may reuse public catalog responses (seconds)
+app.config['CATALOG_MAX_AGE'] = int(os.getenv('CATALOG_MAX_AGE', '60'))
+
+# Register maintenance CLI commands
+app.cli.add_command(progress_cli)
+app.cli.add_command(curriculum_cli)
+app.cli.add_command(schema_cli)
 
 # Enable database connection
 app.config['SQLALCHEMY_DATABASE_URI'] = f"mysql+pymysql://{os.getenv('DB_USERNAME', 'root')}:{os.getenv('DB_PASSWORD', 'password')}@{os.getenv('DB_HOST', 'localhost')}:{os.getenv('DB_PORT', '3306')}/{os.getenv('DB_NAME', 'mathmaster_db')}"
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
 db.init_app(app)
 
-# Create database tables if they don't exist
-with app.app_context():
-    db.create_all()
+# Schema changes are applied with versioned migrations: `flask --app src.main db upgrade`
+migrate = Migrate(app, db, directory=os.path.join(os.path.dirname(__file__), 'migrations'))
 
 # API health check endpoint
 @app.route('/api/health', methods=['GET'])
@@ -63,6 +80,13 @@ def serve(path):
         return "Static folder not configured", 404
 
     if path != "" and os.path.exists(os.path.join(static_folder_path, path)):
+        directory, _, name = path.rpartition('/')
+        if directory == BUNDLE_DIR and BUNDLE_NAME.match(name):
+            # Content-hashed curriculum bundles never change under the same name
+            response = send_from_directory(static_folder_path, path, max_age=BUNDLE_MAX_AGE)
+            response.cache_control.public = True
+            response.cache_control.immutable = True
+            return response
         return send_from_directory(static_folder_path, path)
     else:
         index_path = os.path.join(static_folder_path, 'index.html')
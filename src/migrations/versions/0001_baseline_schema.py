@@ -0,0 +1,209 @@
+"""baseline schema
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-17 01:41:27.811938
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0001'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('achievement_types',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(length=100), nullable=False),
+    sa.Column('description', sa.Text(), nullable=True),
+    sa.Column('icon', sa.String(length=100), nullable=True),
+    sa.Column('badge_image', sa.String(length=100), nullable=True),
+    sa.Column('points', sa.Integer(), nullable=True),
+    sa.Column('criteria', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table('rewards',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(length=100), nullable=False),
+    sa.Column('description', sa.Text(), nullable=True),
+    sa.Column('image', sa.String(length=100), nullable=True),
+    sa.Column('points_required', sa.Integer(), nullable=False),
+    sa.Column('is_active', sa.Boolean(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table('topics',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(length=100), nullable=False),
+    sa.Column('description', sa.Text(), nullable=True),
+    sa.Column('icon', sa.String(length=100), nullable=True),
+    sa.Column('year_group', sa.Integer(), nullable=True),
+    sa.Column('order', sa.Integer(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table('users',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('username', sa.String(length=80), nullable=False),
+    sa.Column('email', sa.String(length=120), nullable=False),
+    sa.Column('password_hash', sa.String(length=255), nullable=False),
+    sa.Column('role', sa.Enum('PARENT', 'CHILD', 'ADMIN', name='userrole'), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('email'),
+    sa.UniqueConstraint('username')
+    )
+    op.create_table('lessons',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('topic_id', sa.Integer(), nullable=False),
+    sa.Column('title', sa.String(length=100), nullable=False),
+    sa.Column('description', sa.Text(), nullable=True),
+    sa.Column('content', sa.Text(), nullable=False),
+    sa.Column('order', sa.Integer(), nullable=True),
+    sa.Column('difficulty', sa.Integer(), nullable=True),
+    sa.Column('estimated_time', sa.Integer(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['topic_id'], ['topics.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table('parent_profiles',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('first_name', sa.String(length=50), nullable=True),
+    sa.Column('last_name', sa.String(length=50), nullable=True),
+    sa.Column('phone_number', sa.String(length=20), nullable=True),
+    sa.Column('subscription_status', sa.String(length=20), nullable=True),
+    sa.Column('subscription_expiry', sa.DateTime(), nullable=True),
+    sa.Column('stripe_customer_id', sa.String(length=50), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table('child_profiles',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('parent_id', sa.Integer(), nullable=True),
+    sa.Column('first_name', sa.String(length=50), nullable=True),
+    sa.Column('avatar', sa.String(length=100), nullable=True),
+    sa.Column('year_group', sa.Integer(), nullable=True),
+    sa.Column('date_of_birth', sa.Date(), nullable=True),
+    sa.ForeignKeyConstraint(['parent_id'], ['parent_profiles.id'], ),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table('exercises',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('lesson_id', sa.Integer(), nullable=False),
+    sa.Column('title', sa.String(length=100), nullable=False),
+    sa.Column('description', sa.Text(), nullable=True),
+    sa.Column('question_type', sa.String(length=50), nullable=False),
+    sa.Column('question_data', sa.Text(), nullable=False),
+    sa.Column('answer_data', sa.Text(), nullable=False),
+    sa.Column('difficulty', sa.Integer(), nullable=True),
+    sa.Column('order', sa.Integer(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['lesson_id'], ['lessons.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table('achievements',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('child_id', sa.Integer(), nullable=False),
+    sa.Column('achievement_type_id', sa.Integer(), nullable=False),
+    sa.Column('earned_at', sa.DateTime(), nullable=True),
+    sa.Column('viewed', sa.Boolean(), nullable=True),
+    sa.ForeignKeyConstraint(['achievement_type_id'], ['achievement_types.id'], ),
+    sa.ForeignKeyConstraint(['child_id'], ['child_profiles.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table('child_rewards',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('child_id', sa.Integer(), nullable=False),
+    sa.Column('reward_id', sa.Integer(), nullable=False),
+    sa.Column('earned_at', sa.DateTime(), nullable=True),
+    sa.Column('redeemed', sa.Boolean(), nullable=True),
+    sa.Column('redeemed_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['child_id'], ['child_profiles.id'], ),
+    sa.ForeignKeyConstraint(['reward_id'], ['rewards.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table('daily_activities',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('child_id', sa.Integer(), nullable=False),
+    sa.Column('date', sa.Date(), nullable=False),
+    sa.Column('time_spent', sa.Integer(), nullable=True),
+    sa.Column('lessons_viewed', sa.Integer(), nullable=True),
+    sa.Column('exercises_completed', sa.Integer(), nullable=True),
+    sa.Column('average_score', sa.Float(), nullable=True),
+    sa.ForeignKeyConstraint(['child_id'], ['child_profiles.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('child_id', 'date', name='unique_child_date')
+    )
+    op.create_table('lesson_progress',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('child_id', sa.Integer(), nullable=False),
+    sa.Column('lesson_id', sa.Integer(), nullable=False),
+    sa.Column('status', sa.String(length=20), nullable=True),
+    sa.Column('progress_percentage', sa.Float(), nullable=True),
+    sa.Column('last_position', sa.String(length=50), nullable=True),
+    sa.Column('time_spent', sa.Integer(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['child_id'], ['child_profiles.id'], ),
+    sa.ForeignKeyConstraint(['lesson_id'], ['lessons.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('child_id', 'lesson_id', name='unique_child_lesson')
+    )
+    op.create_table('progress_records',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('child_id', sa.Integer(), nullable=False),
+    sa.Column('exercise_id', sa.Integer(), nullable=False),
+    sa.Column('score', sa.Float(), nullable=False),
+    sa.Column('time_spent', sa.Integer(), nullable=True),
+    sa.Column('attempts', sa.Integer(), nullable=True),
+    sa.Column('completed', sa.Boolean(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['child_id'], ['child_profiles.id'], ),
+    sa.ForeignKeyConstraint(['exercise_id'], ['exercises.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table('topic_progress',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('child_id', sa.Integer(), nullable=False),
+    sa.Column('topic_id', sa.Integer(), nullable=False),
+    sa.Column('progress_percentage', sa.Float(), nullable=True),
+    sa.Column('lessons_completed', sa.Integer(), nullable=True),
+    sa.Column('exercises_completed', sa.Integer(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['child_id'], ['child_profiles.id'], ),
+    sa.ForeignKeyConstraint(['topic_id'], ['topics.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('child_id', 'topic_id', name='unique_child_topic')
+    )
+
+
+def downgrade():
+    op.drop_table('topic_progress')
+    op.drop_table('progress_records')
+    op.drop_table('lesson_progress')
+    op.drop_table('daily_activities')
+    op.drop_table('child_rewards')
+    op.drop_table('achievements')
+    op.drop_table('exercises')
+    op.drop_table('child_profiles')
+    op.drop_table('parent_profiles')
+    op.drop_table('lessons')
+    op.drop_table('users')
+    op.drop_table('topics')
+    op.drop_table('rewards')
+    op.drop_table('achievement_types')
@@ -0,0 +1,65 @@
+"""progress rollup columns
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-17 01:41:58.120431
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0002'
+down_revision = '0001'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('daily_activities', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('score_sum', sa.Float(), nullable=True, server_default='0'))
+        batch_op.add_column(sa.Column('score_count', sa.Integer(), nullable=True, server_default='0'))
+
+    with op.batch_alter_table('lesson_progress', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('exercises_completed', sa.Integer(), nullable=True, server_default='0'))
+
+    with op.batch_alter_table('lessons', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('exercise_count', sa.Integer(), nullable=False, server_default='0'))
+
+    with op.batch_alter_table('topics', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('lesson_count', sa.Integer(), nullable=False, server_default='0'))
+
+    # Seed the cached totals and counters from existing rows. Daily score
+    # totals are seeded separately by `flask progress backfill-daily-scores`.
+    op.execute(
+        "UPDATE lessons SET exercise_count = "
+        "(SELECT COUNT(*) FROM exercises WHERE exercises.lesson_id = lessons.id)"
+    )
+    op.execute(
+        "UPDATE topics SET lesson_count = "
+        "(SELECT COUNT(*) FROM lessons WHERE lessons.topic_id = topics.id)"
+    )
+    op.execute(
+        "UPDATE lesson_progress SET exercises_completed = "
+        "(SELECT COUNT(*) FROM progress_records "
+        "JOIN exercises ON exercises.id = progress_records.exercise_id "
+        "WHERE progress_records.child_id = lesson_progress.child_id "
+        "AND exercises.lesson_id = lesson_progress.lesson_id "
+        "AND progress_records.completed = 1)"
+    )
+
+
+def downgrade():
+    with op.batch_alter_table('topics', schema=None) as batch_op:
+        batch_op.drop_column('lesson_count')
+
+    with op.batch_alter_table('lessons', schema=None) as batch_op:
+        batch_op.drop_column('exercise_count')
+
+    with op.batch_alter_table('lesson_progress', schema=None) as batch_op:
+        batch_op.drop_column('exercises_completed')
+
+    with op.batch_alter_table('daily_activities', schema=None) as batch_op:
+        batch_op.drop_column('score_count')
+        batch_op.drop_column('score_sum')
@@ -0,0 +1,112 @@
+"""progress and achievement indexes
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-17 01:42:12.416918
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0003'
+down_revision = '0002'
+branch_labels = None
+depends_on = None
+
+
+def merge_duplicate_progress_records():
+    """
+    Fold each (child, exercise) group of duplicate progress records into one row.
+
+    The most recently updated row is kept, with its score. Its attempts and
+    time spent become the group's totals, it is completed if any row was,
+    and its created_at is the group's earliest.
+    """
+    bind = op.get_bind()
+    duplicates = bind.execute(sa.text(
+        "SELECT child_id, exercise_id FROM progress_records "
+        "GROUP BY child_id, exercise_id HAVING COUNT(*) > 1"
+    )).fetchall()
+
+    for child_id, exercise_id in duplicates:
+        rows = bind.execute(sa.text(
+            "SELECT id, attempts, time_spent, completed, created_at FROM progress_records "
+            "WHERE child_id = :child_id AND exercise_id = :exercise_id ORDER BY updated_at DESC, id DESC"
+        ), {'child_id': child_id, 'exercise_id': exercise_id}).fetchall()
+        keep, merged = rows[0], rows[1:]
+
+        time_spent = [row.time_spent for row in rows if row.time_spent is not None]
+        created_at = [row.created_at for row in rows if row.created_at is not None]
+        bind.execute(sa.text(
+            "UPDATE progress_records SET attempts = :attempts, time_spent = :time_spent, "
+            "completed = :completed, created_at = :created_at WHERE id = :id"
+        ), {
+            'id': keep.id,
+            'attempts': sum(row.attempts or 1 for row in rows),
+            'time_spent': sum(time_spent) if time_spent else None,
+            'completed': any(row.completed for row in rows),
+            'created_at': min(created_at) if created_at else None
+        })
+        bind.execute(
+            sa.text("DELETE FROM progress_records WHERE id IN :ids").bindparams(sa.bindparam('ids', expanding=True)),
+            {'ids': [row.id for row in merged]}
+        )
+
+
+def upgrade():
+    # Merge duplicate rows left by concurrent submissions before adding the
+    # unique constraints, so no attempts or completions are lost.
+    merge_duplicate_progress_records()
+    op.execute(
+        "DELETE FROM achievements WHERE id NOT IN ("
+        "SELECT keep_id FROM (SELECT MIN(id) AS keep_id FROM achievements "
+        "GROUP BY child_id, achievement_type_id) AS keep_rows)"
+    )
+
+    with op.batch_alter_table('achievements', schema=None) as batch_op:
+        batch_op.create_unique_constraint('unique_child_achievement_type', ['child_id', 'achievement_type_id'])
+
+    with op.batch_alter_table('child_profiles', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_child_profiles_user_id'), ['user_id'], unique=False)
+
+    with op.batch_alter_table('child_rewards', schema=None) as batch_op:
+        batch_op.create_index('ix_child_rewards_child_reward', ['child_id', 'reward_id'], unique=False)
+
+    with op.batch_alter_table('lesson_progress', schema=None) as batch_op:
+        batch_op.create_index('ix_lesson_progress_child_status', ['child_id', 'status'], unique=False)
+
+    with op.batch_alter_table('parent_profiles', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_parent_profiles_stripe_customer_id'), ['stripe_customer_id'], unique=False)
+
+    with op.batch_alter_table('progress_records', schema=None) as batch_op:
+        batch_op.create_index('ix_progress_records_child_completed', ['child_id', 'completed'], unique=False)
+        batch_op.create_unique_constraint('unique_child_exercise', ['child_id', 'exercise_id'])
+
+    with op.batch_alter_table('topics', schema=None) as batch_op:
+        batch_op.create_index('ix_topics_year_group_order', ['year_group', 'order'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('topics', schema=None) as batch_op:
+        batch_op.drop_index('ix_topics_year_group_order')
+
+    with op.batch_alter_table('progress_records', schema=None) as batch_op:
+        batch_op.drop_constraint('unique_child_exercise', type_='unique')
+        batch_op.drop_index('ix_progress_records_child_completed')
+
+    with op.batch_alter_table('parent_profiles', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_parent_profiles_stripe_customer_id'))
+
+    with op.batch_alter_table('lesson_progress', schema=None) as batch_op:
+        batch_op.drop_index('ix_lesson_progress_child_status')
+
+    with op.batch_alter_table('child_rewards', schema=None) as batch_op:
+        batch_op.drop_index('ix_child_rewards_child_reward')
+
+    with op.batch_alter_table('child_profiles', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_child_profiles_user_id'))
+
+    with op.batch_alter_table('achievements', schema=None) as batch_op:
+        batch_op.drop_constraint('unique_child_achievement_type', type_='unique')
@@ -0,0 +1,42 @@
+"""attempt event log
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-17 01:44:51.464344
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0004'
+down_revision = '0003'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('attempt_events',
+    sa.Column('id', sa.BigInteger().with_variant(sa.Integer(), 'sqlite'), nullable=False),
+    sa.Column('month', sa.Integer(), nullable=False),
+    sa.Column('child_id', sa.Integer(), nullable=False),
+    sa.Column('exercise_id', sa.Integer(), nullable=False),
+    sa.Column('score', sa.Float(), nullable=False),
+    sa.Column('time_spent', sa.Integer(), nullable=True),
+    sa.Column('completed', sa.Boolean(), nullable=True),
+    sa.Column('attempt_number', sa.Integer(), nullable=False),
+    sa.Column('attempted_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('attempt_events', schema=None) as batch_op:
+        batch_op.create_index('ix_attempt_events_child_exercise', ['child_id', 'exercise_id', 'attempted_at'], unique=False)
+        batch_op.create_index('ix_attempt_events_month_child', ['month', 'child_id', 'exercise_id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('attempt_events', schema=None) as batch_op:
+        batch_op.drop_index('ix_attempt_events_month_child')
+        batch_op.drop_index('ix_attempt_events_child_exercise')
+
+    op.drop_table('attempt_events')
@@ -0,0 +1,60 @@
+"""child progress summary
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-17 01:51:47.766001
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0005'
+down_revision = '0004'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('child_progress_summaries',
+    sa.Column('child_id', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('topics_completed', sa.Integer(), nullable=False),
+    sa.Column('lessons_completed', sa.Integer(), nullable=False),
+    sa.Column('exercises_completed', sa.Integer(), nullable=False),
+    sa.Column('score_sum', sa.Float(), nullable=False),
+    sa.Column('score_count', sa.Integer(), nullable=False),
+    sa.Column('total_time_spent', sa.Integer(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['child_id'], ['child_profiles.id'], ),
+    sa.PrimaryKeyConstraint('child_id')
+    )
+
+    with op.batch_alter_table('lessons', schema=None) as batch_op:
+        batch_op.create_index('ix_lessons_topic_order', ['topic_id', 'order'], unique=False)
+
+    # Materialize a summary for every existing child; new children get theirs on first write or read
+    op.execute(
+        "INSERT INTO child_progress_summaries "
+        "(child_id, topics_completed, lessons_completed, exercises_completed, "
+        "score_sum, score_count, total_time_spent, updated_at) "
+        "SELECT child_profiles.id, "
+        "(SELECT COUNT(*) FROM topic_progress WHERE topic_progress.child_id = child_profiles.id "
+        "AND topic_progress.progress_percentage >= 100), "
+        "(SELECT COUNT(*) FROM lesson_progress WHERE lesson_progress.child_id = child_profiles.id "
+        "AND lesson_progress.status = 'completed'), "
+        "(SELECT COUNT(*) FROM progress_records WHERE progress_records.child_id = child_profiles.id "
+        "AND progress_records.completed = 1), "
+        "(SELECT COALESCE(SUM(score), 0) FROM progress_records WHERE progress_records.child_id = child_profiles.id), "
+        "(SELECT COUNT(*) FROM progress_records WHERE progress_records.child_id = child_profiles.id), "
+        "(SELECT COALESCE(SUM(time_spent), 0) FROM daily_activities WHERE daily_activities.child_id = child_profiles.id), "
+        "CURRENT_TIMESTAMP "
+        "FROM child_profiles"
+    )
+
+
+def downgrade():
+    with op.batch_alter_table('lessons', schema=None) as batch_op:
+        batch_op.drop_index('ix_lessons_topic_order')
+
+    op.drop_table('child_progress_summaries')
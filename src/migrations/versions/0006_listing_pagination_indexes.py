@@ -0,0 +1,33 @@
+"""listing pagination indexes
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-17 01:53:49.855089
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0006'
+down_revision = '0005'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('achievements', schema=None) as batch_op:
+        batch_op.create_index('ix_achievements_child_id', ['child_id', 'id'], unique=False)
+
+    with op.batch_alter_table('child_rewards', schema=None) as batch_op:
+        batch_op.create_index('ix_child_rewards_child_id', ['child_id', 'id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('child_rewards', schema=None) as batch_op:
+        batch_op.drop_index('ix_child_rewards_child_id')
+
+    with op.batch_alter_table('achievements', schema=None) as batch_op:
+        batch_op.drop_index('ix_achievements_child_id')
+
@@ -0,0 +1,27 @@
+"""child progress watermark
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-17 01:56:35.661659
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0007'
+down_revision = '0006'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('child_progress_summaries', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('version', sa.Integer(), nullable=False, server_default='0'))
+
+
+def downgrade():
+    with op.batch_alter_table('child_progress_summaries', schema=None) as batch_op:
+        batch_op.drop_column('version')
+
@@ -0,0 +1,33 @@
+"""parent and child profile lookup indexes
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-17 01:57:40.625285
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0008'
+down_revision = '0007'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('child_profiles', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_child_profiles_parent_id'), ['parent_id'], unique=False)
+
+    with op.batch_alter_table('parent_profiles', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_parent_profiles_user_id'), ['user_id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('parent_profiles', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_parent_profiles_user_id'))
+
+    with op.batch_alter_table('child_profiles', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_child_profiles_parent_id'))
+
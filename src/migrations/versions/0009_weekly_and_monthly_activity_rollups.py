@@ -0,0 +1,39 @@
+"""weekly and monthly activity rollups
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-17 01:58:52.844277
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0009'
+down_revision = '0008'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Existing history is rolled up by `flask --app src.main progress rebuild-rollups`
+    op.create_table('activity_rollups',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('child_id', sa.Integer(), nullable=False),
+    sa.Column('period', sa.String(length=10), nullable=False),
+    sa.Column('period_start', sa.Date(), nullable=False),
+    sa.Column('time_spent', sa.Integer(), nullable=True),
+    sa.Column('lessons_viewed', sa.Integer(), nullable=True),
+    sa.Column('exercises_completed', sa.Integer(), nullable=True),
+    sa.Column('average_score', sa.Float(), nullable=True),
+    sa.Column('score_sum', sa.Float(), nullable=True),
+    sa.Column('score_count', sa.Integer(), nullable=True),
+    sa.ForeignKeyConstraint(['child_id'], ['child_profiles.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('child_id', 'period', 'period_start', name='unique_child_period_start')
+    )
+
+
+def downgrade():
+    op.drop_table('activity_rollups')
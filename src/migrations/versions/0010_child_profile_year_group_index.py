@@ -0,0 +1,27 @@
+"""child profile year group index
+
+Revision ID: 0010
+Revises: 0009
+Create Date: 2026-10-17 02:04:10.608705
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0010'
+down_revision = '0009'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('child_profiles', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_child_profiles_year_group'), ['year_group'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('child_profiles', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_child_profiles_year_group'))
+
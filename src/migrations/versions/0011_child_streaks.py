@@ -0,0 +1,32 @@
+"""child streaks
+
+Revision ID: 0011
+Revises: 0010
+Create Date: 2026-10-17 02:06:25.644212
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0011'
+down_revision = '0010'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Existing activity is counted into streaks by `flask --app src.main progress rebuild-rollups`
+    with op.batch_alter_table('child_progress_summaries', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('current_streak', sa.Integer(), nullable=False, server_default='0'))
+        batch_op.add_column(sa.Column('longest_streak', sa.Integer(), nullable=False, server_default='0'))
+        batch_op.add_column(sa.Column('last_active_date', sa.Date(), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('child_progress_summaries', schema=None) as batch_op:
+        batch_op.drop_column('last_active_date')
+        batch_op.drop_column('longest_streak')
+        batch_op.drop_column('current_streak')
+
@@ -0,0 +1,47 @@
+"""review schedules
+
+Revision ID: 0012
+Revises: 0011
+Create Date: 2026-10-17 02:08:57.922660
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0012'
+down_revision = '0011'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('review_schedules',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('child_id', sa.Integer(), nullable=False),
+    sa.Column('exercise_id', sa.Integer(), nullable=False),
+    sa.Column('repetitions', sa.Integer(), nullable=False),
+    sa.Column('interval_days', sa.Integer(), nullable=False),
+    sa.Column('ease_factor', sa.Float(), nullable=False),
+    sa.Column('last_score', sa.Float(), nullable=True),
+    sa.Column('last_reviewed_at', sa.DateTime(), nullable=True),
+    sa.Column('due_at', sa.DateTime(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['child_id'], ['child_profiles.id'], ),
+    sa.ForeignKeyConstraint(['exercise_id'], ['exercises.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('child_id', 'exercise_id', name='unique_child_review_exercise')
+    )
+    with op.batch_alter_table('review_schedules', schema=None) as batch_op:
+        batch_op.create_index('ix_review_schedules_child_due', ['child_id', 'due_at'], unique=False)
+
+    # Schedules for past attempts are replayed from the attempt log by `flask --app src.main progress rebuild-reviews`
+
+
+def downgrade():
+    with op.batch_alter_table('review_schedules', schema=None) as batch_op:
+        batch_op.drop_index('ix_review_schedules_child_due')
+
+    op.drop_table('review_schedules')
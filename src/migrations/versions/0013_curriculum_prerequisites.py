@@ -0,0 +1,47 @@
+"""curriculum prerequisites
+
+Revision ID: 0013
+Revises: 0012
+Create Date: 2026-10-17 02:12:01.928392
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0013'
+down_revision = '0012'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    curriculum_versions = op.create_table('curriculum_versions',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('version', sa.Integer(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    # Workers compare this single row against their compiled curriculum graph
+    op.bulk_insert(curriculum_versions, [{'id': 1, 'version': 1}])
+    op.create_table('topic_prerequisites',
+    sa.Column('topic_id', sa.Integer(), nullable=False),
+    sa.Column('prerequisite_id', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['prerequisite_id'], ['topics.id'], ),
+    sa.ForeignKeyConstraint(['topic_id'], ['topics.id'], ),
+    sa.PrimaryKeyConstraint('topic_id', 'prerequisite_id')
+    )
+    op.create_table('lesson_prerequisites',
+    sa.Column('lesson_id', sa.Integer(), nullable=False),
+    sa.Column('prerequisite_id', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['lesson_id'], ['lessons.id'], ),
+    sa.ForeignKeyConstraint(['prerequisite_id'], ['lessons.id'], ),
+    sa.PrimaryKeyConstraint('lesson_id', 'prerequisite_id')
+    )
+
+
+def downgrade():
+    op.drop_table('lesson_prerequisites')
+    op.drop_table('topic_prerequisites')
+    op.drop_table('curriculum_versions')
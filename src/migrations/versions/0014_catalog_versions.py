@@ -0,0 +1,34 @@
+"""catalog versions
+
+Revision ID: 0014
+Revises: 0013
+Create Date: 2026-10-17 02:20:20.981200
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0014'
+down_revision = '0013'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    catalog_versions = op.create_table('catalog_versions',
+    sa.Column('name', sa.String(length=50), nullable=False),
+    sa.Column('version', sa.Integer(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('name')
+    )
+    # Workers compare these rows against their cached catalogs and serve them as ETags
+    op.bulk_insert(catalog_versions, [
+        {'name': 'achievement_types', 'version': 1},
+        {'name': 'rewards', 'version': 1},
+    ])
+
+
+def downgrade():
+    op.drop_table('catalog_versions')
@@ -1,8 +1,13 @@
 # Import all models to make them available when importing from models
 from src.models.user import db, User, UserRole, ParentProfile, ChildProfile
-from src.models.curriculum import Topic, Lesson, Exercise
-from src.models.progress import ProgressRecord, LessonProgress, TopicProgress, DailyActivity
-from src.models.achievement import AchievementType, Achievement, Reward, ChildReward
+from src.models.curriculum import (
+    Topic, Lesson, Exercise, TopicPrerequisite, LessonPrerequisite, CurriculumVersion
+)
+from src.models.progress import (
+    ProgressRecord, LessonProgress, TopicProgress, DailyActivity, ActivityRollup, AttemptEvent,
+    ReviewSchedule, ChildProgressSummary
+)
+from src.models.achievement import AchievementType, Achievement, Reward, ChildReward, CatalogVersion
 
 # This allows importing all models from src.models
 __all__ = [
@@ -14,13 +19,21 @@ __all__ = [
     'Topic',
     'Lesson',
     'Exercise',
+    'TopicPrerequisite',
+    'LessonPrerequisite',
+    'CurriculumVersion',
     'ProgressRecord',
     'LessonProgress',
     'TopicProgress',
     'DailyActivity',
+    'ActivityRollup',
+    'AttemptEvent',
+    'ReviewSchedule',
+    'ChildProgressSummary',
     'AchievementType',
     'Achievement',
     'Reward',
-    'ChildReward'
+    'ChildReward',
+    'CatalogVersion'
 ]
 
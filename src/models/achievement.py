@@ -40,6 +40,12 @@ class Achievement(db.Model):
     earned_at = db.Column(db.DateTime, default=datetime.utcnow)
     viewed = db.Column(db.Boolean, default=False)
     
+    # A child can earn each achievement type only once; (child_id, id) serves the paginated listing
+    __table_args__ = (
+        db.UniqueConstraint('child_id', 'achievement_type_id', name='unique_child_achievement_type'),
+        db.Index('ix_achievements_child_id', 'child_id', 'id'),
+    )
+    
     def __repr__(self):
         return f'<Achievement Child:{self.child_id} Type:{self.achievement_type_id}>'
     
@@ -91,6 +97,11 @@ class ChildReward(db.Model):
     redeemed = db.Column(db.Boolean, default=False)
     redeemed_at = db.Column(db.DateTime)
     
+    __table_args__ = (
+        db.Index('ix_child_rewards_child_reward', 'child_id', 'reward_id'),
+        db.Index('ix_child_rewards_child_id', 'child_id', 'id'),
+    )
+    
     def __repr__(self):
         return f'<ChildReward Child:{self.child_id} Reward:{self.reward_id} Redeemed:{self.redeemed}>'
     
@@ -105,3 +116,14 @@ class ChildReward(db.Model):
             'reward': self.reward.to_dict() if self.reward else None
         }
 
+
+class CatalogVersion(db.Model):
+    __tablename__ = 'catalog_versions'
+    
+    # One row per public catalog ('achievement_types', 'rewards'), bumped by every admin write to it
+    name = db.Column(db.String(50), primary_key=True)
+    version = db.Column(db.Integer, default=1, nullable=False)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    def __repr__(self):
+        return f'<CatalogVersion {self.name} {self.version}>'
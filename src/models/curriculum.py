@@ -10,9 +10,12 @@ class Topic(db.Model):
     icon = db.Column(db.String(100))
     year_group = db.Column(db.Integer)  # UK school year (1-6)
     order = db.Column(db.Integer, default=0)  # For ordering topics within a year group
+    lesson_count = db.Column(db.Integer, default=0, nullable=False)  # Cached number of lessons in the topic
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
+    __table_args__ = (db.Index('ix_topics_year_group_order', 'year_group', 'order'),)
+    
     # Relationships
     lessons = db.relationship('Lesson', backref='topic', lazy=True, cascade='all, delete-orphan')
     
@@ -29,7 +32,7 @@ class Topic(db.Model):
             'order': self.order,
             'created_at': self.created_at.isoformat(),
             'updated_at': self.updated_at.isoformat(),
-            'lesson_count': len(self.lessons)
+            'lesson_count': self.lesson_count
         }
 
 class Lesson(db.Model):
@@ -43,9 +46,13 @@ class Lesson(db.Model):
     order = db.Column(db.Integer, default=0)  # For ordering lessons within a topic
     difficulty = db.Column(db.Integer, default=1)  # 1-5 scale
     estimated_time = db.Column(db.Integer)  # In minutes
+    exercise_count = db.Column(db.Integer, default=0, nullable=False)  # Cached number of exercises in the lesson
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
+    # Serves per-topic lesson lists and year-group totals
+    __table_args__ = (db.Index('ix_lessons_topic_order', 'topic_id', 'order'),)
+    
     # Relationships
     exercises = db.relationship('Exercise', backref='lesson', lazy=True, cascade='all, delete-orphan')
     
@@ -64,7 +71,7 @@ class Lesson(db.Model):
             'estimated_time': self.estimated_time,
             'created_at': self.created_at.isoformat(),
             'updated_at': self.updated_at.isoformat(),
-            'exercise_count': len(self.exercises)
+            'exercise_count': self.exercise_count
         }
 
 class Exercise(db.Model):
@@ -102,3 +109,34 @@ class Exercise(db.Model):
             'updated_at': self.updated_at.isoformat()
         }
 
+
+class TopicPrerequisite(db.Model):
+    __tablename__ = 'topic_prerequisites'
+    
+    # Every lesson of `prerequisite_id` must be completed before starting `topic_id`
+    topic_id = db.Column(db.Integer, db.ForeignKey('topics.id'), primary_key=True)
+    prerequisite_id = db.Column(db.Integer, db.ForeignKey('topics.id'), primary_key=True)
+    
+    def __repr__(self):
+        return f'<TopicPrerequisite {self.prerequisite_id} -> {self.topic_id}>'
+
+class LessonPrerequisite(db.Model):
+    __tablename__ = 'lesson_prerequisites'
+    
+    # `prerequisite_id` must be completed before starting `lesson_id`
+    lesson_id = db.Column(db.Integer, db.ForeignKey('lessons.id'), primary_key=True)
+    prerequisite_id = db.Column(db.Integer, db.ForeignKey('lessons.id'), primary_key=True)
+    
+    def __repr__(self):
+        return f'<LessonPrerequisite {self.prerequisite_id} -> {self.lesson_id}>'
+
+class CurriculumVersion(db.Model):
+    __tablename__ = 'curriculum_versions'
+    
+    # A single row whose version every admin curriculum write bumps; workers compare it to their compiled copy
+    id = db.Column(db.Integer, primary_key=True)
+    version = db.Column(db.Integer, default=1, nullable=False)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    def __repr__(self):
+        return f'<CurriculumVersion {self.version}>'
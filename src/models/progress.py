@@ -1,4 +1,4 @@
-from datetime import datetime
+from datetime import datetime, timedelta
 from src.models.user import db
 
 class ProgressRecord(db.Model):
@@ -14,6 +14,12 @@ class ProgressRecord(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
+    # One record per child per exercise; the second index serves completed counts
+    __table_args__ = (
+        db.UniqueConstraint('child_id', 'exercise_id', name='unique_child_exercise'),
+        db.Index('ix_progress_records_child_completed', 'child_id', 'completed'),
+    )
+    
     def __repr__(self):
         return f'<ProgressRecord Child:{self.child_id} Exercise:{self.exercise_id} Score:{self.score}>'
     
@@ -39,12 +45,16 @@ class LessonProgress(db.Model):
     status = db.Column(db.String(20), default='not_started')  # not_started, in_progress, completed
     progress_percentage = db.Column(db.Float, default=0.0)  # 0-100
     last_position = db.Column(db.String(50))  # Store position in lesson (e.g., slide number)
+    exercises_completed = db.Column(db.Integer, default=0)  # Completed exercises in this lesson
     time_spent = db.Column(db.Integer, default=0)  # Total time spent in seconds
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
     # Unique constraint to ensure one progress record per child per lesson
-    __table_args__ = (db.UniqueConstraint('child_id', 'lesson_id', name='unique_child_lesson'),)
+    __table_args__ = (
+        db.UniqueConstraint('child_id', 'lesson_id', name='unique_child_lesson'),
+        db.Index('ix_lesson_progress_child_status', 'child_id', 'status'),
+    )
     
     def __repr__(self):
         return f'<LessonProgress Child:{self.child_id} Lesson:{self.lesson_id} Status:{self.status}>'
@@ -57,6 +67,7 @@ class LessonProgress(db.Model):
             'status': self.status,
             'progress_percentage': self.progress_percentage,
             'last_position': self.last_position,
+            'exercises_completed': self.exercises_completed,
             'time_spent': self.time_spent,
             'created_at': self.created_at.isoformat(),
             'updated_at': self.updated_at.isoformat()
@@ -102,6 +113,8 @@ class DailyActivity(db.Model):
     lessons_viewed = db.Column(db.Integer, default=0)
     exercises_completed = db.Column(db.Integer, default=0)
     average_score = db.Column(db.Float)  # Average score for exercises completed that day
+    score_sum = db.Column(db.Float, default=0.0)  # Running sum of attempt scores, maintains average_score
+    score_count = db.Column(db.Integer, default=0)  # Number of scored attempts that day
     
     # Unique constraint to ensure one activity record per child per day
     __table_args__ = (db.UniqueConstraint('child_id', 'date', name='unique_child_date'),)
@@ -120,3 +133,164 @@ class DailyActivity(db.Model):
             'average_score': self.average_score
         }
 
+
+class ActivityRollup(db.Model):
+    __tablename__ = 'activity_rollups'
+    
+    PERIODS = ('week', 'month')
+    
+    id = db.Column(db.Integer, primary_key=True)
+    child_id = db.Column(db.Integer, db.ForeignKey('child_profiles.id'), nullable=False)
+    period = db.Column(db.String(10), nullable=False)  # week (starting Monday) or month
+    period_start = db.Column(db.Date, nullable=False)  # First day of the week or month
+    time_spent = db.Column(db.Integer, default=0)  # Total time spent in seconds
+    lessons_viewed = db.Column(db.Integer, default=0)
+    exercises_completed = db.Column(db.Integer, default=0)
+    average_score = db.Column(db.Float)
+    score_sum = db.Column(db.Float, default=0.0)
+    score_count = db.Column(db.Integer, default=0)
+    
+    # One row per child per period; also serves the (child, period, date range) chart reads
+    __table_args__ = (
+        db.UniqueConstraint('child_id', 'period', 'period_start', name='unique_child_period_start'),
+    )
+    
+    @staticmethod
+    def period_start_of(day, period):
+        """Return the first day of the week (Monday) or month containing `day`."""
+        if period == 'week':
+            return day - timedelta(days=day.weekday())
+        return day.replace(day=1)
+    
+    def __repr__(self):
+        return f'<ActivityRollup Child:{self.child_id} {self.period.title()}:{self.period_start} Time:{self.time_spent}s>'
+    
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'child_id': self.child_id,
+            'period': self.period,
+            'period_start': self.period_start.isoformat(),
+            'time_spent': self.time_spent,
+            'lessons_viewed': self.lessons_viewed,
+            'exercises_completed': self.exercises_completed,
+            'average_score': self.average_score
+        }
+
+
+class AttemptEvent(db.Model):
+    __tablename__ = 'attempt_events'
+    
+    id = db.Column(db.BigInteger().with_variant(db.Integer, 'sqlite'), primary_key=True)
+    # Month bucket (YYYYMM); analytics and replays read one bucket at a time
+    month = db.Column(db.Integer, nullable=False)
+    # No foreign keys: the log is append-only and must outlive curriculum edits
+    child_id = db.Column(db.Integer, nullable=False)
+    exercise_id = db.Column(db.Integer, nullable=False)
+    score = db.Column(db.Float, nullable=False)  # Percentage correct (0-100)
+    time_spent = db.Column(db.Integer)  # In seconds
+    completed = db.Column(db.Boolean, default=False)  # Completion state after this attempt
+    attempt_number = db.Column(db.Integer, nullable=False)  # ProgressRecord.attempts after this attempt
+    attempted_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    
+    __table_args__ = (
+        db.Index('ix_attempt_events_month_child', 'month', 'child_id', 'exercise_id'),
+        db.Index('ix_attempt_events_child_exercise', 'child_id', 'exercise_id', 'attempted_at'),
+    )
+    
+    @staticmethod
+    def month_of(moment):
+        """Return the YYYYMM bucket for a date or datetime."""
+        return moment.year * 100 + moment.month
+    
+    def __repr__(self):
+        return f'<AttemptEvent Child:{self.child_id} Exercise:{self.exercise_id} Score:{self.score}>'
+    
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'child_id': self.child_id,
+            'exercise_id': self.exercise_id,
+            'score': self.score,
+            'time_spent': self.time_spent,
+            'completed': self.completed,
+            'attempt_number': self.attempt_number,
+            'attempted_at': self.attempted_at.isoformat()
+        }
+
+
+class ReviewSchedule(db.Model):
+    __tablename__ = 'review_schedules'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    child_id = db.Column(db.Integer, db.ForeignKey('child_profiles.id'), nullable=False)
+    exercise_id = db.Column(db.Integer, db.ForeignKey('exercises.id'), nullable=False)
+    # SM-2 state: successful reviews in a row, current interval and ease factor
+    repetitions = db.Column(db.Integer, default=0, nullable=False)
+    interval_days = db.Column(db.Integer, default=0, nullable=False)
+    ease_factor = db.Column(db.Float, default=2.5, nullable=False)
+    last_score = db.Column(db.Float)
+    last_reviewed_at = db.Column(db.DateTime)
+    due_at = db.Column(db.DateTime, nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    exercise = db.relationship('Exercise', lazy=True)
+    
+    # One schedule per child per exercise; (child_id, due_at) serves the review queue
+    __table_args__ = (
+        db.UniqueConstraint('child_id', 'exercise_id', name='unique_child_review_exercise'),
+        db.Index('ix_review_schedules_child_due', 'child_id', 'due_at'),
+    )
+    
+    def __repr__(self):
+        return f'<ReviewSchedule Child:{self.child_id} Exercise:{self.exercise_id} Due:{self.due_at}>'
+    
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'child_id': self.child_id,
+            'exercise_id': self.exercise_id,
+            'repetitions': self.repetitions,
+            'interval_days': self.interval_days,
+            'ease_factor': self.ease_factor,
+            'last_score': self.last_score,
+            'last_reviewed_at': self.last_reviewed_at.isoformat() if self.last_reviewed_at else None,
+            'due_at': self.due_at.isoformat()
+        }
+
+
+class ChildProgressSummary(db.Model):
+    __tablename__ = 'child_progress_summaries'
+    
+    # One row per child, kept current by the progress write paths
+    child_id = db.Column(db.Integer, db.ForeignKey('child_profiles.id'), primary_key=True, autoincrement=False)
+    topics_completed = db.Column(db.Integer, default=0, nullable=False)
+    lessons_completed = db.Column(db.Integer, default=0, nullable=False)
+    exercises_completed = db.Column(db.Integer, default=0, nullable=False)
+    score_sum = db.Column(db.Float, default=0.0, nullable=False)  # Sum of the latest score per progress record
+    score_count = db.Column(db.Integer, default=0, nullable=False)  # Number of progress records
+    total_time_spent = db.Column(db.Integer, default=0, nullable=False)  # In seconds, across all daily activity
+    version = db.Column(db.Integer, default=0, nullable=False)  # Progress watermark, bumped by every progress write
+    current_streak = db.Column(db.Integer, default=0, nullable=False)  # Days in a row ending on last_active_date
+    longest_streak = db.Column(db.Integer, default=0, nullable=False)
+    last_active_date = db.Column(db.Date)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    @property
+    def average_score(self):
+        return self.score_sum / self.score_count if self.score_count else 0
+    
+    def __repr__(self):
+        return f'<ChildProgressSummary Child:{self.child_id} Exercises:{self.exercises_completed}>'
+    
+    def to_dict(self):
+        return {
+            'child_id': self.child_id,
+            'topics_completed': self.topics_completed,
+            'lessons_completed': self.lessons_completed,
+            'exercises_completed': self.exercises_completed,
+            'average_score': self.average_score,
+            'total_time_spent': self.total_time_spent,
+            'as_of': self.updated_at.isoformat()
+        }
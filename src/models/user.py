@@ -43,13 +43,13 @@ class ParentProfile(db.Model):
     __tablename__ = 'parent_profiles'
     
     id = db.Column(db.Integer, primary_key=True)
-    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False, index=True)
     first_name = db.Column(db.String(50))
     last_name = db.Column(db.String(50))
     phone_number = db.Column(db.String(20))
     subscription_status = db.Column(db.String(20), default='free')
     subscription_expiry = db.Column(db.DateTime, nullable=True)
-    stripe_customer_id = db.Column(db.String(50), nullable=True)
+    stripe_customer_id = db.Column(db.String(50), nullable=True, index=True)
     
     # Relationship with ChildProfile (parent's children)
     children = db.relationship('ChildProfile', backref='parent', lazy=True)
@@ -73,11 +73,11 @@ class ChildProfile(db.Model):
     __tablename__ = 'child_profiles'
     
     id = db.Column(db.Integer, primary_key=True)
-    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
-    parent_id = db.Column(db.Integer, db.ForeignKey('parent_profiles.id'), nullable=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False, index=True)
+    parent_id = db.Column(db.Integer, db.ForeignKey('parent_profiles.id'), nullable=True, index=True)
     first_name = db.Column(db.String(50))
     avatar = db.Column(db.String(100), default='default_avatar.png')
-    year_group = db.Column(db.Integer)  # UK school year (1-6)
+    year_group = db.Column(db.Integer, index=True)  # UK school year (1-6)
     date_of_birth = db.Column(db.Date, nullable=True)
     
     # Relationships
@@ -1,9 +1,13 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, abort
 from flask_jwt_extended import jwt_required, get_jwt_identity, get_jwt
 from src.models import (
     AchievementType, Achievement, Reward, ChildReward,
     ChildProfile, User, UserRole, db
 )
+from src.services.pagination_service import PaginationService
+from src.services.leaderboard_service import LeaderboardService
+from src.services.catalog_service import CatalogService
+from src.routes.cache_policy import public_catalog
 
 achievement_bp = Blueprint('achievement', __name__)
 
@@ -27,16 +31,20 @@ def check_child_access(child_id, user_id, user_role):
 
 # Achievement type routes
 @achievement_bp.route('/achievement-types', methods=['GET'])
+@public_catalog('achievement_types', lambda: CatalogService.version('achievement_types'))
 def get_achievement_types():
     """Get all achievement types."""
-    achievement_types = AchievementType.query.all()
-    return jsonify([achievement_type.to_dict() for achievement_type in achievement_types])
+    _, _, achievement_types = CatalogService.catalog('achievement_types')
+    return jsonify(list(achievement_types))
 
 @achievement_bp.route('/achievement-types/<int:achievement_type_id>', methods=['GET'])
+@public_catalog('achievement_types', lambda: CatalogService.version('achievement_types'))
 def get_achievement_type(achievement_type_id):
     """Get a specific achievement type."""
-    achievement_type = AchievementType.query.get_or_404(achievement_type_id)
-    return jsonify(achievement_type.to_dict())
+    _, achievement_types, _ = CatalogService.catalog('achievement_types')
+    if achievement_type_id not in achievement_types:
+        abort(404)
+    return jsonify(achievement_types[achievement_type_id])
 
 @achievement_bp.route('/achievement-types', methods=['POST'])
 @jwt_required()
@@ -66,6 +74,7 @@ def create_achievement_type():
     )
     
     db.session.add(achievement_type)
+    CatalogService.bump_version('achievement_types')
     db.session.commit()
     
     return jsonify(achievement_type.to_dict()), 201
@@ -96,6 +105,7 @@ def update_achievement_type(achievement_type_id):
     if 'criteria' in data:
         achievement_type.criteria = data['criteria']
     
+    CatalogService.bump_version('achievement_types')
     db.session.commit()
     
     return jsonify(achievement_type.to_dict())
@@ -111,6 +121,7 @@ def delete_achievement_type(achievement_type_id):
     
     achievement_type = AchievementType.query.get_or_404(achievement_type_id)
     db.session.delete(achievement_type)
+    CatalogService.bump_version('achievement_types')
     db.session.commit()
     
     return '', 204
@@ -119,7 +130,7 @@ def delete_achievement_type(achievement_type_id):
 @achievement_bp.route('/children/<int:child_id>/achievements', methods=['GET'])
 @jwt_required()
 def get_achievements(child_id):
-    """Get all achievements for a child."""
+    """Get a child's achievements, oldest first, one page at a time."""
     # Check access
     user_id = get_jwt_identity()
     user_role = get_jwt().get('role')
@@ -127,8 +138,17 @@ def get_achievements(child_id):
     if not check_child_access(child_id, user_id, user_role):
         return jsonify({"error": "Access denied"}), 403
     
-    achievements = Achievement.query.filter_by(child_id=child_id).all()
-    return jsonify([achievement.to_dict() for achievement in achievements])
+    try:
+        limit, cursor = PaginationService.parse_args(request.args)
+        achievements, next_cursor = PaginationService.paginate(
+            Achievement.query.filter_by(child_id=child_id), Achievement.id, limit, cursor
+        )
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    
+    return jsonify(PaginationService.page(
+        [achievement.to_dict() for achievement in achievements], limit, next_cursor
+    ))
 
 @achievement_bp.route('/children/<int:child_id>/achievements', methods=['POST'])
 @jwt_required()
@@ -175,6 +195,9 @@ def award_achievement(child_id):
     db.session.add(achievement)
     db.session.commit()
     
+    # Achievement points count towards this week's leaderboard
+    LeaderboardService.add_scores({(child_id, achievement.earned_at.date()): achievement_type.points or 0})
+    
     return jsonify(achievement.to_dict()), 201
 
 @achievement_bp.route('/children/<int:child_id>/achievements/<int:achievement_id>/view', methods=['PUT'])
@@ -203,16 +226,20 @@ def mark_achievement_viewed(child_id, achievement_id):
 
 # Reward routes
 @achievement_bp.route('/rewards', methods=['GET'])
+@public_catalog('rewards', lambda: CatalogService.version('rewards'))
 def get_rewards():
     """Get all available rewards."""
-    rewards = Reward.query.filter_by(is_active=True).all()
-    return jsonify([reward.to_dict() for reward in rewards])
+    _, _, rewards = CatalogService.catalog('rewards')
+    return jsonify([reward for reward in rewards if reward['is_active']])
 
 @achievement_bp.route('/rewards/<int:reward_id>', methods=['GET'])
+@public_catalog('rewards', lambda: CatalogService.version('rewards'))
 def get_reward(reward_id):
     """Get a specific reward."""
-    reward = Reward.query.get_or_404(reward_id)
-    return jsonify(reward.to_dict())
+    _, rewards, _ = CatalogService.catalog('rewards')
+    if reward_id not in rewards:
+        abort(404)
+    return jsonify(rewards[reward_id])
 
 @achievement_bp.route('/rewards', methods=['POST'])
 @jwt_required()
@@ -241,6 +268,7 @@ def create_reward():
     )
     
     db.session.add(reward)
+    CatalogService.bump_version('rewards')
     db.session.commit()
     
     return jsonify(reward.to_dict()), 201
@@ -269,6 +297,7 @@ def update_reward(reward_id):
     if 'is_active' in data:
         reward.is_active = data['is_active']
     
+    CatalogService.bump_version('rewards')
     db.session.commit()
     
     return jsonify(reward.to_dict())
@@ -284,6 +313,7 @@ def delete_reward(reward_id):
     
     reward = Reward.query.get_or_404(reward_id)
     db.session.delete(reward)
+    CatalogService.bump_version('rewards')
     db.session.commit()
     
     return '', 204
@@ -292,7 +322,7 @@ def delete_reward(reward_id):
 @achievement_bp.route('/children/<int:child_id>/rewards', methods=['GET'])
 @jwt_required()
 def get_child_rewards(child_id):
-    """Get all rewards for a child."""
+    """Get a child's redeemed rewards, oldest first, one page at a time."""
     # Check access
     user_id = get_jwt_identity()
     user_role = get_jwt().get('role')
@@ -300,8 +330,17 @@ def get_child_rewards(child_id):
     if not check_child_access(child_id, user_id, user_role):
         return jsonify({"error": "Access denied"}), 403
     
-    child_rewards = ChildReward.query.filter_by(child_id=child_id).all()
-    return jsonify([child_reward.to_dict() for child_reward in child_rewards])
+    try:
+        limit, cursor = PaginationService.parse_args(request.args)
+        child_rewards, next_cursor = PaginationService.paginate(
+            ChildReward.query.filter_by(child_id=child_id), ChildReward.id, limit, cursor
+        )
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    
+    return jsonify(PaginationService.page(
+        [child_reward.to_dict() for child_reward in child_rewards], limit, next_cursor
+    ))
 
 @achievement_bp.route('/children/<int:child_id>/rewards', methods=['POST'])
 @jwt_required()
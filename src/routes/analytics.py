@@ -0,0 +1,44 @@
+from flask import Blueprint, request, jsonify
+from flask_jwt_extended import jwt_required, get_jwt
+from src.models import UserRole
+from src.services.analytics_service import AnalyticsService
+
+analytics_bp = Blueprint('analytics', __name__)
+
+@analytics_bp.route('/year-groups', methods=['GET'])
+@jwt_required()
+def get_year_group_analytics():
+    """Score distribution, completion funnel and time on task for each year-group cohort (admin only)."""
+    # Check if user is admin
+    jwt_data = get_jwt()
+    if jwt_data.get('role') != UserRole.ADMIN.value:
+        return jsonify({"error": "Admin access required"}), 403
+
+    report = AnalyticsService.cohort_report()
+    return jsonify({
+        "computed_at": report['computed_at'],
+        "records": report['records'],
+        "year_groups": report['year_groups']
+    })
+
+@analytics_bp.route('/topics', methods=['GET'])
+@jwt_required()
+def get_topic_analytics():
+    """Score distribution, completion funnel and time on task for each topic, optionally for one year group (admin only)."""
+    # Check if user is admin
+    jwt_data = get_jwt()
+    if jwt_data.get('role') != UserRole.ADMIN.value:
+        return jsonify({"error": "Admin access required"}), 403
+
+    year_group = request.args.get('year_group', type=int)
+
+    report = AnalyticsService.cohort_report()
+    topics = report['topics']
+    if year_group:
+        topics = [topic for topic in topics if topic['year_group'] == year_group]
+
+    return jsonify({
+        "computed_at": report['computed_at'],
+        "records": report['records'],
+        "topics": topics
+    })
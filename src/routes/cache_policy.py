@@ -0,0 +1,46 @@
+from functools import wraps
+from flask import request, make_response, current_app
+
+# Seconds browsers, mobile HTTP caches and the CDN may reuse a catalog response before revalidating
+DEFAULT_CATALOG_MAX_AGE = 60
+
+def catalog_etag(catalog, version, encoding=None):
+    """Strong ETag for a catalog response: the catalog version, plus the content encoding when compressed."""
+    etag = f'{catalog}-v{version}'
+    return f'{etag}-{encoding}' if encoding else etag
+
+def public_catalog(catalog, version_of, negotiates_gzip=False):
+    """
+    Cache policy for public, rarely changing catalog routes.
+
+    `version_of()` returns the catalog's current version without a query
+    on most requests (see CurriculumSnapshotService and CatalogService).
+    A request whose If-None-Match already holds that version is answered
+    with a 304 before the view runs; 200 responses get a strong ETag,
+    `Cache-Control: public, max-age=CATALOG_MAX_AGE` and `Vary:
+    Accept-Encoding`. Routes that pick a gzip body themselves pass
+    `negotiates_gzip` so each encoding gets its own ETag.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            encoding = 'gzip' if negotiates_gzip and request.accept_encodings['gzip'] else None
+            etag = catalog_etag(catalog, version_of(), encoding)
+
+            if request.if_none_match.contains_weak(etag):
+                return with_cache_policy(make_response('', 304), etag)
+
+            response = make_response(view(*args, **kwargs))
+            if response.status_code == 200:
+                with_cache_policy(response, etag)
+            return response
+        return wrapper
+    return decorator
+
+def with_cache_policy(response, etag):
+    """Tag a catalog response so shared caches can store it and revalidate it with If-None-Match."""
+    response.set_etag(etag)
+    response.cache_control.public = True
+    response.cache_control.max_age = current_app.config.get('CATALOG_MAX_AGE', DEFAULT_CATALOG_MAX_AGE)
+    response.vary.add('Accept-Encoding')
+    return response
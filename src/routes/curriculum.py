@@ -1,27 +1,42 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, Response, current_app, request, jsonify, abort
 from flask_jwt_extended import jwt_required, get_jwt
-from src.models import Topic, Lesson, Exercise, db, UserRole
+from src.models import Topic, Lesson, Exercise, TopicPrerequisite, LessonPrerequisite, db, UserRole
+from src.services.curriculum_graph_service import CurriculumGraphService
+from src.services.curriculum_snapshot_service import CurriculumSnapshotService, MAX_SLIDE_COUNT
+from src.services.curriculum_bundle_service import CurriculumBundleService
+from src.routes.cache_policy import public_catalog, with_cache_policy
 
 curriculum_bp = Blueprint('curriculum', __name__)
 
+def commit_curriculum_change():
+    """Commit an admin edit with a new curriculum version, and swap this worker's snapshot."""
+    CurriculumGraphService.bump_version()
+    db.session.commit()
+    CurriculumSnapshotService.reload()
+
+def snapshot_item(items, item_id):
+    """A topic, lesson or exercise from the snapshot, or 404."""
+    item = items.get(item_id)
+    if item is None:
+        abort(404)
+    return item
+
 # Topic routes
 @curriculum_bp.route('/topics', methods=['GET'])
+@public_catalog('curriculum', CurriculumSnapshotService.version)
 def get_topics():
     """Get all topics, optionally filtered by year group."""
     year_group = request.args.get('year_group', type=int)
     
-    query = Topic.query
-    if year_group:
-        query = query.filter_by(year_group=year_group)
-    
-    topics = query.order_by(Topic.year_group, Topic.order).all()
-    return jsonify([topic.to_dict() for topic in topics])
+    snapshot = CurriculumSnapshotService.snapshot()
+    topics = snapshot.topics_by_year.get(year_group, ()) if year_group else snapshot.all_topics
+    return jsonify(list(topics))
 
 @curriculum_bp.route('/topics/<int:topic_id>', methods=['GET'])
+@public_catalog('curriculum', CurriculumSnapshotService.version)
 def get_topic(topic_id):
     """Get a specific topic by ID."""
-    topic = Topic.query.get_or_404(topic_id)
-    return jsonify(topic.to_dict())
+    return jsonify(snapshot_item(CurriculumSnapshotService.snapshot().topics, topic_id))
 
 @curriculum_bp.route('/topics', methods=['POST'])
 @jwt_required()
@@ -46,11 +61,12 @@ def create_topic():
         description=data.get('description', ''),
         icon=data.get('icon', ''),
         year_group=data['year_group'],
-        order=data.get('order', 0)
+        order=data.get('order', 0),
+        lesson_count=0
     )
     
     db.session.add(topic)
-    db.session.commit()
+    commit_curriculum_change()
     
     return jsonify(topic.to_dict()), 201
 
@@ -78,7 +94,7 @@ def update_topic(topic_id):
     if 'order' in data:
         topic.order = data['order']
     
-    db.session.commit()
+    commit_curriculum_change()
     
     return jsonify(topic.to_dict())
 
@@ -92,24 +108,79 @@ def delete_topic(topic_id):
         return jsonify({"error": "Admin access required"}), 403
     
     topic = Topic.query.get_or_404(topic_id)
+    CurriculumGraphService.delete_edges(
+        topic_ids=[topic_id],
+        lesson_ids=[lesson_id for lesson_id, in db.session.query(Lesson.id).filter_by(topic_id=topic_id)]
+    )
     db.session.delete(topic)
-    db.session.commit()
+    commit_curriculum_change()
     
     return '', 204
 
+# Curriculum tree
+@curriculum_bp.route('/tree', methods=['GET'])
+@public_catalog('curriculum', CurriculumSnapshotService.version, negotiates_gzip=True)
+def get_curriculum_tree():
+    """Get every topic with its lessons and exercises, optionally for one year group, in one response."""
+    year_group = request.args.get('year_group', type=int)
+    
+    # Bodies are serialized and gzipped once per curriculum version
+    body, compressed = CurriculumSnapshotService.snapshot().tree(year_group or None)
+    if request.accept_encodings['gzip']:
+        response = Response(compressed, mimetype='application/json')
+        response.headers['Content-Encoding'] = 'gzip'
+    else:
+        response = Response(body, mimetype='application/json')
+    response.vary.add('Accept-Encoding')
+    return response
+
+@curriculum_bp.route('/manifest', methods=['GET'])
+def get_curriculum_manifest():
+    """Get the manifest of the static, content-hashed curriculum bundles."""
+    manifest = CurriculumBundleService.manifest(current_app.static_folder)
+    if manifest is None:
+        return jsonify({"error": "Curriculum bundles have not been built"}), 404
+    
+    body, etag = manifest
+    if request.if_none_match.contains_weak(etag):
+        return with_cache_policy(Response(status=304), etag)
+    return with_cache_policy(Response(body, mimetype='application/json'), etag)
+
 # Lesson routes
 @curriculum_bp.route('/topics/<int:topic_id>/lessons', methods=['GET'])
+@public_catalog('curriculum', CurriculumSnapshotService.version)
 def get_lessons(topic_id):
     """Get all lessons for a topic."""
-    Topic.query.get_or_404(topic_id)  # Check if topic exists
-    lessons = Lesson.query.filter_by(topic_id=topic_id).order_by(Lesson.order).all()
-    return jsonify([lesson.to_dict() for lesson in lessons])
+    snapshot = CurriculumSnapshotService.snapshot()
+    snapshot_item(snapshot.topics, topic_id)  # Check if topic exists
+    return jsonify(list(snapshot.lessons_by_topic[topic_id]))
 
 @curriculum_bp.route('/lessons/<int:lesson_id>', methods=['GET'])
+@public_catalog('curriculum', CurriculumSnapshotService.version)
 def get_lesson(lesson_id):
-    """Get a specific lesson by ID."""
-    lesson = Lesson.query.get_or_404(lesson_id)
-    return jsonify(lesson.to_dict())
+    """Get a specific lesson by ID; ?include_content=false swaps the content for its slide count."""
+    snapshot = CurriculumSnapshotService.snapshot()
+    lesson = snapshot_item(snapshot.lessons, lesson_id)
+    
+    if request.args.get('include_content', 'true').lower() in ('0', 'false', 'no'):
+        lesson = {key: value for key, value in lesson.items() if key != 'content'}
+        lesson['slide_count'] = len(snapshot.lesson_slides(lesson_id))
+    return jsonify(lesson)
+
+@curriculum_bp.route('/lessons/<int:lesson_id>/slides', methods=['GET'])
+@public_catalog('curriculum', CurriculumSnapshotService.version)
+def get_lesson_slides(lesson_id):
+    """Get a range of a lesson's slides."""
+    start = request.args.get('start', 0, type=int)
+    count = request.args.get('count', 1, type=int)
+    if start < 0:
+        return jsonify({"error": "start must not be negative"}), 400
+    if count < 1 or count > MAX_SLIDE_COUNT:
+        return jsonify({"error": f"count must be between 1 and {MAX_SLIDE_COUNT}"}), 400
+    
+    snapshot = CurriculumSnapshotService.snapshot()
+    snapshot_item(snapshot.lessons, lesson_id)  # Check if lesson exists
+    return Response(snapshot.slide_range(lesson_id, start, count), mimetype='application/json')
 
 @curriculum_bp.route('/topics/<int:topic_id>/lessons', methods=['POST'])
 @jwt_required()
@@ -120,7 +191,7 @@ def create_lesson(topic_id):
     if jwt_data.get('role') != UserRole.ADMIN.value:
         return jsonify({"error": "Admin access required"}), 403
     
-    Topic.query.get_or_404(topic_id)  # Check if topic exists
+    topic = Topic.query.get_or_404(topic_id)  # Check if topic exists
     data = request.json
     
     # Check required fields
@@ -137,11 +208,13 @@ def create_lesson(topic_id):
         content=data['content'],
         order=data.get('order', 0),
         difficulty=data.get('difficulty', 1),
-        estimated_time=data.get('estimated_time')
+        estimated_time=data.get('estimated_time'),
+        exercise_count=0
     )
     
     db.session.add(lesson)
-    db.session.commit()
+    topic.lesson_count = Topic.lesson_count + 1  # Keep the cached total in step
+    commit_curriculum_change()
     
     return jsonify(lesson.to_dict()), 201
 
@@ -171,7 +244,7 @@ def update_lesson(lesson_id):
     if 'estimated_time' in data:
         lesson.estimated_time = data['estimated_time']
     
-    db.session.commit()
+    commit_curriculum_change()
     
     return jsonify(lesson.to_dict())
 
@@ -185,24 +258,27 @@ def delete_lesson(lesson_id):
         return jsonify({"error": "Admin access required"}), 403
     
     lesson = Lesson.query.get_or_404(lesson_id)
+    lesson.topic.lesson_count = Topic.lesson_count - 1  # Keep the cached total in step
+    CurriculumGraphService.delete_edges(lesson_ids=[lesson_id])
     db.session.delete(lesson)
-    db.session.commit()
+    commit_curriculum_change()
     
     return '', 204
 
 # Exercise routes
 @curriculum_bp.route('/lessons/<int:lesson_id>/exercises', methods=['GET'])
+@public_catalog('curriculum', CurriculumSnapshotService.version)
 def get_exercises(lesson_id):
     """Get all exercises for a lesson."""
-    Lesson.query.get_or_404(lesson_id)  # Check if lesson exists
-    exercises = Exercise.query.filter_by(lesson_id=lesson_id).order_by(Exercise.order).all()
-    return jsonify([exercise.to_dict() for exercise in exercises])
+    snapshot = CurriculumSnapshotService.snapshot()
+    snapshot_item(snapshot.lessons, lesson_id)  # Check if lesson exists
+    return jsonify(list(snapshot.exercises_by_lesson[lesson_id]))
 
 @curriculum_bp.route('/exercises/<int:exercise_id>', methods=['GET'])
+@public_catalog('curriculum', CurriculumSnapshotService.version)
 def get_exercise(exercise_id):
     """Get a specific exercise by ID."""
-    exercise = Exercise.query.get_or_404(exercise_id)
-    return jsonify(exercise.to_dict())
+    return jsonify(snapshot_item(CurriculumSnapshotService.snapshot().exercises, exercise_id))
 
 @curriculum_bp.route('/lessons/<int:lesson_id>/exercises', methods=['POST'])
 @jwt_required()
@@ -213,7 +289,7 @@ def create_exercise(lesson_id):
     if jwt_data.get('role') != UserRole.ADMIN.value:
         return jsonify({"error": "Admin access required"}), 403
     
-    Lesson.query.get_or_404(lesson_id)  # Check if lesson exists
+    lesson = Lesson.query.get_or_404(lesson_id)  # Check if lesson exists
     data = request.json
     
     # Check required fields
@@ -235,7 +311,8 @@ def create_exercise(lesson_id):
     )
     
     db.session.add(exercise)
-    db.session.commit()
+    lesson.exercise_count = Lesson.exercise_count + 1  # Keep the cached total in step
+    commit_curriculum_change()
     
     return jsonify(exercise.to_dict()), 201
 
@@ -267,7 +344,7 @@ def update_exercise(exercise_id):
     if 'order' in data:
         exercise.order = data['order']
     
-    db.session.commit()
+    commit_curriculum_change()
     
     return jsonify(exercise.to_dict())
 
@@ -281,8 +358,76 @@ def delete_exercise(exercise_id):
         return jsonify({"error": "Admin access required"}), 403
     
     exercise = Exercise.query.get_or_404(exercise_id)
+    exercise.lesson.exercise_count = Lesson.exercise_count - 1  # Keep the cached total in step
     db.session.delete(exercise)
-    db.session.commit()
+    commit_curriculum_change()
     
     return '', 204
 
+# Prerequisite routes
+def replace_prerequisites(target, model, key_column, key, data):
+    """Validate a {"prerequisite_ids": [...]} body and store it, rejecting edges that would form a cycle."""
+    prerequisite_ids = (data or {}).get('prerequisite_ids')
+    if not isinstance(prerequisite_ids, list) or not all(isinstance(value, int) for value in prerequisite_ids):
+        return jsonify({"error": "prerequisite_ids must be a list of ids"}), 400
+    
+    prerequisite_ids = set(prerequisite_ids)
+    found = db.session.query(db.func.count(target.id)).filter(target.id.in_(prerequisite_ids)).scalar()
+    if found != len(prerequisite_ids):
+        return jsonify({"error": "Prerequisite not found"}), 404
+    
+    try:
+        CurriculumGraphService.set_prerequisites(model, key_column, key, prerequisite_ids)
+    except ValueError as e:
+        db.session.rollback()
+        return jsonify({"error": str(e)}), 400
+    db.session.commit()
+    CurriculumSnapshotService.reload()
+    
+    return jsonify({key_column: key, "prerequisite_ids": sorted(prerequisite_ids)})
+
+@curriculum_bp.route('/topics/<int:topic_id>/prerequisites', methods=['GET'])
+@public_catalog('curriculum', CurriculumSnapshotService.version)
+def get_topic_prerequisites(topic_id):
+    """Get the topics that must be completed before a topic."""
+    snapshot = CurriculumSnapshotService.snapshot()
+    snapshot_item(snapshot.topics, topic_id)  # Check if topic exists
+    return jsonify({
+        "topic_id": topic_id,
+        "prerequisite_ids": list(snapshot.topic_prerequisites.get(topic_id, ()))
+    })
+
+@curriculum_bp.route('/topics/<int:topic_id>/prerequisites', methods=['PUT'])
+@jwt_required()
+def set_topic_prerequisites(topic_id):
+    """Replace a topic's prerequisite topics (admin only)."""
+    # Check if user is admin
+    jwt_data = get_jwt()
+    if jwt_data.get('role') != UserRole.ADMIN.value:
+        return jsonify({"error": "Admin access required"}), 403
+    
+    Topic.query.get_or_404(topic_id)  # Check if topic exists
+    return replace_prerequisites(Topic, TopicPrerequisite, 'topic_id', topic_id, request.json)
+
+@curriculum_bp.route('/lessons/<int:lesson_id>/prerequisites', methods=['GET'])
+@public_catalog('curriculum', CurriculumSnapshotService.version)
+def get_lesson_prerequisites(lesson_id):
+    """Get the lessons that must be completed before a lesson, besides the one before it in its topic."""
+    snapshot = CurriculumSnapshotService.snapshot()
+    snapshot_item(snapshot.lessons, lesson_id)  # Check if lesson exists
+    return jsonify({
+        "lesson_id": lesson_id,
+        "prerequisite_ids": list(snapshot.lesson_prerequisites.get(lesson_id, ()))
+    })
+
+@curriculum_bp.route('/lessons/<int:lesson_id>/prerequisites', methods=['PUT'])
+@jwt_required()
+def set_lesson_prerequisites(lesson_id):
+    """Replace a lesson's prerequisite lessons (admin only)."""
+    # Check if user is admin
+    jwt_data = get_jwt()
+    if jwt_data.get('role') != UserRole.ADMIN.value:
+        return jsonify({"error": "Admin access required"}), 403
+    
+    Lesson.query.get_or_404(lesson_id)  # Check if lesson exists
+    return replace_prerequisites(Lesson, LessonPrerequisite, 'lesson_id', lesson_id, request.json)
@@ -1,10 +1,22 @@
-from flask import Blueprint, request, jsonify
+import re
+from flask import Blueprint, Response, request, jsonify, make_response, stream_with_context
 from flask_jwt_extended import jwt_required, get_jwt_identity, get_jwt
-from datetime import datetime, date
+from datetime import datetime, date, timezone
 from src.models import (
-    ProgressRecord, LessonProgress, TopicProgress, DailyActivity,
-    ChildProfile, Exercise, Lesson, Topic, User, UserRole, db
+    ProgressRecord, LessonProgress, TopicProgress, DailyActivity, ActivityRollup, AttemptEvent,
+    ChildProgressSummary, ParentProfile, ChildProfile, Exercise, Lesson, Topic, User, UserRole, db
 )
+from src.services.progress_service import ProgressService
+from src.services.attempt_log_service import AttemptLogService
+from src.services.progress_summary_service import ProgressSummaryService
+from src.services.pagination_service import PaginationService
+from src.services.export_service import ExportService
+from src.services.dashboard_service import DashboardService
+from src.services.streak_service import StreakService
+from src.services.review_service import ReviewService
+from src.services.curriculum_graph_service import CurriculumGraphService
+from src.services.curriculum_snapshot_service import CurriculumSnapshotService, MAX_SLIDE_COUNT
+from src.services.leaderboard_service import LeaderboardService, MAX_LEADERBOARD_LIMIT
 
 progress_bp = Blueprint('progress', __name__)
 
@@ -26,6 +38,37 @@ def check_child_access(child_id, user_id, user_role):
     
     return False
 
+# Conditional GET helpers: every progress write bumps the child's watermark, which is served as the ETag
+def progress_watermark(child_id, daily=False, curriculum=False):
+    """
+    Return (etag, last_modified) for a child's progress reads, from one primary key lookup.
+
+    Pass `daily` for responses that also depend on today's date (streaks),
+    so a cached copy is not revalidated past midnight, and `curriculum` for
+    responses that include curriculum totals, so an admin edit does too.
+    """
+    version, updated_at = ProgressSummaryService.watermark(child_id)
+    etag = f'child-{child_id}-v{version}'
+    if curriculum:
+        etag = f'{etag}-c{CurriculumSnapshotService.version()}'
+    return (f'{etag}-{date.today().isoformat()}' if daily else etag), updated_at
+
+def with_watermark(response, watermark):
+    """Tag a progress response so clients can revalidate it with If-None-Match."""
+    etag, last_modified = watermark
+    response.set_etag(etag)
+    if last_modified:
+        response.last_modified = last_modified
+    response.cache_control.private = True
+    response.cache_control.no_cache = True
+    return response
+
+def not_modified(watermark):
+    """Return a 304 response if the client already has this watermark, otherwise None."""
+    if request.if_none_match.contains_weak(watermark[0]):
+        return with_watermark(make_response('', 304), watermark)
+    return None
+
 # Progress record routes
 @progress_bp.route('/children/<int:child_id>/progress/exercises/<int:exercise_id>', methods=['POST'])
 @jwt_required()
@@ -53,6 +96,9 @@ def record_exercise_progress(child_id, exercise_id):
         exercise_id=exercise_id
     ).first()
     
+    was_completed = bool(progress and progress.completed)
+    previous_score = progress.score if progress else None
+    
     if progress:
         # Update existing record
         progress.score = data['score']
@@ -71,99 +117,167 @@ def record_exercise_progress(child_id, exercise_id):
         )
         db.session.add(progress)
     
-    # Update lesson progress
-    lesson_progress = LessonProgress.query.filter_by(
-        child_id=child_id,
-        lesson_id=exercise.lesson_id
-    ).first()
-    
-    if not lesson_progress:
-        lesson_progress = LessonProgress(
-            child_id=child_id,
-            lesson_id=exercise.lesson_id,
-            status='in_progress'
-        )
-        db.session.add(lesson_progress)
-    
-    # Calculate lesson progress percentage
-    total_exercises = Exercise.query.filter_by(lesson_id=exercise.lesson_id).count()
-    completed_exercises = ProgressRecord.query.filter_by(
-        child_id=child_id,
-        completed=True
-    ).join(Exercise).filter(Exercise.lesson_id == exercise.lesson_id).count()
-    
-    if data.get('completed', False):
-        completed_exercises += 1
-    
-    if total_exercises > 0:
-        lesson_progress.progress_percentage = (completed_exercises / total_exercises) * 100
-        
-        # Update lesson status if all exercises are completed
-        if completed_exercises == total_exercises:
-            lesson_progress.status = 'completed'
-    
-    # Update topic progress
-    lesson = Lesson.query.get(exercise.lesson_id)
-    topic_progress = TopicProgress.query.filter_by(
-        child_id=child_id,
-        topic_id=lesson.topic_id
-    ).first()
-    
-    if not topic_progress:
-        topic_progress = TopicProgress(
-            child_id=child_id,
-            topic_id=lesson.topic_id
-        )
-        db.session.add(topic_progress)
-    
-    # Calculate topic progress percentage
-    total_lessons = Lesson.query.filter_by(topic_id=lesson.topic_id).count()
-    completed_lessons = LessonProgress.query.filter_by(
-        child_id=child_id,
-        status='completed'
-    ).join(Lesson).filter(Lesson.topic_id == lesson.topic_id).count()
+    # Keep the per-attempt history; ProgressRecord only holds the latest state
+    first_completions = LeaderboardService.first_completions({(child_id, exercise_id)})
+    attempt = AttemptLogService.append(progress, time_spent=data.get('time_spent'))
+    leaderboard_increments = LeaderboardService.completion_increments(first_completions, [attempt])
     
-    if total_lessons > 0:
-        topic_progress.progress_percentage = (completed_lessons / total_lessons) * 100
-        topic_progress.lessons_completed = completed_lessons
+    # Schedule the exercise's next spaced-repetition review
+    ReviewService.record_reviews([{
+        'child_id': child_id, 'exercise_id': exercise_id, 'score': data['score'], 'reviewed_at': attempt.attempted_at
+    }])
     
-    # Update exercises completed count
-    topic_progress.exercises_completed = ProgressRecord.query.filter_by(
-        child_id=child_id,
-        completed=True
-    ).join(Exercise).join(Lesson).filter(Lesson.topic_id == lesson.topic_id).count()
+    # Update lesson and topic progress from the change in completion state
+    ProgressService.apply_exercise_result(child_id, exercise, was_completed, progress.completed)
     
     # Update daily activity
-    today = date.today()
-    daily_activity = DailyActivity.query.filter_by(
-        child_id=child_id,
-        date=today
-    ).first()
-    
-    if not daily_activity:
-        daily_activity = DailyActivity(
-            child_id=child_id,
-            date=today
-        )
-        db.session.add(daily_activity)
+    ProgressService.apply_daily_activity(
+        child_id, date.today(), exercises_completed=1, time_spent=data.get('time_spent') or 0,
+        score_sum=data['score'], score_count=1
+    )
+    
+    # Update the materialized summary
+    completion_delta = int(bool(progress.completed)) - int(was_completed)
+    ProgressService.apply_summary_delta(
+        child_id,
+        exercises_completed=completion_delta,
+        score_sum=progress.score - (previous_score or 0.0),
+        score_count=1 if previous_score is None else 0,
+        time_spent=data.get('time_spent') or 0,
+        recount_completions=bool(completion_delta)
+    )
     
-    daily_activity.exercises_completed += 1
-    if data.get('time_spent'):
-        daily_activity.time_spent += data['time_spent']
+    db.session.commit()
     
-    # Calculate average score for the day
-    daily_scores = ProgressRecord.query.filter_by(
-        child_id=child_id
-    ).filter(
-        db.func.date(ProgressRecord.created_at) == today
-    ).with_entities(ProgressRecord.score).all()
+    # Move the child up the year-group leaderboard for a first completion
+    LeaderboardService.add_scores(leaderboard_increments)
     
-    if daily_scores:
-        daily_activity.average_score = sum(score[0] for score in daily_scores) / len(daily_scores)
+    return jsonify(progress.to_dict()), 201
+
+MAX_BATCH_ATTEMPTS = 500
+
+def is_int(value):
+    """True for JSON integers (booleans are not ids or durations)."""
+    return isinstance(value, int) and not isinstance(value, bool)
+
+def attempt_field_error(item):
+    """The first type or range error in a batch attempt's fields, or None if they are valid."""
+    for field in ('child_id', 'exercise_id'):
+        if not is_int(item[field]):
+            return f"{field} must be an integer"
+    score = item['score']
+    if isinstance(score, bool) or not isinstance(score, (int, float)) or not 0 <= score <= 100:
+        return "score must be a number from 0 to 100"
+    time_spent = item.get('time_spent')
+    if time_spent is not None and not (is_int(time_spent) and time_spent >= 0):
+        return "time_spent must be a non-negative integer"
+    if 'completed' in item and not isinstance(item['completed'], bool):
+        return "completed must be a boolean"
+    return None
+
+@progress_bp.route('/attempts/batch', methods=['POST'])
+@jwt_required()
+def record_attempt_batch():
+    """Record many exercise attempts, for one or more children, in a single transaction."""
+    user_id = get_jwt_identity()
+    user_role = get_jwt().get('role')
     
+    data = request.json or {}
+    items = data.get('attempts')
+    
+    if not isinstance(items, list) or not items:
+        return jsonify({"error": "Missing required field: attempts"}), 400
+    if len(items) > MAX_BATCH_ATTEMPTS:
+        return jsonify({"error": f"A batch may contain at most {MAX_BATCH_ATTEMPTS} attempts"}), 400
+    
+    results = [None] * len(items)
+    candidates = []
+    access = {}
+    for index, item in enumerate(items):
+        if not isinstance(item, dict):
+            results[index] = {"index": index, "status": 400, "error": "Attempt must be an object"}
+            continue
+        
+        missing = [field for field in ('child_id', 'exercise_id', 'score') if field not in item]
+        if missing:
+            results[index] = {"index": index, "status": 400, "error": f"Missing required field: {missing[0]}"}
+            continue
+        
+        error = attempt_field_error(item)
+        if error:
+            results[index] = {"index": index, "status": 400, "error": error}
+            continue
+        
+        child_id = item['child_id']
+        if child_id not in access:
+            access[child_id] = bool(check_child_access(child_id, user_id, user_role))
+        if not access[child_id]:
+            results[index] = {"index": index, "status": 403, "error": "Access denied"}
+            continue
+        
+        now = datetime.utcnow()
+        attempted_at = now
+        if item.get('attempted_at'):
+            try:
+                attempted_at = datetime.fromisoformat(item['attempted_at'])
+            except (TypeError, ValueError):
+                results[index] = {"index": index, "status": 400, "error": "Invalid attempted_at"}
+                continue
+            # Stored timestamps are naive UTC
+            if attempted_at.tzinfo is not None:
+                attempted_at = attempted_at.astimezone(timezone.utc).replace(tzinfo=None)
+            if attempted_at > now:
+                results[index] = {"index": index, "status": 400, "error": "attempted_at is in the future"}
+                continue
+        
+        attempt = {
+            'child_id': child_id,
+            'score': item['score'],
+            'attempted_at': attempted_at,
+            'day': attempted_at.date() if item.get('attempted_at') else date.today()
+        }
+        for field in ('time_spent', 'completed'):
+            if field in item:
+                attempt[field] = item[field]
+        candidates.append((index, item['exercise_id'], attempt))
+    
+    # Load the exercises of the valid attempts, with their lessons and topics, in one query
+    exercise_ids = {exercise_id for _, exercise_id, _ in candidates}
+    exercises = {
+        exercise.id: exercise
+        for exercise in Exercise.query.options(
+            db.joinedload(Exercise.lesson).joinedload(Lesson.topic)
+        ).filter(Exercise.id.in_(exercise_ids)).all()
+    } if exercise_ids else {}
+    
+    accepted = []
+    for index, exercise_id, attempt in candidates:
+        exercise = exercises.get(exercise_id)
+        if exercise is None:
+            results[index] = {"index": index, "status": 404, "error": "Exercise not found"}
+            continue
+        attempt['exercise'] = exercise
+        accepted.append((index, attempt))
+    
+    # Upsert records and apply the rollups once per lesson, topic and day
+    first_completions = LeaderboardService.first_completions(
+        {(attempt['child_id'], attempt['exercise'].id) for _, attempt in accepted}
+    )
+    records, events = ProgressService.record_attempt_batch([attempt for _, attempt in accepted])
+    leaderboard_increments = LeaderboardService.completion_increments(first_completions, events)
     db.session.commit()
     
-    return jsonify(progress.to_dict()), 201
+    # Leaderboards count each exercise's first completion, not submissions
+    LeaderboardService.add_scores(leaderboard_increments)
+    
+    for (index, _), record in zip(accepted, records):
+        results[index] = {"index": index, "status": 201, "progress": record.to_dict()}
+    
+    return jsonify({
+        "recorded": len(accepted),
+        "failed": len(items) - len(accepted),
+        "results": results
+    }), 200
 
 @progress_bp.route('/children/<int:child_id>/progress/lessons/<int:lesson_id>', methods=['POST'])
 @jwt_required()
@@ -181,84 +295,62 @@ def update_lesson_progress(child_id, lesson_id):
     
     data = request.json
     
-    # Create or update lesson progress
+    # Create or update lesson progress, and the topic if the status changed
+    ProgressService.apply_lesson_update(child_id, lesson, data)
+    
+    # Update daily activity
+    ProgressService.apply_daily_activity(
+        child_id, date.today(), lessons_viewed=1, time_spent=data.get('time_spent') or 0
+    )
+    
+    # Update the materialized summary
+    ProgressService.apply_summary_delta(
+        child_id, time_spent=data.get('time_spent') or 0, recount_completions='status' in data
+    )
+    
+    db.session.commit()
+    
     lesson_progress = LessonProgress.query.filter_by(
         child_id=child_id,
         lesson_id=lesson_id
     ).first()
     
-    if not lesson_progress:
-        lesson_progress = LessonProgress(
-            child_id=child_id,
-            lesson_id=lesson_id,
-            status=data.get('status', 'in_progress'),
-            progress_percentage=data.get('progress_percentage', 0.0),
-            last_position=data.get('last_position'),
-            time_spent=data.get('time_spent', 0)
-        )
-        db.session.add(lesson_progress)
-    else:
-        if 'status' in data:
-            lesson_progress.status = data['status']
-        if 'progress_percentage' in data:
-            lesson_progress.progress_percentage = data['progress_percentage']
-        if 'last_position' in data:
-            lesson_progress.last_position = data['last_position']
-        if 'time_spent' in data:
-            lesson_progress.time_spent += data['time_spent']
-    
-    # Update topic progress if lesson is completed
-    if data.get('status') == 'completed':
-        topic_progress = TopicProgress.query.filter_by(
-            child_id=child_id,
-            topic_id=lesson.topic_id
-        ).first()
-        
-        if not topic_progress:
-            topic_progress = TopicProgress(
-                child_id=child_id,
-                topic_id=lesson.topic_id
-            )
-            db.session.add(topic_progress)
-        
-        # Calculate topic progress percentage
-        total_lessons = Lesson.query.filter_by(topic_id=lesson.topic_id).count()
-        completed_lessons = LessonProgress.query.filter_by(
-            child_id=child_id,
-            status='completed'
-        ).join(Lesson).filter(Lesson.topic_id == lesson.topic_id).count() + 1  # +1 for current lesson
-        
-        if total_lessons > 0:
-            topic_progress.progress_percentage = (completed_lessons / total_lessons) * 100
-            topic_progress.lessons_completed = completed_lessons
+    return jsonify(lesson_progress.to_dict()), 200
+
+@progress_bp.route('/children/<int:child_id>/progress/lessons/<int:lesson_id>/slides', methods=['GET'])
+@jwt_required()
+def resume_lesson_slides(child_id, lesson_id):
+    """Get a lesson's slides from the child's saved last_position onwards."""
+    # Check access
+    user_id = get_jwt_identity()
+    user_role = get_jwt().get('role')
     
-    # Update daily activity
-    today = date.today()
-    daily_activity = DailyActivity.query.filter_by(
-        child_id=child_id,
-        date=today
-    ).first()
+    if not check_child_access(child_id, user_id, user_role):
+        return jsonify({"error": "Access denied"}), 403
     
-    if not daily_activity:
-        daily_activity = DailyActivity(
-            child_id=child_id,
-            date=today
-        )
-        db.session.add(daily_activity)
+    count = request.args.get('count', 1, type=int)
+    if count < 1 or count > MAX_SLIDE_COUNT:
+        return jsonify({"error": f"count must be between 1 and {MAX_SLIDE_COUNT}"}), 400
     
-    daily_activity.lessons_viewed += 1
-    if data.get('time_spent'):
-        daily_activity.time_spent += data['time_spent']
+    snapshot = CurriculumSnapshotService.snapshot()
+    if lesson_id not in snapshot.lessons:
+        return jsonify({"error": "Lesson not found"}), 404
     
-    db.session.commit()
+    last_position = db.session.query(LessonProgress.last_position).filter_by(
+        child_id=child_id,
+        lesson_id=lesson_id
+    ).scalar()
+    # last_position is stored as free text such as "3" or "slide_3"; its trailing number is the slide index
+    position = re.search(r'(\d+)$', last_position or '')
+    start = int(position.group(1)) if position else 0
     
-    return jsonify(lesson_progress.to_dict()), 200
+    return Response(snapshot.slide_range(lesson_id, start, count), mimetype='application/json')
 
 # Progress retrieval routes
 @progress_bp.route('/children/<int:child_id>/progress/exercises', methods=['GET'])
 @jwt_required()
 def get_exercise_progress(child_id):
-    """Get progress for all exercises for a child."""
+    """Get progress for a child's exercises, one page at a time (ordered by exercise)."""
     # Check access
     user_id = get_jwt_identity()
     user_role = get_jwt().get('role')
@@ -266,6 +358,12 @@ def get_exercise_progress(child_id):
     if not check_child_access(child_id, user_id, user_role):
         return jsonify({"error": "Access denied"}), 403
     
+    # Answer unchanged polls from the child's progress watermark alone
+    watermark = progress_watermark(child_id)
+    cached = not_modified(watermark)
+    if cached:
+        return cached
+    
     # Filter by lesson if provided
     lesson_id = request.args.get('lesson_id', type=int)
     
@@ -273,13 +371,49 @@ def get_exercise_progress(child_id):
     if lesson_id:
         query = query.join(Exercise).filter(Exercise.lesson_id == lesson_id)
     
-    progress_records = query.all()
-    return jsonify([record.to_dict() for record in progress_records])
+    try:
+        limit, cursor = PaginationService.parse_args(request.args)
+        progress_records, next_cursor = PaginationService.paginate(
+            query, ProgressRecord.exercise_id, limit, cursor
+        )
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    
+    return with_watermark(jsonify(PaginationService.page(
+        [record.to_dict() for record in progress_records], limit, next_cursor
+    )), watermark)
+
+@progress_bp.route('/children/<int:child_id>/progress/exercises/<int:exercise_id>/attempts', methods=['GET'])
+@jwt_required()
+def get_exercise_attempts(child_id, exercise_id):
+    """Get the attempt history for one exercise, newest first."""
+    # Check access
+    user_id = get_jwt_identity()
+    user_role = get_jwt().get('role')
+    
+    if not check_child_access(child_id, user_id, user_role):
+        return jsonify({"error": "Access denied"}), 403
+    
+    # Answer unchanged polls from the child's progress watermark alone
+    watermark = progress_watermark(child_id)
+    cached = not_modified(watermark)
+    if cached:
+        return cached
+    
+    # Optionally restrict to one month bucket (YYYYMM)
+    month = request.args.get('month', type=int)
+    
+    query = AttemptEvent.query.filter_by(child_id=child_id, exercise_id=exercise_id)
+    if month:
+        query = query.filter(AttemptEvent.month == month)
+    
+    attempts = query.order_by(AttemptEvent.attempted_at.desc()).limit(100).all()
+    return with_watermark(jsonify([attempt.to_dict() for attempt in attempts]), watermark)
 
 @progress_bp.route('/children/<int:child_id>/progress/lessons', methods=['GET'])
 @jwt_required()
 def get_lesson_progress(child_id):
-    """Get progress for all lessons for a child."""
+    """Get progress for a child's lessons, one page at a time (ordered by lesson)."""
     # Check access
     user_id = get_jwt_identity()
     user_role = get_jwt().get('role')
@@ -287,6 +421,12 @@ def get_lesson_progress(child_id):
     if not check_child_access(child_id, user_id, user_role):
         return jsonify({"error": "Access denied"}), 403
     
+    # Answer unchanged polls from the child's progress watermark alone
+    watermark = progress_watermark(child_id)
+    cached = not_modified(watermark)
+    if cached:
+        return cached
+    
     # Filter by topic if provided
     topic_id = request.args.get('topic_id', type=int)
     
@@ -294,8 +434,17 @@ def get_lesson_progress(child_id):
     if topic_id:
         query = query.join(Lesson).filter(Lesson.topic_id == topic_id)
     
-    lesson_progress = query.all()
-    return jsonify([progress.to_dict() for progress in lesson_progress])
+    try:
+        limit, cursor = PaginationService.parse_args(request.args)
+        lesson_progress, next_cursor = PaginationService.paginate(
+            query, LessonProgress.lesson_id, limit, cursor
+        )
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    
+    return with_watermark(jsonify(PaginationService.page(
+        [progress.to_dict() for progress in lesson_progress], limit, next_cursor
+    )), watermark)
 
 @progress_bp.route('/children/<int:child_id>/progress/topics', methods=['GET'])
 @jwt_required()
@@ -308,6 +457,12 @@ def get_topic_progress(child_id):
     if not check_child_access(child_id, user_id, user_role):
         return jsonify({"error": "Access denied"}), 403
     
+    # Answer unchanged polls from the child's progress watermark alone
+    watermark = progress_watermark(child_id)
+    cached = not_modified(watermark)
+    if cached:
+        return cached
+    
     # Filter by year group if provided
     year_group = request.args.get('year_group', type=int)
     
@@ -316,12 +471,12 @@ def get_topic_progress(child_id):
         query = query.join(Topic).filter(Topic.year_group == year_group)
     
     topic_progress = query.all()
-    return jsonify([progress.to_dict() for progress in topic_progress])
+    return with_watermark(jsonify([progress.to_dict() for progress in topic_progress]), watermark)
 
 @progress_bp.route('/children/<int:child_id>/activity', methods=['GET'])
 @jwt_required()
 def get_daily_activity(child_id):
-    """Get daily activity for a child."""
+    """Get a child's activity per day, week or month, newest first, one page at a time."""
     # Check access
     user_id = get_jwt_identity()
     user_role = get_jwt().get('role')
@@ -329,19 +484,52 @@ def get_daily_activity(child_id):
     if not check_child_access(child_id, user_id, user_role):
         return jsonify({"error": "Access denied"}), 403
     
+    granularity = request.args.get('granularity', 'day')
+    if granularity != 'day' and granularity not in ActivityRollup.PERIODS:
+        return jsonify({"error": "granularity must be one of: day, week, month"}), 400
+    
+    # Answer unchanged polls from the child's progress watermark alone
+    watermark = progress_watermark(child_id)
+    cached = not_modified(watermark)
+    if cached:
+        return cached
+    
     # Filter by date range if provided
     start_date = request.args.get('start_date')
     end_date = request.args.get('end_date')
     
-    query = DailyActivity.query.filter_by(child_id=child_id)
+    if granularity == 'day':
+        query = DailyActivity.query.filter_by(child_id=child_id)
+        key_column = DailyActivity.date
+    else:
+        # Weeks and months come from the precomputed rollups; a range includes
+        # every period that overlaps it
+        query = ActivityRollup.query.filter_by(child_id=child_id, period=granularity)
+        key_column = ActivityRollup.period_start
+        try:
+            if start_date:
+                start_date = ActivityRollup.period_start_of(date.fromisoformat(start_date), granularity)
+            if end_date:
+                end_date = date.fromisoformat(end_date)
+        except ValueError:
+            return jsonify({"error": "Dates must be in YYYY-MM-DD format"}), 400
     
     if start_date:
-        query = query.filter(DailyActivity.date >= start_date)
+        query = query.filter(key_column >= start_date)
     if end_date:
-        query = query.filter(DailyActivity.date <= end_date)
+        query = query.filter(key_column <= end_date)
+    
+    try:
+        limit, cursor = PaginationService.parse_args(request.args)
+        activities, next_cursor = PaginationService.paginate(
+            query, key_column, limit, cursor, descending=True
+        )
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
     
-    activities = query.order_by(DailyActivity.date.desc()).all()
-    return jsonify([activity.to_dict() for activity in activities])
+    return with_watermark(jsonify(PaginationService.page(
+        [activity.to_dict() for activity in activities], limit, next_cursor
+    )), watermark)
 
 @progress_bp.route('/children/<int:child_id>/summary', methods=['GET'])
 @jwt_required()
@@ -354,57 +542,172 @@ def get_progress_summary(child_id):
     if not check_child_access(child_id, user_id, user_role):
         return jsonify({"error": "Access denied"}), 403
     
+    # Served from the materialized summary row; ?refresh=true recomputes it from the raw tables
+    refresh = request.args.get('refresh', '').lower() in ('1', 'true', 'yes')
+    
+    # Answer unchanged polls from the child's progress watermark and the curriculum version
+    watermark = progress_watermark(child_id, daily=True, curriculum=True)
+    cached = None if refresh else not_modified(watermark)
+    if cached:
+        return cached
+    
     # Get child profile
     child = ChildProfile.query.get_or_404(child_id)
     
-    # Get overall progress statistics
-    total_topics = Topic.query.filter_by(year_group=child.year_group).count()
-    completed_topics = TopicProgress.query.filter_by(
-        child_id=child_id,
-        progress_percentage=100
-    ).count()
+    summary = ProgressSummaryService.get(child_id, refresh=refresh)
+    totals = ProgressSummaryService.year_group_totals(child.year_group)
     
-    total_lessons = Lesson.query.join(Topic).filter(Topic.year_group == child.year_group).count()
-    completed_lessons = LessonProgress.query.filter_by(
-        child_id=child_id,
-        status='completed'
-    ).count()
+    # Get recent activity
+    recent_activity = DailyActivity.query.filter_by(child_id=child_id).order_by(DailyActivity.date.desc()).limit(7).all()
     
-    total_exercises = Exercise.query.join(Lesson).join(Topic).filter(Topic.year_group == child.year_group).count()
-    completed_exercises = ProgressRecord.query.filter_by(
-        child_id=child_id,
-        completed=True
-    ).count()
+    return with_watermark(jsonify(dict(
+        ProgressSummaryService.payload(child, summary, totals),
+        recent_activity=[activity.to_dict() for activity in recent_activity]
+    )), watermark)
+
+@progress_bp.route('/children/<int:child_id>/streak', methods=['GET'])
+@jwt_required()
+def get_streak(child_id):
+    """Get a child's current and longest days-in-a-row streaks."""
+    # Check access
+    user_id = get_jwt_identity()
+    user_role = get_jwt().get('role')
+    
+    if not check_child_access(child_id, user_id, user_role):
+        return jsonify({"error": "Access denied"}), 403
     
-    # Calculate average scores
-    average_score = db.session.query(db.func.avg(ProgressRecord.score)).filter_by(child_id=child_id).scalar() or 0
+    watermark = progress_watermark(child_id, daily=True)
+    cached = not_modified(watermark)
+    if cached:
+        return cached
     
-    # Get recent activity
-    recent_activity = DailyActivity.query.filter_by(child_id=child_id).order_by(DailyActivity.date.desc()).limit(7).all()
+    ChildProfile.query.get_or_404(child_id)
+    summary = db.session.get(ChildProgressSummary, child_id)
+    
+    return with_watermark(jsonify(dict(child_id=child_id, **StreakService.payload(summary))), watermark)
+
+MAX_REVIEW_LIMIT = 100
+
+@progress_bp.route('/children/<int:child_id>/reviews', methods=['GET'])
+@jwt_required()
+def get_review_queue(child_id):
+    """Get a child's next spaced-repetition reviews, soonest due first."""
+    # Check access
+    user_id = get_jwt_identity()
+    user_role = get_jwt().get('role')
+    
+    if not check_child_access(child_id, user_id, user_role):
+        return jsonify({"error": "Access denied"}), 403
+    
+    limit = request.args.get('limit', 20, type=int)
+    if limit < 1 or limit > MAX_REVIEW_LIMIT:
+        return jsonify({"error": f"limit must be between 1 and {MAX_REVIEW_LIMIT}"}), 400
+    
+    # By default only reviews that are due now; ?due_only=false looks ahead
+    now = datetime.utcnow()
+    due_only = request.args.get('due_only', 'true').lower() not in ('0', 'false', 'no')
+    
+    schedules = ReviewService.queue(child_id, limit, due_before=now if due_only else None)
+    
+    return jsonify({
+        "due_count": ReviewService.due_count(child_id, now),
+        "items": [
+            dict(schedule.to_dict(), exercise=schedule.exercise.to_dict() if schedule.exercise else None)
+            for schedule in schedules
+        ]
+    })
+
+MAX_RECOMMENDATION_LIMIT = 20
+
+@progress_bp.route('/children/<int:child_id>/recommendations', methods=['GET'])
+@jwt_required()
+def get_recommendations(child_id):
+    """Get the next lessons a child is ready for, in progress first, then curriculum order."""
+    # Check access
+    user_id = get_jwt_identity()
+    user_role = get_jwt().get('role')
     
-    # Calculate total time spent
-    total_time_spent = db.session.query(db.func.sum(DailyActivity.time_spent)).filter_by(child_id=child_id).scalar() or 0
+    if not check_child_access(child_id, user_id, user_role):
+        return jsonify({"error": "Access denied"}), 403
+    
+    limit = request.args.get('limit', 5, type=int)
+    if limit < 1 or limit > MAX_RECOMMENDATION_LIMIT:
+        return jsonify({"error": f"limit must be between 1 and {MAX_RECOMMENDATION_LIMIT}"}), 400
+    
+    child = ChildProfile.query.get_or_404(child_id)
+    if not child.year_group:
+        return jsonify({"error": "Child has no year group"}), 400
     
     return jsonify({
         "child_id": child_id,
         "year_group": child.year_group,
-        "topics": {
-            "total": total_topics,
-            "completed": completed_topics,
-            "percentage": (completed_topics / total_topics * 100) if total_topics > 0 else 0
-        },
-        "lessons": {
-            "total": total_lessons,
-            "completed": completed_lessons,
-            "percentage": (completed_lessons / total_lessons * 100) if total_lessons > 0 else 0
-        },
-        "exercises": {
-            "total": total_exercises,
-            "completed": completed_exercises,
-            "percentage": (completed_exercises / total_exercises * 100) if total_exercises > 0 else 0
-        },
-        "average_score": average_score,
-        "total_time_spent": total_time_spent,
-        "recent_activity": [activity.to_dict() for activity in recent_activity]
+        "curriculum_version": CurriculumGraphService.graph().version,
+        "lessons": CurriculumGraphService.recommend(child, limit)
     })
 
+@progress_bp.route('/dashboard', methods=['GET'])
+@jwt_required()
+def get_family_dashboard():
+    """Get summaries, topic progress and unviewed achievements for all of the parent's children."""
+    user_id = get_jwt_identity()
+    user_role = get_jwt().get('role')
+    
+    if user_role != UserRole.PARENT.value:
+        return jsonify({"error": "Access denied"}), 403
+    
+    parent = ParentProfile.query.filter_by(user_id=user_id).first()
+    if not parent:
+        return jsonify({"error": "Parent profile not found"}), 404
+    
+    return jsonify(DashboardService.family_dashboard(parent))
+
+@progress_bp.route('/children/<int:child_id>/export', methods=['GET'])
+@jwt_required()
+def export_child_history(child_id):
+    """Stream a child's complete learning history as NDJSON, one row per line."""
+    # Check access
+    user_id = get_jwt_identity()
+    user_role = get_jwt().get('role')
+    
+    if not check_child_access(child_id, user_id, user_role):
+        return jsonify({"error": "Access denied"}), 403
+    
+    ChildProfile.query.get_or_404(child_id)
+    
+    return Response(
+        stream_with_context(ExportService.child_history_lines(child_id)),
+        mimetype='application/x-ndjson',
+        headers={'Content-Disposition': f'attachment; filename=child-{child_id}-history.ndjson'}
+    )
+
+
+@progress_bp.route('/leaderboard', methods=['GET'])
+@jwt_required()
+def get_leaderboard():
+    """Get this week's top children in a year group."""
+    year_group = request.args.get('year_group', type=int)
+    if year_group is None:
+        return jsonify({"error": "Missing required parameter: year_group"}), 400
+    
+    limit = request.args.get('limit', 10, type=int)
+    if limit < 1 or limit > MAX_LEADERBOARD_LIMIT:
+        return jsonify({"error": f"limit must be between 1 and {MAX_LEADERBOARD_LIMIT}"}), 400
+    
+    return jsonify(LeaderboardService.top(year_group, limit))
+
+@progress_bp.route('/children/<int:child_id>/leaderboard', methods=['GET'])
+@jwt_required()
+def get_child_leaderboard_rank(child_id):
+    """Get a child's rank and score on this week's year-group leaderboard."""
+    # Check access
+    user_id = get_jwt_identity()
+    user_role = get_jwt().get('role')
+    
+    if not check_child_access(child_id, user_id, user_role):
+        return jsonify({"error": "Access denied"}), 403
+    
+    child = ChildProfile.query.get_or_404(child_id)
+    if child.year_group is None:
+        return jsonify({"error": "Child has no year group"}), 400
+    
+    return jsonify(LeaderboardService.child_rank(child))
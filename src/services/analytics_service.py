@@ -0,0 +1,286 @@
+import threading
+from datetime import datetime
+import numpy as np
+from src.models import ProgressRecord, ChildProgressSummary, ChildProfile, Exercise, Lesson, Topic, db
+
+SCORE_PERCENTILES = (25, 50, 75, 90)
+TIME_PERCENTILES = (50, 75, 90, 95)
+SCORE_BUCKETS = 10  # 0-10, 10-20, ..., 90-100
+LOAD_CHUNK_SIZE = 50000
+
+# One computed report per worker, replaced when the data watermark moves
+_cache = {'watermark': None, 'report': None}
+_cache_lock = threading.Lock()
+
+class AnalyticsService:
+    """
+    Cohort analytics over every child's progress records, for admins.
+
+    Progress records are loaded into NumPy columns, and topics and year
+    groups are mapped to dense integer indexes, so every statistic is a
+    vectorized group-by (lexsort, bincount, unique) rather than a loop over
+    rows. The report is cached per worker until the data watermark changes.
+    """
+
+    @staticmethod
+    def watermark():
+        """
+        A tuple that changes whenever the analytics input changes, read in one query.
+
+        Every progress write bumps the child's summary version, so the sum of
+        versions covers progress records; children and the curriculum are
+        covered by their counts, year groups and latest updates.
+        """
+        def scalar(column, table):
+            return db.select(column).select_from(table).scalar_subquery()
+
+        return tuple(db.session.query(
+            scalar(db.func.count(), ChildProgressSummary),
+            scalar(db.func.coalesce(db.func.sum(ChildProgressSummary.version), 0), ChildProgressSummary),
+            scalar(db.func.count(), ChildProfile),
+            scalar(db.func.coalesce(db.func.sum(ChildProfile.year_group), 0), ChildProfile),
+            scalar(db.func.count(), Exercise),
+            scalar(db.func.max(Exercise.updated_at), Exercise),
+            scalar(db.func.max(Lesson.updated_at), Lesson),
+            scalar(db.func.max(Topic.updated_at), Topic),
+        ).one())
+
+    @staticmethod
+    def cohort_report():
+        """
+        The cohort report, recomputed only when the watermark has moved.
+
+        Concurrent requests wait for a single computation instead of each
+        loading the whole progress table.
+        """
+        watermark = AnalyticsService.watermark()
+        with _cache_lock:
+            if _cache['watermark'] != watermark:
+                _cache['report'] = AnalyticsService.compute_report()
+                _cache['watermark'] = watermark
+            return _cache['report']
+
+    @staticmethod
+    def load_records(chunk_size=LOAD_CHUNK_SIZE):
+        """
+        Load every progress record as NumPy columns (child_id, exercise_id, score, time_spent, completed).
+
+        Rows are fetched `chunk_size` at a time and each chunk is converted
+        to arrays straight away, so only one chunk of row tuples is alive at
+        once. A missing time_spent becomes NaN.
+        """
+        dtypes = {
+            'child_id': np.int64, 'exercise_id': np.int64,
+            'score': np.float64, 'time_spent': np.float64, 'completed': bool
+        }
+        chunks = {name: [] for name in dtypes}
+        statement = db.select(
+            ProgressRecord.child_id, ProgressRecord.exercise_id, ProgressRecord.score,
+            ProgressRecord.time_spent, ProgressRecord.completed
+        ).execution_options(yield_per=chunk_size)
+
+        for partition in db.session.execute(statement).partitions():
+            for name, values in zip(dtypes, zip(*partition)):
+                chunks[name].append(np.array(values, dtype=dtypes[name]))
+
+        return {
+            name: np.concatenate(parts) if parts else np.empty(0, dtype=dtypes[name])
+            for name, parts in chunks.items()
+        }
+
+    @staticmethod
+    def lookup(pairs, default=-1):
+        """Dense lookup array from (id, value) pairs, so mapping a column of ids is one fancy-index."""
+        ids = np.array([pair[0] for pair in pairs], dtype=np.int64)
+        table = np.full(int(ids.max()) + 1 if len(ids) else 1, default, dtype=np.int64)
+        table[ids] = [pair[1] for pair in pairs]
+        return table
+
+    @staticmethod
+    def group_percentiles(groups, values, group_count, percentiles):
+        """
+        (counts, matrix) of per-group percentiles, linear interpolation as np.percentile.
+
+        Values are sorted by (group, value) once; each group is then a
+        contiguous run, so every percentile of every group is one indexed
+        read. Rows with a negative group or a NaN value are ignored.
+        """
+        keep = (groups >= 0) & ~np.isnan(values)
+        groups, values = groups[keep], values[keep]
+        values = values[np.lexsort((values, groups))]
+
+        counts = np.bincount(groups, minlength=group_count)
+        starts = np.cumsum(counts) - counts
+        matrix = np.full((group_count, len(percentiles)), np.nan)
+        present = counts > 0
+        for column, percentile in enumerate(percentiles):
+            position = starts[present] + (counts[present] - 1) * percentile / 100
+            lower = np.floor(position).astype(np.int64)
+            upper = np.ceil(position).astype(np.int64)
+            matrix[present, column] = values[lower] + (values[upper] - values[lower]) * (position - lower)
+        return counts, matrix
+
+    @staticmethod
+    def score_distribution(groups, scores, group_count):
+        """Per-group count, mean, percentiles and 10-point histogram of scores."""
+        counts, matrix = AnalyticsService.group_percentiles(groups, scores, group_count, SCORE_PERCENTILES)
+        keep = groups >= 0
+        sums = np.bincount(groups[keep], weights=scores[keep], minlength=group_count)
+        buckets = np.clip(scores[keep] // (100 / SCORE_BUCKETS), 0, SCORE_BUCKETS - 1).astype(np.int64)
+        histogram = np.bincount(
+            groups[keep] * SCORE_BUCKETS + buckets, minlength=group_count * SCORE_BUCKETS
+        ).reshape(group_count, SCORE_BUCKETS)
+
+        with np.errstate(invalid='ignore', divide='ignore'):
+            means = sums / counts
+        return [
+            {
+                'count': int(counts[group]),
+                'mean': _number(means[group]),
+                'percentiles': _percentile_dict(SCORE_PERCENTILES, matrix[group]),
+                'histogram': histogram[group].tolist()
+            }
+            for group in range(group_count)
+        ]
+
+    @staticmethod
+    def time_on_task(groups, times, group_count):
+        """Per-group count and percentiles of time spent (seconds) on each exercise."""
+        counts, matrix = AnalyticsService.group_percentiles(groups, times, group_count, TIME_PERCENTILES)
+        return [
+            {'count': int(counts[group]), 'percentiles': _percentile_dict(TIME_PERCENTILES, matrix[group])}
+            for group in range(group_count)
+        ]
+
+    @staticmethod
+    def completion_funnel(child_ids, groups, completed, group_count, eligible, exercise_totals):
+        """
+        Per-group funnel: eligible children, children who started, completed any and completed every exercise.
+
+        Records are unique per (child, exercise), so counting completed
+        records per (child, group) pair gives completed exercises per pair.
+        """
+        if group_count == 0:
+            return []
+        keep = groups >= 0
+        child_ids, groups, completed = child_ids[keep], groups[keep], completed[keep]
+        pairs = child_ids * group_count + groups
+
+        started_pairs = np.unique(pairs)
+        completed_pairs, completed_counts = np.unique(pairs[completed], return_counts=True)
+        completed_groups = completed_pairs % group_count
+        finished = completed_counts >= np.maximum(exercise_totals[completed_groups], 1)
+
+        started = np.bincount(started_pairs % group_count, minlength=group_count)
+        completed_any = np.bincount(completed_groups, minlength=group_count)
+        completed_all = np.bincount(completed_groups[finished], minlength=group_count)
+        return [
+            {
+                'eligible': int(eligible[group]),
+                'started': int(started[group]),
+                'completed_any': int(completed_any[group]),
+                'completed_all': int(completed_all[group])
+            }
+            for group in range(group_count)
+        ]
+
+    @staticmethod
+    def compute_report():
+        """
+        Score distributions, completion funnels and time-on-task percentiles per topic and per year group.
+
+        Topic statistics cover every record on the topic's exercises; year
+        group statistics cover a cohort, i.e. the records of children in
+        that year group, and their funnel is measured against the exercises
+        of that year group's own topics.
+        """
+        topics = db.session.query(Topic.id, Topic.name, Topic.year_group).order_by(
+            Topic.year_group, Topic.order, Topic.id
+        ).all()
+        children = db.session.query(ChildProfile.id, ChildProfile.year_group).all()
+        exercises = db.session.query(Exercise.id, Lesson.topic_id).join(Lesson, Lesson.id == Exercise.lesson_id).all()
+        records = AnalyticsService.load_records()
+
+        year_groups = sorted(
+            {topic.year_group for topic in topics if topic.year_group is not None}
+            | {child.year_group for child in children if child.year_group is not None}
+        )
+        year_index = {year_group: index for index, year_group in enumerate(year_groups)}
+        topic_count, year_count = len(topics), len(year_groups)
+
+        topic_index = AnalyticsService.lookup([(topic.id, index) for index, topic in enumerate(topics)])
+        topic_year = np.array([year_index.get(topic.year_group, -1) for topic in topics], dtype=np.int64)
+        child_year = AnalyticsService.lookup(
+            [(child.id, year_index.get(child.year_group, -1)) for child in children]
+        )
+        exercise_topic = AnalyticsService.lookup(
+            [(exercise_id, topic_index[topic_id]) for exercise_id, topic_id in exercises]
+        )
+
+        # Exercise totals and cohort sizes per group
+        mapped_exercises = exercise_topic[exercise_topic >= 0]
+        topic_exercises = np.bincount(mapped_exercises, minlength=topic_count)
+        year_exercises = np.bincount(
+            topic_year[topic_year >= 0], weights=topic_exercises[topic_year >= 0], minlength=year_count
+        ).astype(np.int64)
+        cohort_years = child_year[child_year >= 0]
+        cohort_sizes = np.bincount(cohort_years, minlength=year_count)
+
+        # Map each record to its topic and to its child's cohort
+        record_topic = _index(exercise_topic, records['exercise_id'])
+        record_year = _index(child_year, records['child_id'])
+        own_topic_year = np.where(record_topic >= 0, topic_year[np.maximum(record_topic, 0)], -1)
+        record_cohort_topic = np.where(own_topic_year == record_year, record_year, -1)
+        topic_eligible = np.where(topic_year >= 0, cohort_sizes[np.maximum(topic_year, 0)], 0)
+
+        by_topic = {
+            'funnel': AnalyticsService.completion_funnel(
+                records['child_id'], record_topic, records['completed'], topic_count,
+                topic_eligible, topic_exercises
+            ),
+            'scores': AnalyticsService.score_distribution(record_topic, records['score'], topic_count),
+            'time_on_task': AnalyticsService.time_on_task(record_topic, records['time_spent'], topic_count)
+        }
+        by_year = {
+            'funnel': AnalyticsService.completion_funnel(
+                records['child_id'], record_cohort_topic, records['completed'], year_count,
+                cohort_sizes, year_exercises
+            ),
+            'scores': AnalyticsService.score_distribution(record_year, records['score'], year_count),
+            'time_on_task': AnalyticsService.time_on_task(record_year, records['time_spent'], year_count)
+        }
+
+        return {
+            'computed_at': datetime.utcnow().isoformat(),
+            'records': int(len(records['score'])),
+            'year_groups': [
+                {
+                    'year_group': year_group,
+                    'children': int(cohort_sizes[index]),
+                    'exercises': int(year_exercises[index]),
+                    **{name: stats[index] for name, stats in by_year.items()}
+                }
+                for index, year_group in enumerate(year_groups)
+            ],
+            'topics': [
+                {
+                    'topic_id': topic.id,
+                    'name': topic.name,
+                    'year_group': topic.year_group,
+                    'exercises': int(topic_exercises[index]),
+                    **{name: stats[index] for name, stats in by_topic.items()}
+                }
+                for index, topic in enumerate(topics)
+            ]
+        }
+
+def _index(table, ids):
+    """table[ids], with -1 for ids beyond the end of the lookup table."""
+    inside = ids < len(table)
+    return np.where(inside, table[np.where(inside, ids, 0)], -1)
+
+def _number(value):
+    return None if np.isnan(value) else round(float(value), 2)
+
+def _percentile_dict(percentiles, values):
+    return {f'p{percentile}': _number(value) for percentile, value in zip(percentiles, values)}
@@ -0,0 +1,118 @@
+from datetime import datetime
+from src.models import AttemptEvent, ProgressRecord, db
+from src.services.progress_summary_service import ProgressSummaryService
+
+class AttemptLogService:
+    @staticmethod
+    def append(progress, time_spent=None, attempted_at=None):
+        """
+        Append one attempt to the log.
+
+        `progress` is the ProgressRecord after the attempt was applied; the
+        event captures its score, completion state and attempt count so the
+        record can be re-derived from the log alone.
+        """
+        attempted_at = attempted_at or datetime.utcnow()
+        event = AttemptEvent(
+            month=AttemptEvent.month_of(attempted_at),
+            child_id=progress.child_id,
+            exercise_id=progress.exercise_id,
+            score=progress.score,
+            time_spent=time_spent,
+            completed=bool(progress.completed),
+            attempt_number=progress.attempts,
+            attempted_at=attempted_at
+        )
+        db.session.add(event)
+        return event
+
+    @staticmethod
+    def month_query(month, child_id=None):
+        """Events in one month bucket, in the order they were written."""
+        query = AttemptEvent.query.filter(AttemptEvent.month == month)
+        if child_id is not None:
+            query = query.filter(AttemptEvent.child_id == child_id)
+        return query.order_by(AttemptEvent.id)
+
+    @staticmethod
+    def months(since=None):
+        """Month buckets present in the log, oldest first."""
+        query = db.session.query(AttemptEvent.month).distinct()
+        if since is not None:
+            query = query.filter(AttemptEvent.month >= since)
+        return [row[0] for row in query.order_by(AttemptEvent.month).all()]
+
+    @staticmethod
+    def replay_month(month, chunk_size=1000, replayed=None):
+        """
+        Re-derive the ProgressRecord of every (child, exercise) with an event in one month bucket.
+
+        A pair's state comes from its whole log, not just this bucket, since
+        an offline batch can backdate an attempt into an earlier month: the
+        event with the highest attempt_number (then id) wins and attempts is
+        the pair's event count. Pairs in `replayed` are skipped and rebuilt
+        ones are added to it, so replay() derives each pair once. Returns the
+        number of records written.
+        """
+        replayed = set() if replayed is None else replayed
+        keys = sorted(set(
+            AttemptLogService.month_query(month).with_entities(
+                AttemptEvent.child_id, AttemptEvent.exercise_id
+            ).order_by(None).distinct()
+        ) - replayed)
+
+        for start in range(0, len(keys), chunk_size):
+            chunk = keys[start:start + chunk_size]
+            wanted = set(chunk)
+            child_ids = {child_id for child_id, _ in chunk}
+            exercise_ids = {exercise_id for _, exercise_id in chunk}
+
+            latest = {}
+            for event in AttemptEvent.query.filter(
+                AttemptEvent.child_id.in_(child_ids),
+                AttemptEvent.exercise_id.in_(exercise_ids)
+            ).order_by(AttemptEvent.attempt_number, AttemptEvent.id).yield_per(chunk_size):
+                key = (event.child_id, event.exercise_id)
+                if key not in wanted:
+                    continue
+                previous = latest.get(key)
+                time_spent = event.time_spent
+                if time_spent is None and previous:
+                    # Attempts without a time keep the previous one, as the route does
+                    time_spent = previous[1]
+                latest[key] = (event.score, time_spent, event.completed, (previous[3] if previous else 0) + 1)
+
+            records = {
+                (record.child_id, record.exercise_id): record
+                for record in ProgressRecord.query.filter(
+                    ProgressRecord.child_id.in_(child_ids),
+                    ProgressRecord.exercise_id.in_(exercise_ids)
+                ).all()
+            }
+
+            for key in chunk:
+                score, time_spent, completed, attempts = latest[key]
+                record = records.get(key)
+                if record is None:
+                    record = ProgressRecord(child_id=key[0], exercise_id=key[1])
+                    db.session.add(record)
+                record.score = score
+                if time_spent is not None:
+                    record.time_spent = time_spent
+                record.completed = completed
+                record.attempts = attempts
+
+            ProgressSummaryService.bump_versions(child_ids)
+            db.session.commit()
+            replayed.update(chunk)
+
+        return len(keys)
+
+    @staticmethod
+    def replay(since=None, chunk_size=1000):
+        """Replay every month bucket from `since` (YYYYMM) onwards; returns {month: records written}."""
+        replayed = set()
+        return {
+            month: AttemptLogService.replay_month(month, chunk_size=chunk_size, replayed=replayed)
+            for month in AttemptLogService.months(since)
+        }
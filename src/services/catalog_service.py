@@ -0,0 +1,70 @@
+import threading
+import time
+from src.models import AchievementType, Reward, CatalogVersion, db
+from src.services.curriculum_graph_service import VERSION_CHECK_SECONDS
+
+# Public catalogs versioned in catalog_versions, and how to load each one in listing order
+CATALOG_LOADERS = {
+    'achievement_types': lambda: AchievementType.query.order_by(AchievementType.id).all(),
+    'rewards': lambda: Reward.query.order_by(Reward.id).all(),
+}
+
+_cache = {'versions': None, 'checked_at': 0.0, 'catalogs': {}}
+_cache_lock = threading.Lock()
+
+class CatalogService:
+    """
+    Per-worker, versioned copies of the achievement-type and reward catalogs.
+
+    Every admin write to a catalog bumps its row in catalog_versions. A
+    worker re-reads all the versions with one query at most every
+    VERSION_CHECK_SECONDS and reloads a catalog only when its version has
+    moved, so the version (and the ETag built from it) costs no query on
+    most requests.
+    """
+
+    @staticmethod
+    def versions():
+        """{catalog name: version} as last read by this worker."""
+        now = time.monotonic()
+        cached = _cache['versions']
+        if cached is not None and now - _cache['checked_at'] < VERSION_CHECK_SECONDS:
+            return cached
+
+        with _cache_lock:
+            _cache['versions'] = dict(db.session.query(CatalogVersion.name, CatalogVersion.version).all())
+            _cache['checked_at'] = now
+            return _cache['versions']
+
+    @staticmethod
+    def version(name):
+        """The version of one catalog (0 before its first admin write)."""
+        return CatalogService.versions().get(name, 0)
+
+    @staticmethod
+    def bump_version(name):
+        """Mark a catalog as changed, in the caller's transaction, and make this worker re-read the versions."""
+        updated = db.session.execute(db.update(CatalogVersion.__table__).where(
+            CatalogVersion.name == name
+        ).values(version=CatalogVersion.version + 1)).rowcount
+        if not updated:
+            db.session.add(CatalogVersion(name=name, version=1))
+        _cache['checked_at'] = 0.0
+
+    @staticmethod
+    def catalog(name):
+        """
+        (version, {id: dict}, listing) for a catalog, loaded once per version.
+
+        The listing holds every item in id order; callers filter it (the
+        reward listing only shows active rewards).
+        """
+        version = CatalogService.version(name)
+        cached = _cache['catalogs'].get(name)
+        if cached is not None and cached[0] == version:
+            return cached
+
+        items = tuple(item.to_dict() for item in CATALOG_LOADERS[name]())
+        loaded = (version, {item['id']: item for item in items}, items)
+        _cache['catalogs'][name] = loaded
+        return loaded
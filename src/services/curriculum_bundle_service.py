@@ -0,0 +1,142 @@
+import hashlib
+import json
+import os
+import re
+import threading
+from datetime import datetime
+from src.services.curriculum_snapshot_service import CurriculumSnapshotService
+
+# Bundles live under <static folder>/curriculum, next to the manifest that lists them
+BUNDLE_DIR = 'curriculum'
+MANIFEST_NAME = 'manifest.json'
+# Bundle file names carry their content hash, so CDNs and clients may keep them for good
+BUNDLE_MAX_AGE = 365 * 24 * 3600
+BUNDLE_NAME = re.compile(r'^(year-\d+|topic-\d+)\.[0-9a-f]{16}\.json$')
+
+_manifest_cache = {'mtime': None, 'manifest': None}
+_manifest_lock = threading.Lock()
+
+class CurriculumBundleService:
+    """
+    Compiles the curriculum into static, content-hashed JSON bundles.
+
+    There is one bundle per year group and one per topic. Each nests its
+    topics' lessons and exercises as the public API serializes them
+    (Exercise.to_dict leaves out answer_data). A bundle's file name
+    carries the hash of its bytes, so unchanged topics keep their URL from
+    build to build and every file can be cached forever. The manifest,
+    written last, maps year groups and topics to their current bundles.
+    """
+
+    @staticmethod
+    def bundle_dir(static_folder):
+        """The directory bundles and the manifest are written to."""
+        return os.path.join(static_folder, BUNDLE_DIR)
+
+    @staticmethod
+    def topic_tree(snapshot, topic):
+        """A topic with its lessons and their exercises, from the snapshot."""
+        return dict(topic, lessons=[
+            dict(lesson, exercises=list(snapshot.exercises_by_lesson[lesson['id']]))
+            for lesson in snapshot.lessons_by_topic[topic['id']]
+        ])
+
+    @staticmethod
+    def encode(document):
+        """Deterministic JSON bytes, so identical content always hashes the same."""
+        return json.dumps(document, sort_keys=True, separators=(',', ':')).encode('utf-8')
+
+    @staticmethod
+    def write_atomic(path, body):
+        """Write through a temporary file and rename, so readers never see a partial file."""
+        temporary = f'{path}.tmp{os.getpid()}'
+        with open(temporary, 'wb') as handle:
+            handle.write(body)
+        os.replace(temporary, path)
+
+    @staticmethod
+    def write_bundle(directory, stem, body):
+        """Write one bundle under its content-hashed name (skipped if already there) and describe it."""
+        digest = hashlib.sha256(body).hexdigest()
+        name = f'{stem}.{digest[:16]}.json'
+        path = os.path.join(directory, name)
+        written = not os.path.exists(path)
+        if written:
+            CurriculumBundleService.write_atomic(path, body)
+        return {'path': f'{BUNDLE_DIR}/{name}', 'sha256': digest, 'bytes': len(body)}, written
+
+    @staticmethod
+    def build(static_folder, prune=False):
+        """
+        Compile fresh bundles and the manifest into `static_folder`.
+
+        Reads the curriculum with one query per table (a fresh snapshot).
+        With `prune`, bundle files the new manifest no longer lists are
+        deleted; otherwise they are kept for clients still holding an older
+        manifest. Returns (manifest, files written, files pruned).
+        """
+        snapshot = CurriculumSnapshotService.load()
+        directory = CurriculumBundleService.bundle_dir(static_folder)
+        os.makedirs(directory, exist_ok=True)
+
+        trees = {topic_id: CurriculumBundleService.topic_tree(snapshot, topic)
+                 for topic_id, topic in snapshot.topics.items()}
+        year_groups, topics, written = {}, {}, 0
+
+        for year_group, year_topics in snapshot.topics_by_year.items():
+            if year_group is None:
+                continue
+            entry, new = CurriculumBundleService.write_bundle(directory, f'year-{year_group}', CurriculumBundleService.encode({
+                'year_group': year_group,
+                'topics': [trees[topic['id']] for topic in year_topics]
+            }))
+            year_groups[str(year_group)] = entry
+            written += new
+
+        for topic_id, tree in trees.items():
+            entry, new = CurriculumBundleService.write_bundle(directory, f'topic-{topic_id}', CurriculumBundleService.encode({
+                'topic': tree
+            }))
+            topics[str(topic_id)] = dict(entry, year_group=tree['year_group'], name=tree['name'])
+            written += new
+
+        manifest = {
+            'curriculum_version': snapshot.version,
+            'built_at': datetime.utcnow().isoformat(),
+            'year_groups': year_groups,
+            'topics': topics
+        }
+        CurriculumBundleService.write_atomic(
+            os.path.join(directory, MANIFEST_NAME), json.dumps(manifest, indent=2, sort_keys=True).encode('utf-8')
+        )
+
+        pruned = 0
+        if prune:
+            listed = {entry['path'].rsplit('/', 1)[1] for entry in list(year_groups.values()) + list(topics.values())}
+            for name in os.listdir(directory):
+                if BUNDLE_NAME.match(name) and name not in listed:
+                    os.remove(os.path.join(directory, name))
+                    pruned += 1
+        return manifest, written, pruned
+
+    @staticmethod
+    def manifest(static_folder):
+        """
+        (body bytes, etag) of the built manifest, or None if none has been built.
+
+        The file is re-read only when its modification time changes, so
+        serving it costs one stat() and no query.
+        """
+        path = os.path.join(CurriculumBundleService.bundle_dir(static_folder), MANIFEST_NAME)
+        try:
+            mtime = os.stat(path).st_mtime_ns
+        except FileNotFoundError:
+            return None
+
+        with _manifest_lock:
+            if _manifest_cache['mtime'] != mtime:
+                with open(path, 'rb') as handle:
+                    body = handle.read()
+                _manifest_cache['manifest'] = (body, f'manifest-{hashlib.sha256(body).hexdigest()[:16]}')
+                _manifest_cache['mtime'] = mtime
+            return _manifest_cache['manifest']
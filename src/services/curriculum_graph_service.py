@@ -0,0 +1,218 @@
+import heapq
+import threading
+import time
+from collections import namedtuple
+from src.models import (
+    Topic, Lesson, TopicPrerequisite, LessonPrerequisite, CurriculumVersion, LessonProgress, db
+)
+
+# How long a worker trusts its compiled graph before re-reading the curriculum version
+VERSION_CHECK_SECONDS = 1.0
+
+LessonNode = namedtuple('LessonNode', 'id topic_id topic_name year_group title difficulty estimated_time rank')
+
+_cache = {'graph': None, 'checked_at': 0.0}
+_cache_lock = threading.Lock()
+
+class CurriculumGraph:
+    """
+    Compiled, read-only prerequisite graph over lessons.
+
+    A lesson requires the lesson before it in its topic (by order), its
+    explicit lesson prerequisites and, for a topic's first lesson, every
+    lesson of the topic's prerequisite topics. Compiling checks the graph
+    is acyclic and precomputes the reverse (unlocks) edges and the root
+    lessons of each year group.
+    """
+
+    def __init__(self, version, topics, lessons, topic_edges, lesson_edges):
+        self.version = version
+        topic_by_id = {topic.id: topic for topic in topics}
+        topic_rank = {
+            topic.id: (topic.year_group or 0, topic.order or 0, topic.id) for topic in topics
+        }
+
+        by_topic = {}
+        for lesson in sorted(lessons, key=lambda lesson: (lesson.order or 0, lesson.id)):
+            by_topic.setdefault(lesson.topic_id, []).append(lesson.id)
+
+        self.lessons = {}
+        for lesson in lessons:
+            topic = topic_by_id[lesson.topic_id]
+            self.lessons[lesson.id] = LessonNode(
+                lesson.id, lesson.topic_id, topic.name, topic.year_group, lesson.title,
+                lesson.difficulty, lesson.estimated_time,
+                topic_rank[lesson.topic_id] + (lesson.order or 0, lesson.id)
+            )
+
+        requires = {lesson_id: set() for lesson_id in self.lessons}
+        for lesson_ids in by_topic.values():
+            for previous, lesson_id in zip(lesson_ids, lesson_ids[1:]):
+                requires[lesson_id].add(previous)
+        for topic_id, prerequisite_id in topic_edges:
+            if by_topic.get(topic_id):
+                requires[by_topic[topic_id][0]].update(by_topic.get(prerequisite_id, ()))
+        for lesson_id, prerequisite_id in lesson_edges:
+            requires[lesson_id].add(prerequisite_id)
+
+        self.requires = {lesson_id: frozenset(ids) for lesson_id, ids in requires.items()}
+        unlocks = {}
+        for lesson_id, ids in self.requires.items():
+            for prerequisite_id in ids:
+                unlocks.setdefault(prerequisite_id, []).append(lesson_id)
+        self.unlocks = {lesson_id: tuple(ids) for lesson_id, ids in unlocks.items()}
+
+        roots = {}
+        for lesson_id, ids in self.requires.items():
+            if not ids:
+                roots.setdefault(self.lessons[lesson_id].year_group, []).append(lesson_id)
+        self.roots_by_year = {year_group: tuple(ids) for year_group, ids in roots.items()}
+
+        self.check_acyclic()
+
+    def check_acyclic(self):
+        """Raise ValueError naming a lesson on a cycle if the prerequisites are not a DAG (Kahn's algorithm)."""
+        remaining = {lesson_id: len(ids) for lesson_id, ids in self.requires.items()}
+        ready = [lesson_id for lesson_id, count in remaining.items() if count == 0]
+        visited = 0
+        while ready:
+            lesson_id = ready.pop()
+            visited += 1
+            for unlocked in self.unlocks.get(lesson_id, ()):
+                remaining[unlocked] -= 1
+                if remaining[unlocked] == 0:
+                    ready.append(unlocked)
+        if visited < len(remaining):
+            on_cycle = min(lesson_id for lesson_id, count in remaining.items() if count > 0)
+            raise ValueError(f"Prerequisites would form a cycle through lesson {on_cycle}")
+
+    def recommend(self, year_group, statuses, limit):
+        """
+        The next `limit` lessons of a year group for a child with these {lesson_id: status}.
+
+        Only the year group's root lessons and the lessons unlocked by the
+        child's completed lessons are examined, so the work is bounded by the
+        child's progress and the graph's fan-out, not the curriculum's size.
+        Lessons already in progress come first, then curriculum order.
+        """
+        completed = {lesson_id for lesson_id, status in statuses.items() if status == 'completed'}
+
+        candidates = set(self.roots_by_year.get(year_group, ()))
+        for lesson_id in completed:
+            candidates.update(self.unlocks.get(lesson_id, ()))
+        candidates.update(lesson_id for lesson_id, status in statuses.items() if status == 'in_progress')
+
+        ready = [
+            lesson_id for lesson_id in candidates
+            if lesson_id in self.lessons
+            and lesson_id not in completed
+            and self.lessons[lesson_id].year_group == year_group
+            and self.requires[lesson_id] <= completed
+        ]
+        return heapq.nsmallest(
+            limit, ready,
+            key=lambda lesson_id: (statuses.get(lesson_id) != 'in_progress', self.lessons[lesson_id].rank)
+        )
+
+class CurriculumGraphService:
+    @staticmethod
+    def current_version():
+        """The curriculum version, read by primary key (0 before the first admin write)."""
+        return db.session.query(CurriculumVersion.version).filter(CurriculumVersion.id == 1).scalar() or 0
+
+    @staticmethod
+    def bump_version():
+        """Mark the curriculum as changed, in the caller's transaction, and drop this worker's compiled copy."""
+        updated = db.session.execute(db.update(CurriculumVersion.__table__).where(
+            CurriculumVersion.id == 1
+        ).values(version=CurriculumVersion.version + 1)).rowcount
+        if not updated:
+            db.session.add(CurriculumVersion(id=1, version=1))
+        _cache['checked_at'] = 0.0
+
+    @staticmethod
+    def compile(version=None):
+        """Load topics, lessons (without their content) and prerequisites, and compile the graph."""
+        return CurriculumGraph(
+            CurriculumGraphService.current_version() if version is None else version,
+            db.session.query(Topic.id, Topic.name, Topic.year_group, Topic.order).all(),
+            db.session.query(
+                Lesson.id, Lesson.topic_id, Lesson.title, Lesson.order, Lesson.difficulty, Lesson.estimated_time
+            ).all(),
+            db.session.query(TopicPrerequisite.topic_id, TopicPrerequisite.prerequisite_id).all(),
+            db.session.query(LessonPrerequisite.lesson_id, LessonPrerequisite.prerequisite_id).all()
+        )
+
+    @staticmethod
+    def graph():
+        """
+        This worker's compiled graph, recompiled when the curriculum version moves.
+
+        The version is re-read at most every VERSION_CHECK_SECONDS, so other
+        workers' edits are picked up within that interval and most requests
+        make no query at all.
+        """
+        now = time.monotonic()
+        cached = _cache['graph']
+        if cached is not None and now - _cache['checked_at'] < VERSION_CHECK_SECONDS:
+            return cached
+
+        with _cache_lock:
+            version = CurriculumGraphService.current_version()
+            if _cache['graph'] is None or _cache['graph'].version != version:
+                _cache['graph'] = CurriculumGraphService.compile(version)
+            _cache['checked_at'] = now
+            return _cache['graph']
+
+    @staticmethod
+    def recommend(child, limit):
+        """Next best lessons for a child: one query for their lesson statuses, then a graph walk."""
+        statuses = dict(db.session.query(LessonProgress.lesson_id, LessonProgress.status).filter(
+            LessonProgress.child_id == child.id
+        ).all())
+        graph = CurriculumGraphService.graph()
+
+        recommended = []
+        for lesson_id in graph.recommend(child.year_group, statuses, limit):
+            lesson = graph.lessons[lesson_id]
+            recommended.append({
+                'lesson_id': lesson.id,
+                'topic_id': lesson.topic_id,
+                'topic_name': lesson.topic_name,
+                'title': lesson.title,
+                'difficulty': lesson.difficulty,
+                'estimated_time': lesson.estimated_time,
+                'status': statuses.get(lesson_id, 'not_started')
+            })
+        return recommended
+
+    @staticmethod
+    def set_prerequisites(model, key_column, key, prerequisite_ids):
+        """
+        Replace the prerequisites of one topic or lesson and check the result is still acyclic.
+
+        Raises ValueError (after which the caller rolls back) on a
+        self-reference or a cycle. The caller commits.
+        """
+        if key in prerequisite_ids:
+            raise ValueError("A prerequisite cannot refer to itself")
+
+        db.session.execute(db.delete(model.__table__).where(getattr(model, key_column) == key))
+        if prerequisite_ids:
+            db.session.execute(model.__table__.insert(), [
+                {key_column: key, 'prerequisite_id': prerequisite_id} for prerequisite_id in sorted(prerequisite_ids)
+            ])
+        CurriculumGraphService.compile()
+        CurriculumGraphService.bump_version()
+
+    @staticmethod
+    def delete_edges(topic_ids=(), lesson_ids=()):
+        """Remove prerequisites to or from topics and lessons that are being deleted."""
+        if topic_ids:
+            db.session.execute(db.delete(TopicPrerequisite.__table__).where(db.or_(
+                TopicPrerequisite.topic_id.in_(topic_ids), TopicPrerequisite.prerequisite_id.in_(topic_ids)
+            )))
+        if lesson_ids:
+            db.session.execute(db.delete(LessonPrerequisite.__table__).where(db.or_(
+                LessonPrerequisite.lesson_id.in_(lesson_ids), LessonPrerequisite.prerequisite_id.in_(lesson_ids)
+            )))
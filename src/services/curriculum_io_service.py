@@ -0,0 +1,290 @@
+import json
+import time
+from src.models import Topic, Lesson, Exercise, TopicPrerequisite, LessonPrerequisite, db
+from src.services.curriculum_graph_service import CurriculumGraphService
+from src.services.rollup_rebuild_service import RollupRebuildService
+
+# Record types in the order their rows depend on each other
+RECORD_TYPES = ('topic', 'lesson', 'exercise', 'topic_prerequisite', 'lesson_prerequisite')
+
+TOPIC_FIELDS = ('description', 'icon', 'order')
+LESSON_FIELDS = ('description', 'content', 'order', 'difficulty', 'estimated_time')
+EXERCISE_FIELDS = ('description', 'question_type', 'question_data', 'answer_data', 'difficulty', 'order')
+
+class CurriculumIOService:
+    """
+    Streaming NDJSON import and export of the curriculum.
+
+    Each line is {"type": ..., "data": {...}}. Rows are identified by
+    natural keys rather than ids, so an export can be imported into any
+    database:
+
+    - topic: [year_group, name]
+    - lesson: topic key + [title]
+    - exercise: lesson key + [title]
+
+    Importing upserts by those keys: existing rows keep their ids (and the
+    progress that references them) and are updated in place, new rows are
+    inserted. Nothing is deleted, so re-importing the same file is a no-op.
+    """
+
+    @staticmethod
+    def export_lines(chunk_size=500):
+        """
+        Yield the whole curriculum as NDJSON lines, parents before children.
+
+        Rows are streamed `chunk_size` at a time (yield_per) with their parent
+        keys joined in, so memory use does not grow with the curriculum.
+        """
+        def line(record_type, data):
+            return json.dumps({'type': record_type, 'data': data}, separators=(',', ':')) + '\n'
+
+        for topic in Topic.query.order_by(Topic.year_group, Topic.order, Topic.id).yield_per(chunk_size):
+            yield line('topic', dict(
+                {field: getattr(topic, field) for field in TOPIC_FIELDS},
+                year_group=topic.year_group, name=topic.name
+            ))
+
+        for lesson, year_group, topic_name in db.session.query(Lesson, Topic.year_group, Topic.name).join(
+            Topic, Lesson.topic_id == Topic.id
+        ).order_by(Lesson.topic_id, Lesson.order, Lesson.id).yield_per(chunk_size):
+            yield line('lesson', dict(
+                {field: getattr(lesson, field) for field in LESSON_FIELDS},
+                topic=[year_group, topic_name], title=lesson.title
+            ))
+
+        for exercise, year_group, topic_name, lesson_title in db.session.query(
+            Exercise, Topic.year_group, Topic.name, Lesson.title
+        ).join(Lesson, Exercise.lesson_id == Lesson.id).join(Topic, Lesson.topic_id == Topic.id).order_by(
+            Exercise.lesson_id, Exercise.order, Exercise.id
+        ).yield_per(chunk_size):
+            yield line('exercise', dict(
+                {field: getattr(exercise, field) for field in EXERCISE_FIELDS},
+                lesson=[year_group, topic_name, lesson_title], title=exercise.title
+            ))
+
+        topic_keys = {topic_id: [year_group, name] for topic_id, year_group, name in
+                      db.session.query(Topic.id, Topic.year_group, Topic.name)}
+        for topic_id, prerequisite_id in db.session.query(
+            TopicPrerequisite.topic_id, TopicPrerequisite.prerequisite_id
+        ).order_by(TopicPrerequisite.topic_id, TopicPrerequisite.prerequisite_id):
+            yield line('topic_prerequisite', {
+                'topic': topic_keys[topic_id], 'prerequisite': topic_keys[prerequisite_id]
+            })
+
+        lesson_keys = {lesson_id: topic_keys[topic_id] + [title] for lesson_id, topic_id, title in
+                       db.session.query(Lesson.id, Lesson.topic_id, Lesson.title)}
+        for lesson_id, prerequisite_id in db.session.query(
+            LessonPrerequisite.lesson_id, LessonPrerequisite.prerequisite_id
+        ).order_by(LessonPrerequisite.lesson_id, LessonPrerequisite.prerequisite_id):
+            yield line('lesson_prerequisite', {
+                'lesson': lesson_keys[lesson_id], 'prerequisite': lesson_keys[prerequisite_id]
+            })
+
+    @staticmethod
+    def key_maps():
+        """
+        {natural key: id} for every topic, lesson and exercise, from three queries.
+
+        Should the table already hold duplicates of a key, the lowest id wins.
+        """
+        topics, lessons, exercises = {}, {}, {}
+        for topic_id, year_group, name in db.session.query(Topic.id, Topic.year_group, Topic.name).order_by(Topic.id.desc()):
+            topics[(year_group, name)] = topic_id
+        topic_keys = {topic_id: key for key, topic_id in topics.items()}
+        for lesson_id, topic_id, title in db.session.query(Lesson.id, Lesson.topic_id, Lesson.title).order_by(Lesson.id.desc()):
+            if topic_id in topic_keys:
+                lessons[topic_keys[topic_id] + (title,)] = lesson_id
+        lesson_keys = {lesson_id: key for key, lesson_id in lessons.items()}
+        for exercise_id, lesson_id, title in db.session.query(Exercise.id, Exercise.lesson_id, Exercise.title).order_by(Exercise.id.desc()):
+            if lesson_id in lesson_keys:
+                exercises[lesson_keys[lesson_id] + (title,)] = exercise_id
+        return {'topic': topics, 'lesson': lessons, 'exercise': exercises}
+
+    @staticmethod
+    def upsert_rows(model, keys, rows, key_of, values_of):
+        """
+        Insert the rows whose key is new and update the changed ones by id, each with one executemany.
+
+        Current values of the matched rows are read with one IN query, so
+        unchanged rows are not written and keep their updated_at. A key that
+        repeats within the batch takes its last row. Returns (inserted,
+        updated, unchanged).
+        """
+        values = {}
+        for row in rows:
+            values[key_of(row)] = values_of(row)
+
+        inserts, matched = [], {}
+        for key, row_values in values.items():
+            row_id = keys.get(key)
+            if row_id is None:
+                inserts.append(row_values)
+            else:
+                matched[row_id] = row_values
+
+        updates = []
+        if matched:
+            fields = sorted(next(iter(matched.values())))
+            for row_id, *current in db.session.query(
+                model.id, *[getattr(model, field) for field in fields]
+            ).filter(model.id.in_(matched)):
+                if dict(zip(fields, current)) != matched[row_id]:
+                    updates.append(dict(matched[row_id], id=row_id))
+
+        if updates:
+            db.session.execute(db.update(model), updates)
+        if inserts:
+            db.session.execute(model.__table__.insert(), inserts)
+        return len(inserts), len(updates), len(matched) - len(updates)
+
+    @staticmethod
+    def import_batch(records, keys):
+        """
+        Upsert one batch of parsed records, parents first. The caller commits.
+
+        Returns {record type: (inserted, updated, unchanged)}. Raises
+        ValueError for a record whose parent is neither in the database nor
+        earlier in the file, or for prerequisites that would form a cycle.
+        """
+        by_type = {record_type: [] for record_type in RECORD_TYPES}
+        for record in records:
+            if record.get('type') not in by_type:
+                raise ValueError(f"Unknown record type: {record.get('type')}")
+            by_type[record['type']].append(record['data'])
+
+        def parent_id(level, key):
+            row_id = keys[level].get(tuple(key))
+            if row_id is None:
+                raise ValueError(f"Unknown {level} {list(key)}")
+            return row_id
+
+        counts = {}
+        if by_type['topic']:
+            counts['topic'] = CurriculumIOService.upsert_rows(
+                Topic, keys['topic'], by_type['topic'],
+                lambda data: (data['year_group'], data['name']),
+                lambda data: dict({field: data.get(field) for field in TOPIC_FIELDS},
+                                  year_group=data['year_group'], name=data['name'])
+            )
+            CurriculumIOService.refresh_keys(keys, 'topic', db.session.query(
+                Topic.id, Topic.year_group, Topic.name
+            ).filter(Topic.name.in_({data['name'] for data in by_type['topic']})))
+
+        if by_type['lesson']:
+            counts['lesson'] = CurriculumIOService.upsert_rows(
+                Lesson, keys['lesson'], by_type['lesson'],
+                lambda data: tuple(data['topic']) + (data['title'],),
+                lambda data: dict({field: data.get(field) for field in LESSON_FIELDS},
+                                  topic_id=parent_id('topic', data['topic']), title=data['title'])
+            )
+            topic_keys = {topic_id: key for key, topic_id in keys['topic'].items()}
+            CurriculumIOService.refresh_keys(keys, 'lesson', (
+                (lesson_id, *topic_keys[topic_id], title) for lesson_id, topic_id, title in db.session.query(
+                    Lesson.id, Lesson.topic_id, Lesson.title
+                ).filter(Lesson.topic_id.in_({parent_id('topic', data['topic']) for data in by_type['lesson']}))
+            ))
+
+        if by_type['exercise']:
+            counts['exercise'] = CurriculumIOService.upsert_rows(
+                Exercise, keys['exercise'], by_type['exercise'],
+                lambda data: tuple(data['lesson']) + (data['title'],),
+                lambda data: dict({field: data.get(field) for field in EXERCISE_FIELDS},
+                                  lesson_id=parent_id('lesson', data['lesson']), title=data['title'])
+            )
+            lesson_keys = {lesson_id: key for key, lesson_id in keys['lesson'].items()}
+            CurriculumIOService.refresh_keys(keys, 'exercise', (
+                (exercise_id, *lesson_keys[lesson_id], title) for exercise_id, lesson_id, title in db.session.query(
+                    Exercise.id, Exercise.lesson_id, Exercise.title
+                ).filter(Exercise.lesson_id.in_({parent_id('lesson', data['lesson']) for data in by_type['exercise']}))
+            ))
+
+        for record_type, model, key_column, level in (
+            ('topic_prerequisite', TopicPrerequisite, 'topic_id', 'topic'),
+            ('lesson_prerequisite', LessonPrerequisite, 'lesson_id', 'lesson'),
+        ):
+            edges = {
+                (parent_id(level, data[level]), parent_id(level, data['prerequisite']))
+                for data in by_type[record_type]
+            }
+            if not edges:
+                continue
+            existing = set(db.session.query(getattr(model, key_column), model.prerequisite_id).filter(
+                getattr(model, key_column).in_({key for key, _ in edges})
+            ))
+            new_edges = sorted(edges - existing)
+            if new_edges:
+                db.session.execute(model.__table__.insert(), [
+                    {key_column: key, 'prerequisite_id': prerequisite_id} for key, prerequisite_id in new_edges
+                ])
+            counts[record_type] = (len(new_edges), 0, len(edges) - len(new_edges))
+        if by_type['topic_prerequisite'] or by_type['lesson_prerequisite']:
+            CurriculumGraphService.compile()
+
+        return counts
+
+    @staticmethod
+    def refresh_keys(keys, level, rows):
+        """Add (id, *natural key) rows to a key map, keeping the lowest id for duplicate keys."""
+        for row_id, *key in rows:
+            key = tuple(key)
+            if key not in keys[level] or row_id < keys[level][key]:
+                keys[level][key] = row_id
+
+    @staticmethod
+    def import_lines(lines, batch_size=1000, report=None):
+        """
+        Import NDJSON lines in batches of `batch_size` records, committing each batch.
+
+        `report(records, elapsed)` is called after each commit. Once a
+        committed batch has inserted or updated a row, cached lesson and
+        topic counts are recomputed and the curriculum version bumped at the
+        end, even when a later batch fails, so workers pick up what was
+        imported. A file that changes nothing leaves the version alone. Returns ({record type:
+        (inserted, updated, unchanged)}, elapsed seconds).
+        """
+        started = time.time()
+        keys = CurriculumIOService.key_maps()
+        totals = {}
+        imported = 0
+        changed = False
+
+        def flush(batch):
+            nonlocal imported, changed
+            try:
+                counts = CurriculumIOService.import_batch(batch, keys)
+            except Exception:
+                db.session.rollback()
+                raise
+            db.session.commit()
+            for record_type, count in counts.items():
+                totals[record_type] = tuple(map(sum, zip(totals.get(record_type, (0, 0, 0)), count)))
+                changed = changed or bool(count[0] or count[1])
+            imported += len(batch)
+            if report:
+                report(imported, time.time() - started)
+
+        try:
+            batch = []
+            for number, text in enumerate(lines, start=1):
+                if not text.strip():
+                    continue
+                try:
+                    record = json.loads(text)
+                except ValueError as e:
+                    raise ValueError(f"Line {number}: {e}") from e
+                if not isinstance(record, dict) or 'type' not in record or not isinstance(record.get('data'), dict):
+                    raise ValueError(f"Line {number}: expected an object with \"type\" and \"data\"")
+                batch.append(record)
+                if len(batch) >= batch_size:
+                    flush(batch)
+                    batch = []
+            if batch:
+                flush(batch)
+        finally:
+            # Batches committed before a failure stay, so their counts and version must too
+            if changed:
+                RollupRebuildService.rebuild_curriculum_counts()
+                CurriculumGraphService.bump_version()
+                db.session.commit()
+        return totals, time.time() - started
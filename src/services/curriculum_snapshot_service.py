@@ -0,0 +1,176 @@
+import gzip
+import json
+import threading
+import time
+from src.models import Topic, Lesson, TopicPrerequisite, LessonPrerequisite, db
+from src.services.curriculum_graph_service import CurriculumGraphService, VERSION_CHECK_SECONDS
+
+# Most slides a single slide-range request may return
+MAX_SLIDE_COUNT = 20
+
+_cache = {'snapshot': None, 'checked_at': 0.0}
+_cache_lock = threading.Lock()
+
+class CurriculumSnapshot:
+    """
+    Read-only copy of the whole curriculum at one curriculum version.
+
+    Topics, lessons and exercises are held as their serialized dicts, indexed
+    by id and grouped in the order the listing routes return them. A snapshot
+    is never modified after it is built (beyond memoizing its serialized
+    trees and slides); a newer version replaces it whole, so readers holding the old one
+    keep a consistent view.
+    """
+
+    def __init__(self, version, topics, topic_edges, lesson_edges):
+        self.version = version
+        self.topics = {}
+        self.lessons = {}
+        self.exercises = {}
+        self.lessons_by_topic = {}
+        self.exercises_by_lesson = {}
+
+        ordered_topics = sorted(topics, key=lambda topic: (
+            topic.year_group is not None, topic.year_group or 0, topic.order or 0, topic.id
+        ))
+        for topic in ordered_topics:
+            self.topics[topic.id] = topic.to_dict()
+            lessons = sorted(topic.lessons, key=lambda lesson: (lesson.order or 0, lesson.id))
+            self.lessons_by_topic[topic.id] = tuple(lesson.to_dict() for lesson in lessons)
+            for lesson, lesson_dict in zip(lessons, self.lessons_by_topic[topic.id]):
+                self.lessons[lesson.id] = lesson_dict
+                exercises = sorted(lesson.exercises, key=lambda exercise: (exercise.order or 0, exercise.id))
+                self.exercises_by_lesson[lesson.id] = tuple(exercise.to_dict() for exercise in exercises)
+                for exercise_dict in self.exercises_by_lesson[lesson.id]:
+                    self.exercises[exercise_dict['id']] = exercise_dict
+
+        self.all_topics = tuple(self.topics.values())
+        topics_by_year = {}
+        for topic_dict in self.all_topics:
+            topics_by_year.setdefault(topic_dict['year_group'], []).append(topic_dict)
+        self.topics_by_year = {year_group: tuple(dicts) for year_group, dicts in topics_by_year.items()}
+
+        self.topic_prerequisites = CurriculumSnapshot.group_edges(topic_edges)
+        self.lesson_prerequisites = CurriculumSnapshot.group_edges(lesson_edges)
+        self.trees = {}
+        self.slides = {}
+
+    def tree(self, year_group=None):
+        """
+        (identity, gzip) JSON bytes of the nested topic/lesson/exercise tree.
+
+        Serialized and compressed on first use for each year group (None
+        for every year group) and kept for the life of the snapshot.
+        """
+        cached = self.trees.get(year_group)
+        if cached is None:
+            topics = self.topics_by_year.get(year_group, ()) if year_group else self.all_topics
+            body = json.dumps({
+                'curriculum_version': self.version,
+                'year_group': year_group,
+                'topics': [
+                    dict(topic, lessons=[
+                        dict(lesson, exercises=list(self.exercises_by_lesson[lesson['id']]))
+                        for lesson in self.lessons_by_topic[topic['id']]
+                    ])
+                    for topic in topics
+                ]
+            }, separators=(',', ':')).encode('utf-8')
+            cached = self.trees[year_group] = (body, gzip.compress(body, mtime=0))
+        return cached
+
+    def lesson_slides(self, lesson_id):
+        """
+        A lesson's slides as a tuple of serialized JSON byte strings.
+
+        Lesson.content is parsed once per snapshot, that is once per
+        curriculum version. Content that is not a {"slides": [...]} document
+        has no slides.
+        """
+        cached = self.slides.get(lesson_id)
+        if cached is None:
+            try:
+                slides = json.loads(self.lessons[lesson_id]['content'] or '{}').get('slides') or []
+            except (ValueError, AttributeError):
+                slides = []
+            cached = self.slides[lesson_id] = tuple(
+                json.dumps(slide, separators=(',', ':')).encode('utf-8') for slide in slides
+            )
+        return cached
+
+    def slide_range(self, lesson_id, start, count):
+        """JSON bytes of `count` slides of a lesson from index `start`, joined from the cached slides."""
+        slides = self.lesson_slides(lesson_id)
+        head = json.dumps({
+            'lesson_id': lesson_id,
+            'slide_count': len(slides),
+            'start': start
+        }, separators=(',', ':')).encode('utf-8')
+        return head[:-1] + b',"slides":[' + b','.join(slides[start:start + count]) + b']}'
+
+    @staticmethod
+    def group_edges(edges):
+        """{id: sorted prerequisite ids} from (id, prerequisite_id) pairs."""
+        grouped = {}
+        for key, prerequisite_id in edges:
+            grouped.setdefault(key, []).append(prerequisite_id)
+        return {key: tuple(sorted(ids)) for key, ids in grouped.items()}
+
+class CurriculumSnapshotService:
+    """
+    Serves curriculum reads from a per-worker, versioned snapshot.
+
+    The snapshot is keyed by the curriculum version that every admin write
+    bumps (see CurriculumGraphService.bump_version). The worker that commits
+    an edit swaps in a fresh snapshot straight away. Other workers re-read
+    the version at most every VERSION_CHECK_SECONDS and rebuild when it has
+    moved. All other reads make no query at all.
+    """
+
+    @staticmethod
+    def load(version=None):
+        """
+        Build a snapshot from the database with one query per table.
+
+        The version is read before the rows, so an edit committed while
+        loading leaves the snapshot labelled older than its contents and the
+        next version check rebuilds it again.
+        """
+        version = CurriculumGraphService.current_version() if version is None else version
+        topics = Topic.query.options(
+            db.selectinload(Topic.lessons).selectinload(Lesson.exercises)
+        ).all()
+        return CurriculumSnapshot(
+            version,
+            topics,
+            db.session.query(TopicPrerequisite.topic_id, TopicPrerequisite.prerequisite_id).all(),
+            db.session.query(LessonPrerequisite.lesson_id, LessonPrerequisite.prerequisite_id).all()
+        )
+
+    @staticmethod
+    def snapshot():
+        """This worker's snapshot, rebuilt when the curriculum version has moved."""
+        now = time.monotonic()
+        cached = _cache['snapshot']
+        if cached is not None and now - _cache['checked_at'] < VERSION_CHECK_SECONDS:
+            return cached
+
+        with _cache_lock:
+            version = CurriculumGraphService.current_version()
+            if _cache['snapshot'] is None or _cache['snapshot'].version != version:
+                _cache['snapshot'] = CurriculumSnapshotService.load(version)
+            _cache['checked_at'] = now
+            return _cache['snapshot']
+
+    @staticmethod
+    def version():
+        """The version of this worker's snapshot, as served in curriculum ETags."""
+        return CurriculumSnapshotService.snapshot().version
+
+    @staticmethod
+    def reload():
+        """Swap in a fresh snapshot after this worker has committed a curriculum edit."""
+        with _cache_lock:
+            _cache['snapshot'] = CurriculumSnapshotService.load()
+            _cache['checked_at'] = time.monotonic()
+        return _cache['snapshot']
@@ -0,0 +1,52 @@
+from src.models import ChildProgressSummary, TopicProgress, Achievement, db
+from src.services.progress_summary_service import ProgressSummaryService
+
+class DashboardService:
+    @staticmethod
+    def family_dashboard(parent):
+        """
+        Progress for all of a parent's children in one payload.
+
+        The children are resolved once, then summaries, year-group totals,
+        topic progress and unviewed achievements are each fetched for every
+        child with one IN-list query, so the query count does not depend on
+        how many children the parent has.
+        """
+        children = sorted(parent.children, key=lambda child: child.id)
+        child_ids = [child.id for child in children]
+        if not child_ids:
+            return {"parent_id": parent.id, "children": []}
+
+        summaries = {
+            summary.child_id: summary
+            for summary in ChildProgressSummary.query.filter(ChildProgressSummary.child_id.in_(child_ids)).all()
+        }
+        totals = ProgressSummaryService.year_group_totals_for({child.year_group for child in children})
+
+        topic_progress = {child_id: [] for child_id in child_ids}
+        for progress in TopicProgress.query.filter(
+            TopicProgress.child_id.in_(child_ids)
+        ).order_by(TopicProgress.child_id, TopicProgress.topic_id).all():
+            topic_progress[progress.child_id].append(progress.to_dict())
+
+        unviewed_achievements = {child_id: [] for child_id in child_ids}
+        for achievement in Achievement.query.options(db.joinedload(Achievement.achievement_type)).filter(
+            Achievement.child_id.in_(child_ids),
+            Achievement.viewed.is_(False)
+        ).order_by(Achievement.child_id, Achievement.id).all():
+            unviewed_achievements[achievement.child_id].append(achievement.to_dict())
+
+        return {
+            "parent_id": parent.id,
+            "children": [
+                {
+                    "child": child.to_dict(),
+                    "summary": ProgressSummaryService.payload(
+                        child, summaries.get(child.id), totals[child.year_group]
+                    ),
+                    "topic_progress": topic_progress[child.id],
+                    "unviewed_achievements": unviewed_achievements[child.id]
+                }
+                for child in children
+            ]
+        }
@@ -0,0 +1,44 @@
+import json
+from src.models import (
+    ProgressRecord, LessonProgress, TopicProgress, DailyActivity, AttemptEvent,
+    Achievement, ChildReward, db
+)
+
+class ExportService:
+    @staticmethod
+    def child_history_queries(child_id):
+        """
+        (record type, query) pairs covering a child's complete learning history.
+
+        Each query walks one (child_id, ...) index in order, so rows stream
+        without a sort. Related catalog rows are joined in, because a
+        server-side cursor cannot share its connection with lazy loads.
+        """
+        return [
+            ('progress_record', ProgressRecord.query.filter_by(child_id=child_id)
+                .order_by(ProgressRecord.exercise_id)),
+            ('attempt', AttemptEvent.query.filter_by(child_id=child_id)
+                .order_by(AttemptEvent.exercise_id, AttemptEvent.attempted_at)),
+            ('lesson_progress', LessonProgress.query.filter_by(child_id=child_id)
+                .order_by(LessonProgress.lesson_id)),
+            ('topic_progress', TopicProgress.query.filter_by(child_id=child_id)
+                .order_by(TopicProgress.topic_id)),
+            ('daily_activity', DailyActivity.query.filter_by(child_id=child_id)
+                .order_by(DailyActivity.date)),
+            ('achievement', Achievement.query.filter_by(child_id=child_id)
+                .options(db.joinedload(Achievement.achievement_type)).order_by(Achievement.id)),
+            ('child_reward', ChildReward.query.filter_by(child_id=child_id)
+                .options(db.joinedload(ChildReward.reward)).order_by(ChildReward.id)),
+        ]
+
+    @staticmethod
+    def child_history_lines(child_id, chunk_size=500):
+        """
+        Yield the child's history as NDJSON lines: {"type": ..., "data": row.to_dict()}.
+
+        Rows are fetched `chunk_size` at a time through a server-side cursor
+        (yield_per), so memory use does not grow with the size of the history.
+        """
+        for record_type, query in ExportService.child_history_queries(child_id):
+            for row in query.yield_per(chunk_size):
+                yield json.dumps({'type': record_type, 'data': row.to_dict()}, separators=(',', ':')) + '\n'
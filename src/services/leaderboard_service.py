@@ -0,0 +1,461 @@
+import random
+import threading
+from datetime import date, datetime, timedelta
+from flask import current_app
+from src.models import ActivityRollup, Achievement, AchievementType, AttemptEvent, ChildProfile, db
+
+BOARD_PREFIX = 'leaderboard:'
+MAX_LEADERBOARD_LIMIT = 100
+
+class RankedIndex:
+    """
+    Skip list of keys in ascending order, with a span on every link.
+
+    The span is how many nodes a link skips, so the position of a key is
+    summed on the way down. Insert, delete, position and slice start are all
+    O(log n) expected (the same structure as a Redis sorted set).
+    """
+    MAX_LEVEL = 32
+    BRANCHING = 0.25
+
+    class Node:
+        __slots__ = ('key', 'next', 'span')
+
+        def __init__(self, key, level):
+            self.key = key
+            self.next = [None] * level
+            self.span = [0] * level
+
+    def __init__(self):
+        self.head = RankedIndex.Node(None, RankedIndex.MAX_LEVEL)
+        self.level = 1
+        self.length = 0
+        self.random = random.Random()
+
+    def __len__(self):
+        return self.length
+
+    def random_level(self):
+        level = 1
+        while level < RankedIndex.MAX_LEVEL and self.random.random() < RankedIndex.BRANCHING:
+            level += 1
+        return level
+
+    def insert(self, key):
+        update = [self.head] * RankedIndex.MAX_LEVEL
+        rank = [0] * RankedIndex.MAX_LEVEL
+        node = self.head
+        for i in reversed(range(self.level)):
+            rank[i] = rank[i + 1] if i + 1 < self.level else 0
+            while node.next[i] is not None and node.next[i].key < key:
+                rank[i] += node.span[i]
+                node = node.next[i]
+            update[i] = node
+
+        level = self.random_level()
+        if level > self.level:
+            for i in range(self.level, level):
+                rank[i] = 0
+                update[i] = self.head
+                self.head.span[i] = self.length
+            self.level = level
+
+        node = RankedIndex.Node(key, level)
+        for i in range(level):
+            node.next[i] = update[i].next[i]
+            update[i].next[i] = node
+            node.span[i] = update[i].span[i] - (rank[0] - rank[i])
+            update[i].span[i] = rank[0] - rank[i] + 1
+        for i in range(level, self.level):
+            update[i].span[i] += 1
+        self.length += 1
+
+    def remove(self, key):
+        update = [self.head] * RankedIndex.MAX_LEVEL
+        node = self.head
+        for i in reversed(range(self.level)):
+            while node.next[i] is not None and node.next[i].key < key:
+                node = node.next[i]
+            update[i] = node
+
+        node = node.next[0]
+        if node is None or node.key != key:
+            raise KeyError(key)
+
+        for i in range(self.level):
+            if update[i].next[i] is node:
+                update[i].span[i] += node.span[i] - 1
+                update[i].next[i] = node.next[i]
+            else:
+                update[i].span[i] -= 1
+        while self.level > 1 and self.head.next[self.level - 1] is None:
+            self.level -= 1
+        self.length -= 1
+
+    def count_below(self, key):
+        """Number of keys strictly less than `key`."""
+        count = 0
+        node = self.head
+        for i in reversed(range(self.level)):
+            while node.next[i] is not None and node.next[i].key < key:
+                count += node.span[i]
+                node = node.next[i]
+        return count
+
+    def slice(self, start, count):
+        """Up to `count` keys starting at position `start` (0-based)."""
+        traversed = 0
+        node = self.head
+        for i in reversed(range(self.level)):
+            while node.next[i] is not None and traversed + node.span[i] <= start:
+                traversed += node.span[i]
+                node = node.next[i]
+
+        keys = []
+        node = node.next[0]
+        while node is not None and len(keys) < count:
+            keys.append(node.key)
+            node = node.next[0]
+        return keys
+
+class InProcessLeaderboardBackend:
+    """
+    Leaderboards held in this worker's memory, one RankedIndex per board.
+
+    Suitable for a single worker and for local development; with several
+    workers each one only sees its own increments, so configure a shared
+    backend there.
+    """
+
+    def __init__(self):
+        self._boards = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(member, score):
+        # Highest score first, ties by member id
+        return (-score, member)
+
+    def exists(self, board):
+        return board in self._boards
+
+    def replace(self, board, scores):
+        index = RankedIndex()
+        for member, score in scores.items():
+            index.insert(self._key(member, score))
+        with self._lock:
+            self._boards[board] = (dict(scores), index)
+
+    def increment(self, board, member, amount):
+        """Add `amount` to a member's score; a no-op on a board that has not been loaded."""
+        with self._lock:
+            if board not in self._boards:
+                return
+            scores, index = self._boards[board]
+            if member in scores:
+                index.remove(self._key(member, scores[member]))
+            scores[member] = scores.get(member, 0) + amount
+            index.insert(self._key(member, scores[member]))
+
+    def top(self, board, count):
+        """[(member, score)] for the `count` highest scores."""
+        with self._lock:
+            _, index = self._boards[board]
+            return [(member, -score) for score, member in index.slice(0, count)]
+
+    def rank(self, board, member):
+        """(rank, score) with rank 1 for the highest score and ties sharing a rank, or None if unranked."""
+        with self._lock:
+            scores, index = self._boards[board]
+            if member not in scores:
+                return None
+            score = scores[member]
+            return index.count_below((-score, float('-inf'))) + 1, score
+
+    def size(self, board):
+        with self._lock:
+            return len(self._boards[board][0])
+
+    def boards(self):
+        with self._lock:
+            return list(self._boards)
+
+    def delete(self, board):
+        with self._lock:
+            self._boards.pop(board, None)
+
+class RedisLeaderboardBackend:
+    """
+    Leaderboards shared by every worker, as Redis sorted sets.
+
+    `client` is a redis.Redis (or compatible) client. A board is marked as
+    loaded with a companion key, so increments never create a partial board,
+    and both keys expire a few weeks after they were loaded.
+    """
+    LOADED_SUFFIX = ':loaded'
+    TTL = int(timedelta(days=21).total_seconds())
+    INCREMENT_SCRIPT = """
+        if redis.call('EXISTS', KEYS[2]) == 1 then
+            return redis.call('ZINCRBY', KEYS[1], ARGV[1], ARGV[2])
+        end
+        return false
+    """
+
+    def __init__(self, client):
+        self.client = client
+        self._increment = client.register_script(RedisLeaderboardBackend.INCREMENT_SCRIPT)
+
+    @classmethod
+    def from_url(cls, url):
+        # Only deployments that configure LEADERBOARD_REDIS_URL need the redis package
+        import redis
+        return cls(redis.Redis.from_url(url))
+
+    def exists(self, board):
+        return bool(self.client.exists(board + self.LOADED_SUFFIX))
+
+    def replace(self, board, scores):
+        pipeline = self.client.pipeline()
+        pipeline.delete(board)
+        if scores:
+            pipeline.zadd(board, scores)
+            pipeline.expire(board, self.TTL)
+        pipeline.set(board + self.LOADED_SUFFIX, 1, ex=self.TTL)
+        pipeline.execute()
+
+    def increment(self, board, member, amount):
+        self._increment(keys=[board, board + self.LOADED_SUFFIX], args=[amount, member])
+
+    def top(self, board, count):
+        return [
+            (int(member), int(score))
+            for member, score in self.client.zrevrange(board, 0, count - 1, withscores=True)
+        ]
+
+    def rank(self, board, member):
+        score = self.client.zscore(board, member)
+        if score is None:
+            return None
+        return self.client.zcount(board, f'({score}', '+inf') + 1, int(score)
+
+    def size(self, board):
+        return self.client.zcard(board)
+
+    def boards(self):
+        return [
+            key.decode() if isinstance(key, bytes) else key
+            for key in self.client.scan_iter(match=BOARD_PREFIX + '*')
+            if not (key.decode() if isinstance(key, bytes) else key).endswith(self.LOADED_SUFFIX)
+        ]
+
+    def delete(self, board):
+        self.client.delete(board, board + self.LOADED_SUFFIX)
+
+_default_backend = InProcessLeaderboardBackend()
+
+class LeaderboardService:
+    """
+    Weekly leaderboards per year group.
+
+    A child's weekly score is the exercises they completed that week plus
+    the points of the achievements they earned that week. An exercise
+    scores once, in the week of its first completed attempt. A board is
+    loaded from the attempt log and achievements the first time it is read, then kept current by increments from the write routes, so a read
+    never sorts the year group.
+    """
+
+    @staticmethod
+    def backend():
+        """The configured backend (app.config['LEADERBOARD_BACKEND']), else this worker's in-process one."""
+        return current_app.config.get('LEADERBOARD_BACKEND') or _default_backend
+
+    @staticmethod
+    def week_start(day=None):
+        return ActivityRollup.period_start_of(day or date.today(), 'week')
+
+    @staticmethod
+    def board_name(year_group, week_start):
+        return f'{BOARD_PREFIX}{year_group}:{week_start.isoformat()}'
+
+    @staticmethod
+    def weekly_completions_query(year_group, week_start):
+        """
+        (child_id, exercises) first completed during a year group's week, from the attempt log.
+
+        An exercise counts once, in the week of its first completed attempt,
+        so retries and later re-completions do not score again.
+        """
+        start = datetime.combine(week_start, datetime.min.time())
+        first_completed_at = db.func.min(AttemptEvent.attempted_at)
+        first_completions = db.session.query(AttemptEvent.child_id).filter(
+            AttemptEvent.child_id.in_(db.select(ChildProfile.id).where(ChildProfile.year_group == year_group)),
+            AttemptEvent.completed.is_(True)
+        ).group_by(AttemptEvent.child_id, AttemptEvent.exercise_id).having(db.and_(
+            first_completed_at >= start,
+            first_completed_at < start + timedelta(days=7)
+        )).subquery()
+        return db.session.query(
+            first_completions.c.child_id, db.func.count()
+        ).group_by(first_completions.c.child_id)
+
+    @staticmethod
+    def first_completions(pairs):
+        """{(child_id, exercise_id): attempted_at of the first completed attempt} for the pairs that have one."""
+        if not pairs:
+            return {}
+        return {
+            (child_id, exercise_id): first_completed_at
+            for child_id, exercise_id, first_completed_at in db.session.query(
+                AttemptEvent.child_id, AttemptEvent.exercise_id, db.func.min(AttemptEvent.attempted_at)
+            ).filter(
+                AttemptEvent.child_id.in_({child_id for child_id, _ in pairs}),
+                AttemptEvent.exercise_id.in_({exercise_id for _, exercise_id in pairs}),
+                AttemptEvent.completed.is_(True)
+            ).group_by(AttemptEvent.child_id, AttemptEvent.exercise_id)
+            if (child_id, exercise_id) in pairs
+        }
+
+    @staticmethod
+    def completion_increments(before, events):
+        """
+        Score changes, {(child_id, day): amount}, from newly logged attempt events.
+
+        `before` is first_completions() read before the events were logged.
+        A pair scores on the day of its first completed attempt, so an event
+        only counts when it completes a pair for the first time or, when
+        backdated, moves that first completion earlier.
+        """
+        first = dict(before)
+        for event in events:
+            key = (event.child_id, event.exercise_id)
+            if event.completed and (key not in first or event.attempted_at < first[key]):
+                first[key] = event.attempted_at
+
+        increments = {}
+        for (child_id, exercise_id), completed_at in first.items():
+            previous = before.get((child_id, exercise_id))
+            if previous == completed_at:
+                continue
+            if previous is not None:
+                key = (child_id, previous.date())
+                increments[key] = increments.get(key, 0) - 1
+            key = (child_id, completed_at.date())
+            increments[key] = increments.get(key, 0) + 1
+        return increments
+
+    @staticmethod
+    def weekly_points_query(year_group, week_start):
+        """(child_id, points) earned from achievements during a year group's week."""
+        start = datetime.combine(week_start, datetime.min.time())
+        return db.session.query(
+            Achievement.child_id, db.func.coalesce(db.func.sum(AchievementType.points), 0)
+        ).join(
+            ChildProfile, ChildProfile.id == Achievement.child_id
+        ).join(
+            AchievementType, AchievementType.id == Achievement.achievement_type_id
+        ).filter(
+            ChildProfile.year_group == year_group,
+            Achievement.earned_at >= start,
+            Achievement.earned_at < start + timedelta(days=7)
+        ).group_by(Achievement.child_id)
+
+    @staticmethod
+    def ensure_board(year_group, week_start):
+        """Load the board from the database unless the backend already holds it; returns its name."""
+        backend = LeaderboardService.backend()
+        board = LeaderboardService.board_name(year_group, week_start)
+        if not backend.exists(board):
+            if week_start == LeaderboardService.week_start():
+                LeaderboardService.reset()
+
+            scores = {}
+            for child_id, exercises in LeaderboardService.weekly_completions_query(year_group, week_start):
+                scores[child_id] = scores.get(child_id, 0) + (exercises or 0)
+            for child_id, points in LeaderboardService.weekly_points_query(year_group, week_start):
+                scores[child_id] = scores.get(child_id, 0) + int(points)
+            backend.replace(board, {child_id: score for child_id, score in scores.items() if score})
+        return board
+
+    @staticmethod
+    def add_scores(increments):
+        """
+        Apply committed score changes, {(child_id, day): amount}, to the loaded boards.
+
+        Call after the commit. Children's year groups are read with one
+        query; boards that nobody has read yet are skipped, since they are
+        loaded from the database in full when first read.
+        """
+        increments = {key: amount for key, amount in increments.items() if amount}
+        if not increments:
+            return
+
+        year_groups = dict(db.session.query(ChildProfile.id, ChildProfile.year_group).filter(
+            ChildProfile.id.in_({child_id for child_id, _ in increments})
+        ).all())
+
+        backend = LeaderboardService.backend()
+        for (child_id, day), amount in increments.items():
+            if year_groups.get(child_id) is None:
+                continue
+            board = LeaderboardService.board_name(year_groups[child_id], LeaderboardService.week_start(day))
+            backend.increment(board, child_id, amount)
+
+    @staticmethod
+    def top(year_group, limit):
+        """The `limit` highest-ranked children in the year group this week, ties sharing a rank."""
+        week_start = LeaderboardService.week_start()
+        backend = LeaderboardService.backend()
+        board = LeaderboardService.ensure_board(year_group, week_start)
+
+        entries = backend.top(board, limit)
+        children = {
+            child.id: child
+            for child in ChildProfile.query.filter(ChildProfile.id.in_([child_id for child_id, _ in entries])).all()
+        } if entries else {}
+
+        ranked = []
+        for position, (child_id, score) in enumerate(entries):
+            rank = ranked[-1]['rank'] if ranked and ranked[-1]['score'] == score else position + 1
+            child = children.get(child_id)
+            ranked.append({
+                "rank": rank,
+                "child_id": child_id,
+                "first_name": child.first_name if child else None,
+                "avatar": child.avatar if child else None,
+                "score": score
+            })
+
+        return {
+            "year_group": year_group,
+            "week_start": week_start.isoformat(),
+            "participants": backend.size(board),
+            "entries": ranked
+        }
+
+    @staticmethod
+    def child_rank(child):
+        """The child's rank and score this week; rank is None until they score."""
+        week_start = LeaderboardService.week_start()
+        backend = LeaderboardService.backend()
+        board = LeaderboardService.ensure_board(child.year_group, week_start)
+        rank, score = backend.rank(board, child.id) or (None, 0)
+        return {
+            "child_id": child.id,
+            "year_group": child.year_group,
+            "week_start": week_start.isoformat(),
+            "rank": rank,
+            "score": score,
+            "participants": backend.size(board)
+        }
+
+    @staticmethod
+    def reset(today=None):
+        """Drop every board from before the current week; returns how many were dropped."""
+        current = LeaderboardService.week_start(today).isoformat()
+        backend = LeaderboardService.backend()
+        dropped = 0
+        for board in backend.boards():
+            if board.rsplit(':', 1)[-1] < current:
+                backend.delete(board)
+                dropped += 1
+        return dropped
@@ -0,0 +1,67 @@
+import base64
+from datetime import date
+
+DEFAULT_PAGE_LIMIT = 100
+MAX_PAGE_LIMIT = 500
+
+class PaginationService:
+    """
+    Keyset (cursor) pagination for per-child listings.
+
+    Every listing is already filtered by child_id, so the key is a single
+    column that is unique per child and indexed after child_id (e.g. the
+    (child_id, exercise_id) unique constraint). A page is one index range
+    read of `limit + 1` rows, however deep the cursor is.
+    """
+
+    @staticmethod
+    def parse_args(args):
+        """Read `limit` and `cursor` from request args; raises ValueError on bad input."""
+        limit = args.get('limit', DEFAULT_PAGE_LIMIT)
+        try:
+            limit = int(limit)
+        except (TypeError, ValueError):
+            raise ValueError("limit must be an integer")
+        if limit < 1 or limit > MAX_PAGE_LIMIT:
+            raise ValueError(f"limit must be between 1 and {MAX_PAGE_LIMIT}")
+        return limit, args.get('cursor') or None
+
+    @staticmethod
+    def encode_cursor(value):
+        """Opaque cursor for a key value (an int id or a date)."""
+        return base64.urlsafe_b64encode(str(value).encode()).decode().rstrip('=')
+
+    @staticmethod
+    def decode_cursor(cursor, key_column):
+        """Decode a cursor back into a value of `key_column`'s type; raises ValueError if it is malformed."""
+        try:
+            raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode()
+            if key_column.type.python_type is date:
+                return date.fromisoformat(raw)
+            return int(raw)
+        except (ValueError, UnicodeDecodeError):
+            raise ValueError("Invalid cursor")
+
+    @staticmethod
+    def paginate(query, key_column, limit, cursor=None, descending=False):
+        """
+        Return (rows, next_cursor) for the page after `cursor`, ordered by `key_column`.
+
+        next_cursor is None on the last page.
+        """
+        if cursor is not None:
+            value = PaginationService.decode_cursor(cursor, key_column)
+            query = query.filter(key_column < value if descending else key_column > value)
+
+        rows = query.order_by(key_column.desc() if descending else key_column).limit(limit + 1).all()
+
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = PaginationService.encode_cursor(getattr(rows[-1], key_column.key))
+        return rows, next_cursor
+
+    @staticmethod
+    def page(items, limit, next_cursor):
+        """Response body for one page."""
+        return {'items': items, 'limit': limit, 'next_cursor': next_cursor}
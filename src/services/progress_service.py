@@ -0,0 +1,261 @@
+from datetime import datetime
+from src.models import ProgressRecord, DailyActivity, ChildProgressSummary, db
+from src.services.attempt_log_service import AttemptLogService
+from src.services.progress_store import ProgressStore
+from src.services.progress_summary_service import ProgressSummaryService
+from src.services.streak_service import StreakService
+from src.services.review_service import ReviewService
+
+class ProgressService:
+    @staticmethod
+    def apply_exercise_result(child_id, exercise, was_completed, is_completed):
+        """
+        Apply an exercise result to the lesson and topic rollups.
+
+        Only the change in completion state is applied, so the cost does not
+        depend on how many records the child already has. Totals come from the
+        cached Lesson.exercise_count and Topic.lesson_count columns.
+        """
+        delta = int(bool(is_completed)) - int(bool(was_completed))
+        ProgressService.apply_lesson_deltas(child_id, {exercise.lesson: delta})
+
+    @staticmethod
+    def apply_lesson_deltas(child_id, lesson_deltas):
+        """
+        Apply net changes in completed exercises ({Lesson: delta}) for one child.
+
+        Issues one upsert per lesson and one per topic. Lesson completion can
+        only change when a delta is non-zero, so only then are the topic's
+        completed lessons recounted.
+        """
+        topics = {}
+        for lesson, delta in lesson_deltas.items():
+            ProgressStore.add_lesson_completions(child_id, lesson, delta)
+            topic_delta = topics.setdefault(lesson.topic_id, [lesson.topic, 0, False])
+            topic_delta[1] += delta
+            topic_delta[2] = topic_delta[2] or bool(delta)
+
+        for topic, exercise_delta, recount_lessons in topics.values():
+            ProgressStore.add_topic_completions(child_id, topic, exercise_delta, recount_lessons)
+
+    @staticmethod
+    def apply_lesson_update(child_id, lesson, data):
+        """Apply a lesson-player update (status, percentage, position, time) and refresh the topic if the status changed."""
+        ProgressStore.upsert_lesson_progress(
+            child_id, lesson.id,
+            status=data.get('status'),
+            progress_percentage=data.get('progress_percentage'),
+            last_position=data.get('last_position'),
+            time_spent=data.get('time_spent') or 0
+        )
+
+        if 'status' in data:
+            ProgressStore.add_topic_completions(child_id, lesson.topic, 0, recount_lessons=True)
+
+    @staticmethod
+    def apply_daily_activity(child_id, day, exercises_completed=0, lessons_viewed=0, time_spent=0,
+                             score_sum=0.0, score_count=0):
+        """
+        Add counts, time spent and scores to the child's activity row for a day, and advance their streak.
+
+        The average score is kept as a running sum and count, so it never
+        needs to re-read the day's progress records. The streak costs one
+        upsert, plus two primary key or index lookups for a backdated day;
+        only a newly active day before the last active day is recounted.
+        """
+        last_active = db.session.query(ChildProgressSummary.last_active_date).filter(
+            ChildProgressSummary.child_id == child_id
+        ).scalar()
+        backdated = last_active is not None and day < last_active
+        newly_active = backdated and db.session.query(DailyActivity.id).filter(
+            DailyActivity.child_id == child_id, DailyActivity.date == day
+        ).first() is None
+
+        ProgressStore.add_daily_activity(
+            child_id, day, exercises_completed=exercises_completed, lessons_viewed=lessons_viewed,
+            time_spent=time_spent, score_sum=score_sum, score_count=score_count
+        )
+
+        # A new day before the last active one may join two streaks, which only a recount can tell;
+        # a day that was already active changes nothing
+        if newly_active:
+            StreakService.recompute(child_id)
+        elif not backdated:
+            ProgressStore.mark_active_day(child_id, day)
+
+    @staticmethod
+    def apply_summary_delta(child_id, exercises_completed=0, score_sum=0.0, score_count=0, time_spent=0,
+                            recount_completions=False):
+        """
+        Apply one write's changes to the child's materialized summary row.
+
+        Pass `recount_completions` whenever lesson or topic completion may have
+        changed; completed lessons and topics are then recounted in SQL.
+        """
+        ProgressStore.add_summary_totals(
+            child_id, exercises_completed=exercises_completed, score_sum=score_sum, score_count=score_count,
+            time_spent=time_spent, recount_completions=recount_completions
+        )
+
+    @staticmethod
+    def backfill_daily_scores(batch_size=1000):
+        """
+        Seed score_sum/score_count on activity rows that predate the running aggregate.
+
+        Uses the same records the old per-request average read (progress
+        records grouped by the date they were created). Returns the number of
+        rows updated.
+        """
+        updated = 0
+        last_id = 0
+        while True:
+            rows = DailyActivity.query.filter(
+                DailyActivity.id > last_id,
+                db.or_(DailyActivity.score_count.is_(None), DailyActivity.score_count == 0)
+            ).order_by(DailyActivity.id).limit(batch_size).all()
+            if not rows:
+                break
+
+            child_ids = {row.child_id for row in rows}
+            created_on = db.func.date(ProgressRecord.created_at)
+            totals = {
+                (child_id, str(day)): (score_sum, score_count)
+                for child_id, day, score_sum, score_count in db.session.query(
+                    ProgressRecord.child_id, created_on,
+                    db.func.sum(ProgressRecord.score), db.func.count(ProgressRecord.score)
+                ).filter(
+                    ProgressRecord.child_id.in_(child_ids),
+                    created_on.in_([row.date for row in rows])
+                ).group_by(ProgressRecord.child_id, created_on).all()
+            }
+
+            for row in rows:
+                score_sum, score_count = totals.get((row.child_id, row.date.isoformat()), (0.0, 0))
+                row.score_sum = score_sum or 0.0
+                row.score_count = score_count
+                if score_count:
+                    row.average_score = row.score_sum / score_count
+                    updated += 1
+                last_id = row.id
+
+            ProgressSummaryService.bump_versions(child_ids)
+            db.session.commit()
+
+        return updated
+
+    @staticmethod
+    def record_attempt_batch(attempts):
+        """
+        Upsert a batch of exercise attempts and update the rollups once.
+
+        Each attempt is a dict with child_id, exercise (an Exercise), score, day
+        and optionally time_spent, completed and attempted_at. Every attempt is
+        also appended to the attempt log and reviewed by the spaced-repetition
+        scheduler. Existing records are loaded with one
+        IN query; lesson/topic rollups are upserted once per affected lesson and
+        topic, daily activity once per child and day and the summary once per
+        child. The caller commits.
+        Returns (the ProgressRecord for each attempt, the AttemptEvent logged
+        for each attempt).
+        """
+        if not attempts:
+            return [], []
+
+        child_ids = {attempt['child_id'] for attempt in attempts}
+        exercise_lessons = {attempt['exercise'].id: attempt['exercise'].lesson_id for attempt in attempts}
+        exercise_ids = set(exercise_lessons)
+        lessons = {attempt['exercise'].lesson_id: attempt['exercise'].lesson for attempt in attempts}
+
+        records = {
+            (record.child_id, record.exercise_id): record
+            for record in ProgressRecord.query.filter(
+                ProgressRecord.child_id.in_(child_ids),
+                ProgressRecord.exercise_id.in_(exercise_ids)
+            ).all()
+        }
+        initial_completed = {key: bool(record.completed) for key, record in records.items()}
+        initial_scores = {key: record.score for key, record in records.items()}
+
+        results = []
+        events = []
+        daily_totals = {}
+        for attempt in attempts:
+            child_id = attempt['child_id']
+            exercise = attempt['exercise']
+            key = (child_id, exercise.id)
+
+            progress = records.get(key)
+            if progress:
+                progress.score = attempt['score']
+                progress.time_spent = attempt.get('time_spent', progress.time_spent)
+                progress.attempts += 1
+                progress.completed = attempt.get('completed', progress.completed)
+            else:
+                progress = ProgressRecord(
+                    child_id=child_id,
+                    exercise_id=exercise.id,
+                    score=attempt['score'],
+                    time_spent=attempt.get('time_spent'),
+                    attempts=1,
+                    completed=attempt.get('completed', False)
+                )
+                db.session.add(progress)
+                records[key] = progress
+                initial_completed[key] = False
+                initial_scores[key] = None
+
+            events.append(AttemptLogService.append(
+                progress, time_spent=attempt.get('time_spent'), attempted_at=attempt.get('attempted_at')
+            ))
+
+            totals = daily_totals.setdefault((child_id, attempt['day']), [0, 0, 0.0])
+            totals[0] += 1
+            totals[1] += attempt.get('time_spent') or 0
+            totals[2] += attempt['score']
+            results.append(progress)
+
+        # Net completion change per (child, lesson), and net summary change per child
+        lesson_deltas = {}
+        summary_deltas = {}
+        for child_id, exercise_id in {(attempt['child_id'], attempt['exercise'].id) for attempt in attempts}:
+            key = (child_id, exercise_id)
+            record = records[key]
+            delta = int(bool(record.completed)) - int(initial_completed[key])
+            child_deltas = lesson_deltas.setdefault(child_id, {})
+            lesson = lessons[exercise_lessons[exercise_id]]
+            child_deltas[lesson] = child_deltas.get(lesson, 0) + delta
+
+            summary = summary_deltas.setdefault(child_id, [0, 0.0, 0, 0])
+            summary[0] += delta
+            summary[1] += record.score - (initial_scores[key] or 0.0)
+            summary[2] += 1 if initial_scores[key] is None else 0
+
+        db.session.flush()
+
+        ReviewService.record_reviews([
+            {
+                'child_id': attempt['child_id'],
+                'exercise_id': attempt['exercise'].id,
+                'score': attempt['score'],
+                'reviewed_at': attempt.get('attempted_at') or datetime.utcnow()
+            }
+            for attempt in attempts
+        ])
+
+        for child_id, child_deltas in lesson_deltas.items():
+            ProgressService.apply_lesson_deltas(child_id, child_deltas)
+
+        for (child_id, day), (exercises_completed, time_spent, score_sum) in daily_totals.items():
+            ProgressService.apply_daily_activity(
+                child_id, day, exercises_completed=exercises_completed, time_spent=time_spent,
+                score_sum=score_sum, score_count=exercises_completed
+            )
+            summary_deltas[child_id][3] += time_spent
+
+        for child_id, (exercises_completed, score_sum, score_count, time_spent) in summary_deltas.items():
+            ProgressService.apply_summary_delta(
+                child_id, exercises_completed=exercises_completed, score_sum=score_sum, score_count=score_count,
+                time_spent=time_spent, recount_completions=any(lesson_deltas[child_id].values())
+            )
+
+        return results, events
@@ -0,0 +1,306 @@
+from datetime import datetime, timedelta
+from sqlalchemy.dialects import mysql, postgresql, sqlite
+from src.models import (
+    ProgressRecord, LessonProgress, TopicProgress, DailyActivity, ActivityRollup, ChildProgressSummary, Lesson, db
+)
+
+class ProgressStore:
+    """
+    Single-statement upserts for the per-child rollup rows.
+
+    Each write is one INSERT ... ON DUPLICATE KEY UPDATE (MySQL) or
+    INSERT ... ON CONFLICT DO UPDATE (SQLite/PostgreSQL) with counters
+    incremented in SQL, so concurrent submissions neither race on the unique
+    constraints nor lose each other's increments.
+
+    In every update expression a bare column refers to the row's value
+    *before* the update. SQLite and PostgreSQL always behave that way; MySQL
+    evaluates assignments left to right, so derived columns are assigned
+    before the counters they are derived from.
+    """
+
+    @staticmethod
+    def upsert(model, conflict_columns, values, updates):
+        """Insert `values` into `model`'s table, or apply `updates` (ordered (column, expression) pairs)."""
+        ProgressStore._execute_upsert(model, conflict_columns, updates, values=values)
+
+    @staticmethod
+    def upsert_many(model, conflict_columns, rows, updates):
+        """
+        Insert several rows (a list of dicts with the same keys) in one statement, applying `updates` to existing ones.
+
+        `updates` is called with the incoming row, as for upsert_from_select.
+        """
+        ProgressStore._execute_upsert(model, conflict_columns, updates, values=rows)
+
+    @staticmethod
+    def upsert_from_select(model, conflict_columns, columns, select, updates):
+        """
+        INSERT ... SELECT `select` into `columns`, applying `updates` to rows that already exist.
+
+        `updates` is called with the incoming row (MySQL VALUES(), SQL
+        `excluded`) and returns ordered (column, expression) pairs.
+        """
+        ProgressStore._execute_upsert(model, conflict_columns, updates, from_select=(columns, select))
+
+    @staticmethod
+    def _execute_upsert(model, conflict_columns, updates, values=None, from_select=None):
+        dialect = db.session.get_bind().dialect.name
+        table = model.__table__
+
+        if dialect == 'mysql':
+            insert = mysql.insert(table)
+        elif dialect in ('sqlite', 'postgresql'):
+            insert = (sqlite.insert if dialect == 'sqlite' else postgresql.insert)(table)
+        else:
+            raise NotImplementedError(f"Upserts are not supported for the {dialect} dialect")
+
+        if from_select is not None:
+            insert = insert.from_select(*from_select)
+        else:
+            insert = insert.values(values) if isinstance(values, list) else insert.values(**values)
+        if callable(updates):
+            updates = updates(insert.inserted if dialect == 'mysql' else insert.excluded)
+
+        # Column onupdate defaults do not fire for the update half of an upsert
+        if 'updated_at' in table.c:
+            updates = list(updates) + [(table.c.updated_at, datetime.utcnow())]
+
+        if dialect == 'mysql':
+            statement = insert.on_duplicate_key_update(
+                [(column.name, expression) for column, expression in updates]
+            )
+        else:
+            statement = insert.on_conflict_do_update(
+                index_elements=conflict_columns,
+                set_={column.name: expression for column, expression in updates}
+            )
+
+        db.session.execute(statement)
+
+    @staticmethod
+    def add_daily_activity(child_id, day, exercises_completed=0, lessons_viewed=0, time_spent=0,
+                           score_sum=0.0, score_count=0):
+        """Add counts, time and scores to the child's activity row for a day, and to its week and month rollups."""
+        totals = {
+            'exercises_completed': exercises_completed,
+            'lessons_viewed': lessons_viewed,
+            'time_spent': time_spent,
+            'score_sum': score_sum,
+            'score_count': score_count
+        }
+
+        ProgressStore.add_activity_totals(
+            DailyActivity, ['child_id', 'date'], {'child_id': child_id, 'date': day}, totals
+        )
+        for period in ActivityRollup.PERIODS:
+            ProgressStore.add_activity_totals(
+                ActivityRollup, ['child_id', 'period', 'period_start'],
+                {'child_id': child_id, 'period': period, 'period_start': ActivityRollup.period_start_of(day, period)},
+                totals
+            )
+
+    @staticmethod
+    def mark_active_day(child_id, day):
+        """
+        Advance the child's streak for activity on `day`, in one upsert on the summary row.
+
+        The day after last_active_date extends the current streak, a later day
+        starts a new one and the same day changes nothing. Days before
+        last_active_date are also left alone; see StreakService.recompute.
+        """
+        last = ChildProgressSummary.last_active_date
+        current = db.case(
+            (last >= day, ChildProgressSummary.current_streak),
+            (last == day - timedelta(days=1), ChildProgressSummary.current_streak + 1),
+            else_=1
+        )
+        ProgressStore.upsert(ChildProgressSummary, ['child_id'], {
+            'child_id': child_id,
+            'current_streak': 1,
+            'longest_streak': 1,
+            'last_active_date': day
+        }, [
+            (ChildProgressSummary.longest_streak, db.case(
+                (current > ChildProgressSummary.longest_streak, current), else_=ChildProgressSummary.longest_streak
+            )),
+            (ChildProgressSummary.current_streak, current),
+            (ChildProgressSummary.last_active_date, db.case((last >= day, last), else_=day)),
+        ])
+
+    @staticmethod
+    def add_activity_totals(model, conflict_columns, keys, totals):
+        """Upsert activity counters (DailyActivity or ActivityRollup), keeping average_score as a running mean."""
+        updates = []
+        if totals['score_count']:
+            updates.append((
+                model.average_score,
+                (model.score_sum + totals['score_sum']) / (model.score_count + totals['score_count'])
+            ))
+        updates += [
+            (getattr(model, name), getattr(model, name) + value) for name, value in totals.items()
+        ]
+
+        average_score = totals['score_sum'] / totals['score_count'] if totals['score_count'] else None
+        ProgressStore.upsert(model, conflict_columns, dict(keys, average_score=average_score, **totals), updates)
+
+    @staticmethod
+    def add_lesson_completions(child_id, lesson, delta):
+        """
+        Add `delta` completed exercises to the child's lesson row.
+
+        The lesson is marked completed once every exercise is done; a status
+        that is already 'completed' is never downgraded.
+        """
+        total = lesson.exercise_count or 0
+        completed = max(delta, 0)
+
+        updates = []
+        if total:
+            new_count = LessonProgress.exercises_completed + delta
+            updates += [
+                (LessonProgress.progress_percentage, new_count * 100.0 / total),
+                (LessonProgress.status, db.case((new_count >= total, 'completed'), else_=LessonProgress.status)),
+            ]
+        updates.append((LessonProgress.exercises_completed, LessonProgress.exercises_completed + delta))
+
+        ProgressStore.upsert(LessonProgress, ['child_id', 'lesson_id'], {
+            'child_id': child_id,
+            'lesson_id': lesson.id,
+            'status': 'completed' if total and completed >= total else 'in_progress',
+            'progress_percentage': completed * 100.0 / total if total else 0.0,
+            'exercises_completed': completed,
+            'time_spent': 0
+        }, updates)
+
+    @staticmethod
+    def upsert_lesson_progress(child_id, lesson_id, status=None, progress_percentage=None,
+                               last_position=None, time_spent=0):
+        """Create or update the child's lesson row from a lesson-player update; None leaves a field unchanged."""
+        updates = [(LessonProgress.time_spent, LessonProgress.time_spent + time_spent)]
+        if status is not None:
+            updates.append((LessonProgress.status, status))
+        if progress_percentage is not None:
+            updates.append((LessonProgress.progress_percentage, progress_percentage))
+        if last_position is not None:
+            updates.append((LessonProgress.last_position, last_position))
+
+        ProgressStore.upsert(LessonProgress, ['child_id', 'lesson_id'], {
+            'child_id': child_id,
+            'lesson_id': lesson_id,
+            'status': status or 'in_progress',
+            'progress_percentage': progress_percentage or 0.0,
+            'last_position': last_position,
+            'exercises_completed': 0,
+            'time_spent': time_spent
+        }, updates)
+
+    @staticmethod
+    def add_topic_completions(child_id, topic, exercise_delta, recount_lessons=False):
+        """
+        Add `exercise_delta` completed exercises to the child's topic row.
+
+        With `recount_lessons`, lessons_completed is re-derived inside the same
+        statement from the child's lesson rows for this topic (bounded by the
+        topic's size), so concurrent lesson completions cannot be lost.
+        """
+        total = topic.lesson_count or 0
+        values = {
+            'child_id': child_id,
+            'topic_id': topic.id,
+            'exercises_completed': max(exercise_delta, 0),
+            'lessons_completed': 0,
+            'progress_percentage': 0.0
+        }
+
+        updates = []
+        if recount_lessons:
+            lessons_completed = db.select(db.func.count(LessonProgress.id)).join(
+                Lesson, Lesson.id == LessonProgress.lesson_id
+            ).where(
+                LessonProgress.child_id == child_id,
+                Lesson.topic_id == topic.id,
+                LessonProgress.status == 'completed'
+            ).scalar_subquery()
+
+            values['lessons_completed'] = lessons_completed
+            values['progress_percentage'] = lessons_completed * 100.0 / total if total else 0.0
+            updates += [
+                (TopicProgress.progress_percentage, lessons_completed * 100.0 / total if total else 0.0),
+                (TopicProgress.lessons_completed, lessons_completed),
+            ]
+        updates.append((TopicProgress.exercises_completed, TopicProgress.exercises_completed + exercise_delta))
+
+        ProgressStore.upsert(TopicProgress, ['child_id', 'topic_id'], values, updates)
+
+    @staticmethod
+    def summary_columns(child_id):
+        """
+        Scalar subqueries that compute every ChildProgressSummary column from the source tables.
+
+        `child_id` may be a value or a column to correlate with (e.g.
+        ChildProfile.id in an INSERT ... SELECT over many children).
+        """
+        def scalar(expression, model, *criteria):
+            return db.select(expression).where(model.child_id == child_id, *criteria).scalar_subquery()
+
+        return {
+            'topics_completed': scalar(
+                db.func.count(TopicProgress.id), TopicProgress, TopicProgress.progress_percentage >= 100
+            ),
+            'lessons_completed': scalar(
+                db.func.count(LessonProgress.id), LessonProgress, LessonProgress.status == 'completed'
+            ),
+            'exercises_completed': scalar(
+                db.func.count(ProgressRecord.id), ProgressRecord, ProgressRecord.completed.is_(True)
+            ),
+            'score_sum': scalar(db.func.coalesce(db.func.sum(ProgressRecord.score), 0.0), ProgressRecord),
+            'score_count': scalar(db.func.count(ProgressRecord.id), ProgressRecord),
+            'total_time_spent': scalar(db.func.coalesce(db.func.sum(DailyActivity.time_spent), 0), DailyActivity),
+        }
+
+    @staticmethod
+    def add_summary_totals(child_id, exercises_completed=0, score_sum=0.0, score_count=0, time_spent=0,
+                           recount_completions=False):
+        """
+        Add deltas to the child's summary row and bump its progress watermark.
+
+        With `recount_completions`, topics_completed and lessons_completed are
+        re-derived inside the statement from the child's (already updated)
+        topic and lesson rows, which are read through their child_id indexes.
+        """
+        values = {
+            'child_id': child_id,
+            'topics_completed': 0,
+            'lessons_completed': 0,
+            'exercises_completed': exercises_completed,
+            'score_sum': score_sum,
+            'score_count': score_count,
+            'total_time_spent': time_spent,
+            'version': 1
+        }
+        updates = [
+            (ChildProgressSummary.version, ChildProgressSummary.version + 1),
+            (ChildProgressSummary.exercises_completed, ChildProgressSummary.exercises_completed + exercises_completed),
+            (ChildProgressSummary.score_sum, ChildProgressSummary.score_sum + score_sum),
+            (ChildProgressSummary.score_count, ChildProgressSummary.score_count + score_count),
+            (ChildProgressSummary.total_time_spent, ChildProgressSummary.total_time_spent + time_spent),
+        ]
+        if recount_completions:
+            computed = ProgressStore.summary_columns(child_id)
+            for name in ('topics_completed', 'lessons_completed'):
+                values[name] = computed[name]
+                updates.append((getattr(ChildProgressSummary, name), computed[name]))
+
+        ProgressStore.upsert(ChildProgressSummary, ['child_id'], values, updates)
+
+    @staticmethod
+    def recompute_summary(child_id):
+        """Recompute the child's summary row from scratch in a single statement (bumping its watermark)."""
+        computed = ProgressStore.summary_columns(child_id)
+        ProgressStore.upsert(
+            ChildProgressSummary, ['child_id'],
+            dict(computed, child_id=child_id, version=1),
+            [(ChildProgressSummary.version, ChildProgressSummary.version + 1)] +
+            [(getattr(ChildProgressSummary, name), expression) for name, expression in computed.items()]
+        )
@@ -0,0 +1,114 @@
+from src.models import ChildProgressSummary, ChildProfile, Lesson, Topic, db
+from src.services.progress_store import ProgressStore
+from src.services.streak_service import StreakService
+
+class ProgressSummaryService:
+    @staticmethod
+    def get(child_id, refresh=False):
+        """
+        Return the child's materialized summary row.
+
+        The row is recomputed from the raw tables (and committed) when it does
+        not exist yet or `refresh` is set; otherwise this is a primary key read.
+        """
+        summary = db.session.get(ChildProgressSummary, child_id)
+        if summary is None or refresh:
+            ProgressStore.recompute_summary(child_id)
+            StreakService.recompute(child_id)
+            db.session.commit()
+            summary = db.session.get(ChildProgressSummary, child_id, populate_existing=True)
+        return summary
+
+    @staticmethod
+    def year_group_totals(year_group):
+        """Topic, lesson and exercise totals for a year group, from the cached curriculum counts, in one query."""
+        exercises = db.select(db.func.coalesce(db.func.sum(Lesson.exercise_count), 0)).join(
+            Topic, Topic.id == Lesson.topic_id
+        ).where(Topic.year_group == year_group).correlate(None).scalar_subquery()
+
+        topics, lessons, exercises = db.session.query(
+            db.func.count(Topic.id),
+            db.func.coalesce(db.func.sum(Topic.lesson_count), 0),
+            exercises
+        ).filter(Topic.year_group == year_group).one()
+
+        return {'topics': topics, 'lessons': int(lessons), 'exercises': int(exercises)}
+
+    @staticmethod
+    def year_group_totals_for(year_groups):
+        """Totals for several year groups at once ({year_group: totals}), in two grouped queries."""
+        totals = {year_group: {'topics': 0, 'lessons': 0, 'exercises': 0} for year_group in year_groups}
+        if not totals:
+            return totals
+
+        for year_group, topics, lessons in db.session.query(
+            Topic.year_group, db.func.count(Topic.id), db.func.coalesce(db.func.sum(Topic.lesson_count), 0)
+        ).filter(Topic.year_group.in_(totals)).group_by(Topic.year_group).all():
+            totals[year_group].update(topics=topics, lessons=int(lessons))
+
+        for year_group, exercises in db.session.query(
+            Topic.year_group, db.func.coalesce(db.func.sum(Lesson.exercise_count), 0)
+        ).join(Lesson, Lesson.topic_id == Topic.id).filter(
+            Topic.year_group.in_(totals)
+        ).group_by(Topic.year_group).all():
+            totals[year_group]['exercises'] = int(exercises)
+
+        return totals
+
+    @staticmethod
+    def payload(child, summary, totals):
+        """Summary response body for a child; `summary` may be None for a child with no progress yet."""
+        def section(completed, total):
+            return {
+                "total": total,
+                "completed": completed,
+                "percentage": (completed / total * 100) if total > 0 else 0
+            }
+
+        return {
+            "child_id": child.id,
+            "year_group": child.year_group,
+            "topics": section(summary.topics_completed if summary else 0, totals['topics']),
+            "lessons": section(summary.lessons_completed if summary else 0, totals['lessons']),
+            "exercises": section(summary.exercises_completed if summary else 0, totals['exercises']),
+            "average_score": summary.average_score if summary else 0,
+            "total_time_spent": summary.total_time_spent if summary else 0,
+            "streak": StreakService.payload(summary),
+            "as_of": summary.updated_at.isoformat() if summary else None
+        }
+
+    @staticmethod
+    def rebuild_range(first, last):
+        """Recompute the summary rows of children first..last with one INSERT ... SELECT. The caller commits."""
+        computed = ProgressStore.summary_columns(ChildProfile.id)
+        select = db.select(ChildProfile.id, *computed.values(), db.literal(1)).where(
+            ChildProfile.id.between(first, last)
+        )
+
+        ProgressStore.upsert_from_select(
+            ChildProgressSummary, ['child_id'], ['child_id', *computed, 'version'], select,
+            lambda incoming: [(ChildProgressSummary.version, ChildProgressSummary.version + 1)] + [
+                (getattr(ChildProgressSummary, name), getattr(incoming, name)) for name in computed
+            ]
+        )
+
+    @staticmethod
+    def watermark(child_id):
+        """
+        (version, updated_at) of the child's progress, read by primary key without loading the row.
+
+        Every progress write bumps the version, so it identifies the state of
+        all the child's progress listings. (0, None) before the first write.
+        """
+        row = db.session.query(ChildProgressSummary.version, ChildProgressSummary.updated_at).filter(
+            ChildProgressSummary.child_id == child_id
+        ).first()
+        return (row.version, row.updated_at) if row else (0, None)
+
+    @staticmethod
+    def bump_versions(child_ids=None):
+        """Invalidate cached progress for some (or all) children after a bulk change outside the write routes."""
+        statement = db.update(ChildProgressSummary.__table__).values(version=ChildProgressSummary.version + 1)
+        if child_ids is not None:
+            statement = statement.where(ChildProgressSummary.child_id.in_(child_ids))
+        db.session.execute(statement)
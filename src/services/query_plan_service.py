@@ -0,0 +1,186 @@
+from datetime import date, datetime, timedelta
+from src.models import (
+    ProgressRecord, LessonProgress, TopicProgress, DailyActivity, ActivityRollup, AttemptEvent, ChildProgressSummary,
+    ReviewSchedule, CurriculumVersion,
+    Achievement, AchievementType, Reward, ChildReward,
+    ParentProfile, ChildProfile, Exercise, Lesson, Topic, db
+)
+from src.services.pagination_service import DEFAULT_PAGE_LIMIT
+from src.services.leaderboard_service import LeaderboardService
+
+class QueryPlanService:
+    @staticmethod
+    def sample_ids():
+        """Pick real ids to plug into the checked queries (falls back to 1 on an empty database)."""
+        def first_id(model):
+            return db.session.query(model.id).order_by(model.id).limit(1).scalar() or 1
+
+        child = ChildProfile.query.order_by(ChildProfile.id).first()
+        return {
+            'child_id': child.id if child else 1,
+            'user_id': child.user_id if child else 1,
+            'parent_id': (child.parent_id if child else None) or 1,
+            'year_group': (child.year_group if child else None) or 1,
+            'exercise_id': first_id(Exercise),
+            'lesson_id': first_id(Lesson),
+            'topic_id': first_id(Topic),
+            'achievement_type_id': first_id(AchievementType),
+            'stripe_customer_id': db.session.query(ParentProfile.stripe_customer_id).filter(
+                ParentProfile.stripe_customer_id.isnot(None)
+            ).limit(1).scalar() or 'cus_check'
+        }
+
+    @staticmethod
+    def route_queries(ids):
+        """
+        The lookups issued by the progress and achievement routes, keyed by a readable name.
+
+        Keep this list in step with src/routes/progress.py and
+        src/routes/achievement.py when their queries change.
+        """
+        child_id = ids['child_id']
+        today = date.today()
+        page = DEFAULT_PAGE_LIMIT + 1
+
+        return [
+            # src/routes/progress.py
+            ('progress: child access by user', ChildProfile.query.filter_by(user_id=ids['user_id'])),
+            ('progress: record lookup', ProgressRecord.query.filter_by(
+                child_id=child_id, exercise_id=ids['exercise_id'])),
+            ('progress: batch record lookup', ProgressRecord.query.filter(
+                ProgressRecord.child_id.in_([child_id]),
+                ProgressRecord.exercise_id.in_([ids['exercise_id']]))),
+            ('progress: attempt history', AttemptEvent.query.filter_by(
+                child_id=child_id, exercise_id=ids['exercise_id']).order_by(AttemptEvent.attempted_at.desc())),
+            ('progress: lesson progress lookup', LessonProgress.query.filter_by(
+                child_id=child_id, lesson_id=ids['lesson_id'])),
+            ('progress: topic progress lookup', TopicProgress.query.filter_by(
+                child_id=child_id, topic_id=ids['topic_id'])),
+            ('progress: daily activity lookup', DailyActivity.query.filter_by(
+                child_id=child_id, date=today)),
+            ('progress: exercise progress page', ProgressRecord.query.filter_by(child_id=child_id).filter(
+                ProgressRecord.exercise_id > ids['exercise_id']).order_by(ProgressRecord.exercise_id).limit(page)),
+            ('progress: exercise progress by lesson', ProgressRecord.query.filter_by(
+                child_id=child_id).join(Exercise).filter(Exercise.lesson_id == ids['lesson_id'])
+                .order_by(ProgressRecord.exercise_id).limit(page)),
+            ('progress: lesson progress page', LessonProgress.query.filter_by(child_id=child_id).filter(
+                LessonProgress.lesson_id > ids['lesson_id']).order_by(LessonProgress.lesson_id).limit(page)),
+            ('progress: lesson progress by topic', LessonProgress.query.filter_by(
+                child_id=child_id).join(Lesson).filter(Lesson.topic_id == ids['topic_id'])
+                .order_by(LessonProgress.lesson_id).limit(page)),
+            ('progress: topic progress by year group', TopicProgress.query.filter_by(
+                child_id=child_id).join(Topic).filter(Topic.year_group == ids['year_group'])),
+            ('progress: activity range', DailyActivity.query.filter_by(child_id=child_id).filter(
+                DailyActivity.date >= today - timedelta(days=30),
+                DailyActivity.date <= today
+            ).order_by(DailyActivity.date.desc()).limit(page)),
+            ('progress: activity page', DailyActivity.query.filter_by(child_id=child_id).filter(
+                DailyActivity.date < today).order_by(DailyActivity.date.desc()).limit(page)),
+            ('progress: activity rollup range', ActivityRollup.query.filter_by(
+                child_id=child_id, period='month').filter(
+                ActivityRollup.period_start >= today.replace(day=1) - timedelta(days=365),
+                ActivityRollup.period_start <= today
+            ).order_by(ActivityRollup.period_start.desc()).limit(page)),
+            ('summary: materialized row', ChildProgressSummary.query.filter_by(child_id=child_id)),
+            ('summary: year group topic totals', db.session.query(
+                db.func.count(Topic.id), db.func.sum(Topic.lesson_count)).filter(Topic.year_group == ids['year_group'])),
+            ('summary: year group exercise total', db.session.query(db.func.sum(Lesson.exercise_count)).join(
+                Topic, Topic.id == Lesson.topic_id).filter(Topic.year_group == ids['year_group'])),
+            ('summary: recent activity', DailyActivity.query.filter_by(
+                child_id=child_id).order_by(DailyActivity.date.desc()).limit(7)),
+            ('summary: recount completed topics', TopicProgress.query.filter(
+                TopicProgress.child_id == child_id, TopicProgress.progress_percentage >= 100)),
+            ('summary: recount completed lessons', LessonProgress.query.filter_by(
+                child_id=child_id, status='completed')),
+
+            ('streak: active days recount', db.session.query(DailyActivity.date).filter(
+                DailyActivity.child_id == child_id).order_by(DailyActivity.date)),
+
+            ('reviews: schedule lookup', ReviewSchedule.query.filter(
+                ReviewSchedule.child_id.in_([child_id]), ReviewSchedule.exercise_id.in_([ids['exercise_id']]))),
+            ('reviews: due queue', ReviewSchedule.query.filter(
+                ReviewSchedule.child_id == child_id, ReviewSchedule.due_at <= datetime.utcnow()
+            ).order_by(ReviewSchedule.due_at).limit(20)),
+            ('reviews: due count', db.session.query(db.func.count(ReviewSchedule.id)).filter(
+                ReviewSchedule.child_id == child_id, ReviewSchedule.due_at <= datetime.utcnow())),
+
+            ('recommendations: lesson statuses', db.session.query(LessonProgress.lesson_id, LessonProgress.status)
+                .filter(LessonProgress.child_id == child_id)),
+            ('recommendations: curriculum version', db.session.query(CurriculumVersion.version)
+                .filter(CurriculumVersion.id == 1)),
+
+            ('dashboard: parent by user', ParentProfile.query.filter_by(user_id=ids['user_id'])),
+            ('dashboard: children of parent', ChildProfile.query.filter_by(parent_id=ids['parent_id'])),
+            ('dashboard: child summaries', ChildProgressSummary.query.filter(
+                ChildProgressSummary.child_id.in_([child_id]))),
+            ('dashboard: topic progress', TopicProgress.query.filter(TopicProgress.child_id.in_([child_id]))
+                .order_by(TopicProgress.child_id, TopicProgress.topic_id)),
+            ('dashboard: unviewed achievements', Achievement.query.filter(
+                Achievement.child_id.in_([child_id]), Achievement.viewed.is_(False))
+                .order_by(Achievement.child_id, Achievement.id)),
+
+            ('leaderboard: weekly completions', LeaderboardService.weekly_completions_query(
+                ids['year_group'], LeaderboardService.week_start())),
+            ('leaderboard: weekly achievement points', LeaderboardService.weekly_points_query(
+                ids['year_group'], LeaderboardService.week_start())),
+            ('leaderboard: child year groups', db.session.query(ChildProfile.id, ChildProfile.year_group).filter(
+                ChildProfile.id.in_([child_id]))),
+
+            # src/routes/achievement.py
+            ('achievement: child achievements page', Achievement.query.filter_by(child_id=child_id).filter(
+                Achievement.id > 0).order_by(Achievement.id).limit(page)),
+            ('achievement: existing award', Achievement.query.filter_by(
+                child_id=child_id, achievement_type_id=ids['achievement_type_id'])),
+            ('achievement: child rewards page', ChildReward.query.filter_by(child_id=child_id).filter(
+                ChildReward.id > 0).order_by(ChildReward.id).limit(page)),
+            ('achievement: points earned', db.session.query(db.func.sum(AchievementType.points)).join(
+                Achievement, Achievement.achievement_type_id == AchievementType.id
+            ).filter(Achievement.child_id == child_id)),
+            ('achievement: points spent', db.session.query(db.func.sum(Reward.points_required)).join(
+                ChildReward, ChildReward.reward_id == Reward.id
+            ).filter(ChildReward.child_id == child_id)),
+
+            # src/services/subscription_service.py (Stripe webhooks)
+            ('subscription: parent by customer id', ParentProfile.query.filter_by(
+                stripe_customer_id=ids['stripe_customer_id'])),
+        ]
+
+    @staticmethod
+    def explain(query):
+        """Run EXPLAIN for a query and return (plan rows, full-scan descriptions)."""
+        connection = db.session.connection()
+        dialect = connection.dialect
+        # Inline the sample values so IN lists and dates expand the way the driver would send them
+        compiled = query.statement.compile(dialect=dialect, compile_kwargs={'literal_binds': True})
+        sql = str(compiled).replace('%', '%%') if dialect.paramstyle in ('format', 'pyformat') else str(compiled)
+
+        if dialect.name == 'mysql':
+            result = connection.exec_driver_sql(f"EXPLAIN {sql}")
+            rows = [dict(row._mapping) for row in result]
+            # type=ALL is MySQL's full table scan
+            full_scans = [
+                f"{row.get('table')}: full scan (~{row.get('rows')} rows)"
+                for row in rows if row.get('type') == 'ALL'
+            ]
+        elif dialect.name == 'sqlite':
+            result = connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {sql}")
+            rows = [dict(row._mapping) for row in result]
+            # 'SCAN <table>' without 'USING ... INDEX' reads every row
+            full_scans = [
+                row['detail'] for row in rows
+                if row['detail'].startswith('SCAN') and 'INDEX' not in row['detail']
+                and 'CONSTANT ROW' not in row['detail']
+            ]
+        else:
+            raise ValueError(f"EXPLAIN checks are not supported for the {dialect.name} dialect")
+
+        return rows, full_scans
+
+    @staticmethod
+    def check_route_queries():
+        """EXPLAIN every route query; returns a list of (name, full scans) pairs."""
+        ids = QueryPlanService.sample_ids()
+        return [
+            (name, QueryPlanService.explain(query)[1])
+            for name, query in QueryPlanService.route_queries(ids)
+        ]
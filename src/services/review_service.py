@@ -0,0 +1,179 @@
+from datetime import datetime, timedelta
+from src.models import ReviewSchedule, AttemptEvent, Exercise, db
+from src.services.progress_store import ProgressStore
+
+INITIAL_EASE = 2.5
+MIN_EASE = 1.3
+PASSING_QUALITY = 3  # SM-2 recall quality (0-5) at or above which a review counts as remembered
+
+class ReviewService:
+    """
+    Spaced-repetition (SM-2) review scheduling for exercises.
+
+    Every attempt is a review: its score (0-100) maps to an SM-2 recall
+    quality, which grows or resets the exercise's interval and adjusts its
+    ease factor. The child's queue is the schedules ordered by due_at, read
+    through the (child_id, due_at) index.
+    """
+
+    @staticmethod
+    def quality(score):
+        """SM-2 recall quality (0-5) for a percentage score."""
+        return max(0, min(5, int(round((score or 0) / 20))))
+
+    @staticmethod
+    def next_state(state, score, reviewed_at):
+        """
+        Schedule columns after a review scoring `score` at `reviewed_at`.
+
+        `state` is (repetitions, interval_days, ease_factor), or None for an
+        exercise that has not been reviewed yet.
+        """
+        repetitions, interval, ease = state or (0, 0, INITIAL_EASE)
+        quality = ReviewService.quality(score)
+
+        if quality >= PASSING_QUALITY:
+            if repetitions == 0:
+                interval = 1
+            elif repetitions == 1:
+                interval = 6
+            else:
+                interval = max(1, int(round(interval * ease)))
+            repetitions += 1
+        else:
+            repetitions, interval = 0, 1
+        ease = max(MIN_EASE, ease + 0.1 - (5 - quality) * (0.08 + (5 - quality) * 0.02))
+
+        return {
+            'repetitions': repetitions,
+            'interval_days': interval,
+            'ease_factor': ease,
+            'last_score': score,
+            'last_reviewed_at': reviewed_at,
+            'due_at': reviewed_at + timedelta(days=interval)
+        }
+
+    @staticmethod
+    def record_reviews(reviews):
+        """
+        Advance the schedules for a list of reviews, in the caller's transaction.
+
+        Each review is a dict with child_id, exercise_id, score and
+        reviewed_at, applied in reviewed_at order. Current schedules are read
+        with one IN query and written back with one multi-row upsert. A
+        review older than its schedule's last review (an offline attempt
+        synced late) cannot be applied on top, so that pair is re-derived
+        from its attempt log instead, as rebuild_range would; the reviews
+        must already be in the log. The caller commits.
+        """
+        if not reviews:
+            return
+
+        states, last_reviewed = {}, {}
+        for child_id, exercise_id, repetitions, interval_days, ease_factor, last_reviewed_at in db.session.query(
+            ReviewSchedule.child_id, ReviewSchedule.exercise_id, ReviewSchedule.repetitions,
+            ReviewSchedule.interval_days, ReviewSchedule.ease_factor, ReviewSchedule.last_reviewed_at
+        ).filter(
+            ReviewSchedule.child_id.in_({review['child_id'] for review in reviews}),
+            ReviewSchedule.exercise_id.in_({review['exercise_id'] for review in reviews})
+        ).all():
+            states[(child_id, exercise_id)] = (repetitions, interval_days, ease_factor)
+            last_reviewed[(child_id, exercise_id)] = last_reviewed_at
+
+        backdated = {
+            (review['child_id'], review['exercise_id']) for review in reviews
+            if last_reviewed.get((review['child_id'], review['exercise_id'])) is not None
+            and review['reviewed_at'] < last_reviewed[(review['child_id'], review['exercise_id'])]
+        }
+        schedules = ReviewService.replay_pairs(backdated) if backdated else {}
+
+        for review in sorted(reviews, key=lambda review: review['reviewed_at']):
+            key = (review['child_id'], review['exercise_id'])
+            if key in backdated:
+                continue
+            schedule = ReviewService.next_state(states.get(key), review['score'], review['reviewed_at'])
+            states[key] = (schedule['repetitions'], schedule['interval_days'], schedule['ease_factor'])
+            schedules[key] = schedule
+
+        ProgressStore.upsert_many(
+            ReviewSchedule, ['child_id', 'exercise_id'],
+            [dict(schedule, child_id=child_id, exercise_id=exercise_id)
+             for (child_id, exercise_id), schedule in schedules.items()],
+            lambda incoming: [
+                (getattr(ReviewSchedule, name), getattr(incoming, name))
+                for name in ('repetitions', 'interval_days', 'ease_factor', 'last_score', 'last_reviewed_at', 'due_at')
+            ]
+        )
+
+    @staticmethod
+    def fold(events):
+        """
+        {(child_id, exercise_id): schedule} from (child_id, exercise_id, score, attempted_at) rows.
+
+        Rows must arrive grouped by pair and in attempted_at order within each pair.
+        """
+        schedules = {}
+        for child_id, exercise_id, score, attempted_at in events:
+            key = (child_id, exercise_id)
+            schedule = schedules.get(key)
+            state = (schedule['repetitions'], schedule['interval_days'], schedule['ease_factor']) if schedule else None
+            schedules[key] = ReviewService.next_state(state, score, attempted_at)
+        return schedules
+
+    @staticmethod
+    def log_query():
+        """The attempt log's review rows in the order schedules are folded (ties by id)."""
+        return db.session.query(
+            AttemptEvent.child_id, AttemptEvent.exercise_id, AttemptEvent.score, AttemptEvent.attempted_at
+        ).order_by(AttemptEvent.child_id, AttemptEvent.exercise_id, AttemptEvent.attempted_at, AttemptEvent.id)
+
+    @staticmethod
+    def replay_pairs(pairs):
+        """Schedules for (child_id, exercise_id) pairs re-derived from their whole attempt log, with one query."""
+        return ReviewService.fold(
+            row for row in ReviewService.log_query().filter(
+                AttemptEvent.child_id.in_({child_id for child_id, _ in pairs}),
+                AttemptEvent.exercise_id.in_({exercise_id for _, exercise_id in pairs})
+            )
+            if (row[0], row[1]) in pairs
+        )
+
+    @staticmethod
+    def queue(child_id, limit, due_before=None):
+        """The child's next `limit` reviews in due order, optionally only those due by `due_before`."""
+        query = ReviewSchedule.query.options(db.joinedload(ReviewSchedule.exercise)).filter(
+            ReviewSchedule.child_id == child_id
+        )
+        if due_before is not None:
+            query = query.filter(ReviewSchedule.due_at <= due_before)
+        return query.order_by(ReviewSchedule.due_at).limit(limit).all()
+
+    @staticmethod
+    def due_count(child_id, now=None):
+        """How many of the child's reviews are due, counted within the (child_id, due_at) index."""
+        return db.session.query(db.func.count(ReviewSchedule.id)).filter(
+            ReviewSchedule.child_id == child_id,
+            ReviewSchedule.due_at <= (now or datetime.utcnow())
+        ).scalar()
+
+    @staticmethod
+    def rebuild_range(first, last, chunk_size=5000):
+        """
+        Replay the attempt log of children first..last into fresh schedules. The caller commits.
+
+        Events are streamed in (child_id, exercise_id, attempted_at, id)
+        order from the log's index, so each schedule is folded in one pass;
+        events for exercises that no longer exist are skipped.
+        """
+        db.session.execute(db.delete(ReviewSchedule.__table__).where(ReviewSchedule.child_id.between(first, last)))
+
+        schedules = ReviewService.fold(ReviewService.log_query().filter(
+            AttemptEvent.child_id.between(first, last),
+            AttemptEvent.exercise_id.in_(db.select(Exercise.id))
+        ).yield_per(chunk_size))
+
+        rows = [dict(schedule, child_id=child_id, exercise_id=exercise_id)
+                for (child_id, exercise_id), schedule in schedules.items()]
+        for start in range(0, len(rows), chunk_size):
+            db.session.execute(ReviewSchedule.__table__.insert(), rows[start:start + chunk_size])
+        return len(rows)
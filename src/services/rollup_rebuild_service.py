@@ -0,0 +1,234 @@
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from sqlalchemy.exc import OperationalError
+from src.models import (
+    ProgressRecord, LessonProgress, TopicProgress, DailyActivity, ActivityRollup, ChildProfile,
+    Exercise, Lesson, Topic, db
+)
+from src.services.progress_store import ProgressStore
+from src.services.progress_summary_service import ProgressSummaryService
+from src.services.streak_service import StreakService
+from src.services.curriculum_graph_service import CurriculumGraphService
+
+# MySQL error codes worth retrying a chunk for: deadlock, lock wait timeout
+RETRYABLE_ERRORS = (1213, 1205)
+MAX_CHUNK_ATTEMPTS = 3
+
+class RollupRebuildService:
+    """
+    Recompute LessonProgress, TopicProgress, ActivityRollup and ChildProgressSummary rows for every child.
+
+    Children are split into contiguous child_id ranges. Each range is rebuilt
+    by a handful of GROUP BY statements (INSERT ... SELECT upserts) and
+    committed on its own, so the job can be spread across a worker pool and
+    an interrupted run only loses the ranges in flight.
+    """
+
+    @staticmethod
+    def rebuild_curriculum_counts():
+        """
+        Recompute the cached Lesson.exercise_count and Topic.lesson_count columns.
+
+        Only rows whose count actually changed are written, so updated_at
+        keeps meaning "curriculum content changed". The counts are served by
+        the curriculum endpoints, so any correction bumps the curriculum
+        version.
+        """
+        exercise_count = db.select(db.func.count(Exercise.id)).where(
+            Exercise.lesson_id == Lesson.id
+        ).scalar_subquery()
+        changed = db.session.execute(db.update(Lesson.__table__).where(
+            Lesson.exercise_count != exercise_count
+        ).values(exercise_count=exercise_count)).rowcount
+
+        lesson_count = db.select(db.func.count(Lesson.id)).where(
+            Lesson.topic_id == Topic.id
+        ).scalar_subquery()
+        changed += db.session.execute(db.update(Topic.__table__).where(
+            Topic.lesson_count != lesson_count
+        ).values(lesson_count=lesson_count)).rowcount
+
+        if changed:
+            CurriculumGraphService.bump_version()
+
+    @staticmethod
+    def child_id_ranges(chunk_size, child_id=None):
+        """Split the child id space into inclusive (first, last) ranges of at most `chunk_size` ids."""
+        if child_id is not None:
+            return [(child_id, child_id)]
+
+        first, last = db.session.query(db.func.min(ChildProfile.id), db.func.max(ChildProfile.id)).one()
+        if first is None:
+            return []
+        return [
+            (start, min(start + chunk_size - 1, last))
+            for start in range(first, last + 1, chunk_size)
+        ]
+
+    @staticmethod
+    def rebuild_lesson_rollups(first, last):
+        """Recompute lesson rows for children first..last from their completed progress records."""
+        # Reset counted lessons first so rows whose completions all disappeared drop to zero;
+        # lessons without exercises keep whatever the lesson player recorded
+        db.session.execute(db.update(LessonProgress.__table__).where(
+            LessonProgress.child_id.between(first, last),
+            LessonProgress.lesson_id.in_(db.select(Lesson.id).where(Lesson.exercise_count > 0))
+        ).values(exercises_completed=0, progress_percentage=0.0))
+
+        completed = db.func.count(ProgressRecord.id)
+        select = db.select(
+            ProgressRecord.child_id,
+            Exercise.lesson_id,
+            db.case((completed >= Lesson.exercise_count, 'completed'), else_='in_progress'),
+            completed * 100.0 / Lesson.exercise_count,
+            completed,
+            db.literal(0)
+        ).join(
+            Exercise, Exercise.id == ProgressRecord.exercise_id
+        ).join(
+            Lesson, Lesson.id == Exercise.lesson_id
+        ).where(
+            ProgressRecord.child_id.between(first, last),
+            ProgressRecord.completed.is_(True),
+            Lesson.exercise_count > 0
+        ).group_by(ProgressRecord.child_id, Exercise.lesson_id, Lesson.exercise_count)
+
+        ProgressStore.upsert_from_select(
+            LessonProgress, ['child_id', 'lesson_id'],
+            ['child_id', 'lesson_id', 'status', 'progress_percentage', 'exercises_completed', 'time_spent'],
+            select,
+            lambda incoming: [
+                (LessonProgress.progress_percentage, incoming.progress_percentage),
+                # A completed lesson is never downgraded
+                (LessonProgress.status, db.case(
+                    (incoming.status == 'completed', 'completed'), else_=LessonProgress.status
+                )),
+                (LessonProgress.exercises_completed, incoming.exercises_completed),
+            ]
+        )
+
+    @staticmethod
+    def rebuild_topic_rollups(first, last):
+        """Recompute topic rows for children first..last from their (already rebuilt) lesson rows."""
+        db.session.execute(db.update(TopicProgress.__table__).where(
+            TopicProgress.child_id.between(first, last)
+        ).values(lessons_completed=0, exercises_completed=0, progress_percentage=0.0))
+
+        lessons_completed = db.func.sum(db.case((LessonProgress.status == 'completed', 1), else_=0))
+        select = db.select(
+            LessonProgress.child_id,
+            Lesson.topic_id,
+            db.case((Topic.lesson_count > 0, lessons_completed * 100.0 / Topic.lesson_count), else_=0.0),
+            lessons_completed,
+            db.func.coalesce(db.func.sum(LessonProgress.exercises_completed), 0)
+        ).join(
+            Lesson, Lesson.id == LessonProgress.lesson_id
+        ).join(
+            Topic, Topic.id == Lesson.topic_id
+        ).where(
+            LessonProgress.child_id.between(first, last)
+        ).group_by(LessonProgress.child_id, Lesson.topic_id, Topic.lesson_count)
+
+        ProgressStore.upsert_from_select(
+            TopicProgress, ['child_id', 'topic_id'],
+            ['child_id', 'topic_id', 'progress_percentage', 'lessons_completed', 'exercises_completed'],
+            select,
+            lambda incoming: [
+                (TopicProgress.progress_percentage, incoming.progress_percentage),
+                (TopicProgress.lessons_completed, incoming.lessons_completed),
+                (TopicProgress.exercises_completed, incoming.exercises_completed),
+            ]
+        )
+
+    @staticmethod
+    def rebuild_activity_rollups(first, last, chunk_size=5000):
+        """
+        Recompute week and month activity rollups for children first..last from their daily rows.
+
+        Week and month boundaries are computed in Python rather than with
+        dialect-specific date functions; the range's daily rows are streamed
+        and its rollup rows replaced with one bulk insert.
+        """
+        db.session.execute(db.delete(ActivityRollup.__table__).where(ActivityRollup.child_id.between(first, last)))
+
+        rollups = {}
+        for row in db.session.query(
+            DailyActivity.child_id, DailyActivity.date, DailyActivity.time_spent, DailyActivity.lessons_viewed,
+            DailyActivity.exercises_completed, DailyActivity.score_sum, DailyActivity.score_count
+        ).filter(DailyActivity.child_id.between(first, last)).yield_per(chunk_size):
+            for period in ActivityRollup.PERIODS:
+                key = (row.child_id, period, ActivityRollup.period_start_of(row.date, period))
+                totals = rollups.setdefault(key, [0, 0, 0, 0.0, 0])
+                totals[0] += row.time_spent or 0
+                totals[1] += row.lessons_viewed or 0
+                totals[2] += row.exercises_completed or 0
+                totals[3] += row.score_sum or 0.0
+                totals[4] += row.score_count or 0
+
+        if rollups:
+            db.session.execute(ActivityRollup.__table__.insert(), [
+                {
+                    'child_id': child_id,
+                    'period': period,
+                    'period_start': period_start,
+                    'time_spent': time_spent,
+                    'lessons_viewed': lessons_viewed,
+                    'exercises_completed': exercises_completed,
+                    'score_sum': score_sum,
+                    'score_count': score_count,
+                    'average_score': score_sum / score_count if score_count else None
+                }
+                for (child_id, period, period_start), (time_spent, lessons_viewed, exercises_completed,
+                                                        score_sum, score_count) in rollups.items()
+            ])
+
+    @staticmethod
+    def rebuild_range(first, last):
+        """Rebuild and commit one child id range, retrying on deadlocks. Returns the number of children in it."""
+        for attempt in range(1, MAX_CHUNK_ATTEMPTS + 1):
+            try:
+                RollupRebuildService.rebuild_lesson_rollups(first, last)
+                RollupRebuildService.rebuild_topic_rollups(first, last)
+                RollupRebuildService.rebuild_activity_rollups(first, last)
+                ProgressSummaryService.rebuild_range(first, last)
+                StreakService.rebuild_range(first, last)
+                children = db.session.query(db.func.count(ChildProfile.id)).filter(
+                    ChildProfile.id.between(first, last)
+                ).scalar()
+                db.session.commit()
+                return children
+            except OperationalError as e:
+                db.session.rollback()
+                code = e.orig.args[0] if e.orig is not None and e.orig.args else None
+                if code not in RETRYABLE_ERRORS or attempt == MAX_CHUNK_ATTEMPTS:
+                    raise
+
+    @staticmethod
+    def rebuild_all(app, workers=4, chunk_size=500, child_id=None, report=None):
+        """
+        Rebuild curriculum totals, then every child's rollups across `workers` threads.
+
+        Each worker runs in its own app context (and so its own session and
+        connection). `report(ranges_done, ranges_total, children_done, elapsed)`
+        is called from the calling thread after each range commits. Returns
+        (children, elapsed seconds).
+        """
+        started = time.time()
+        RollupRebuildService.rebuild_curriculum_counts()
+        db.session.commit()
+
+        ranges = RollupRebuildService.child_id_ranges(chunk_size, child_id=child_id)
+
+        def run(first, last):
+            with app.app_context():
+                return RollupRebuildService.rebuild_range(first, last)
+
+        children = 0
+        with ThreadPoolExecutor(max_workers=max(workers, 1)) as pool:
+            futures = [pool.submit(run, first, last) for first, last in ranges]
+            for done, future in enumerate(as_completed(futures), start=1):
+                children += future.result()
+                if report:
+                    report(done, len(ranges), children, time.time() - started)
+
+        return children, time.time() - started
@@ -0,0 +1,93 @@
+from datetime import date, timedelta
+from src.models import ChildProgressSummary, DailyActivity, db
+from src.services.progress_store import ProgressStore
+
+class StreakService:
+    """
+    "Days in a row" streaks, kept on the child's summary row.
+
+    The write paths advance the streak with ProgressStore.mark_active_day in
+    O(1). Only a day written before the last active day (an offline batch
+    synced late) needs the child's active days recounted.
+    """
+
+    @staticmethod
+    def runs(days):
+        """(current_streak, longest_streak, last_active_date) from active days in ascending order."""
+        current = longest = 0
+        last = None
+        for day in days:
+            if last is not None and day == last:
+                continue
+            current = current + 1 if last is not None and day == last + timedelta(days=1) else 1
+            longest = max(longest, current)
+            last = day
+        return current, longest, last
+
+    @staticmethod
+    def recompute(child_id):
+        """Recount the child's streak from their daily activity rows (read through the (child_id, date) index)."""
+        current, longest, last = StreakService.runs(
+            day for day, in db.session.query(DailyActivity.date).filter(
+                DailyActivity.child_id == child_id
+            ).order_by(DailyActivity.date)
+        )
+        ProgressStore.upsert(ChildProgressSummary, ['child_id'], {
+            'child_id': child_id,
+            'current_streak': current,
+            'longest_streak': longest,
+            'last_active_date': last
+        }, [
+            (ChildProgressSummary.current_streak, current),
+            (ChildProgressSummary.longest_streak, longest),
+            (ChildProgressSummary.last_active_date, last),
+        ])
+
+    @staticmethod
+    def rebuild_range(first, last, chunk_size=5000):
+        """
+        Recount the streaks of children first..last from their daily rows. The caller commits.
+
+        Expects the summary rows to exist (ProgressSummaryService.rebuild_range
+        runs first). Daily rows are streamed in (child_id, date) order and the
+        results written with one bulk UPDATE by primary key.
+        """
+        db.session.execute(db.update(ChildProgressSummary.__table__).where(
+            ChildProgressSummary.child_id.between(first, last)
+        ).values(current_streak=0, longest_streak=0, last_active_date=None))
+
+        days_by_child = {}
+        for child_id, day in db.session.query(DailyActivity.child_id, DailyActivity.date).filter(
+            DailyActivity.child_id.between(first, last)
+        ).order_by(DailyActivity.child_id, DailyActivity.date).yield_per(chunk_size):
+            days_by_child.setdefault(child_id, []).append(day)
+
+        streaks = []
+        for child_id, days in days_by_child.items():
+            current, longest, last_active = StreakService.runs(days)
+            streaks.append({
+                'child_id': child_id,
+                'current_streak': current,
+                'longest_streak': longest,
+                'last_active_date': last_active
+            })
+        if streaks:
+            db.session.execute(db.update(ChildProgressSummary), streaks)
+
+    @staticmethod
+    def payload(summary, today=None):
+        """
+        Streak response body; `summary` may be None for a child with no activity yet.
+
+        The stored streak ends on the last active day, so it only counts as
+        current while that day is today or yesterday.
+        """
+        today = today or date.today()
+        last_active = summary.last_active_date if summary else None
+        alive = last_active is not None and last_active >= today - timedelta(days=1)
+        return {
+            "current_streak": summary.current_streak if alive else 0,
+            "longest_streak": summary.longest_streak if summary else 0,
+            "last_active_date": last_active.isoformat() if last_active else None,
+            "active_today": last_active == today
+        }